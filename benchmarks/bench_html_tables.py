@@ -0,0 +1,136 @@
+"""Benchmark the streaming table extractor against BeautifulSoup + pandas.
+
+Generates MainSearch.aspx and activeFilings.aspx pages with large result
+tables, then parses each with the old approach (BeautifulSoup, serializing
+the table back out for ``pd.read_html`` and matching Details links to rows
+with a nested loop) and with ``iter_table_rows``. Both parsers must return
+the same rows.
+
+Usage:
+    python benchmarks/bench_html_tables.py [--rows 1000 5000 10000] [--repeat 3]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from io import StringIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from src.config import FRANCHISE_DETAILS_BASE_URL
+from src.scrapers.franchise_data import parse_search_results
+from src.utils.html_tables import iter_table_rows
+
+
+def make_search_page(num_rows):
+    rows = []
+    for i in range(num_rows):
+        file_number = 600000 + i
+        registered = i % 3 != 0
+        link = (f'<a href="details.aspx?id={file_number}&amp;hash={1700000000 + i}'
+                f'&amp;search=external&amp;type=GENERAL">Details</a>' if registered else '&nbsp;')
+        rows.append(
+            f'<tr><td>{file_number}</td><td>FRANCHISOR {i} LLC</td><td>Brand {i}</td>'
+            f'<td>01/01/2024</td><td>01/01/2025</td><td>{"Registered" if registered else "Expired"}</td>'
+            f'<td>{link}</td></tr>'
+        )
+    return (
+        '<html><body><form id="form1"><table id="grdSearchResults">'
+        '<tr><th>File Number</th><th>Legal Name</th><th>Trade Name</th><th>Effective Date</th>'
+        '<th>Expiration Date</th><th>Status</th><th>&nbsp;</th></tr>'
+        + ''.join(rows) + '</table></form></body></html>'
+    )
+
+
+def make_active_filings_page(num_rows):
+    rows = ''.join(f'<tr><td>Brand {i}</td><td>01/01/2025</td></tr>' for i in range(num_rows))
+    return (
+        '<html><body><table id="dgActiveFilings">'
+        '<tr><th>Franchise Name</th><th>Expiration Date</th></tr>'
+        + rows + '</table></body></html>'
+    )
+
+
+def legacy_search_results(content):
+    """The search results parser before the streaming extractor."""
+    soup = BeautifulSoup(content, 'html.parser')
+    results_table = soup.find('table', {'id': 'grdSearchResults'})
+    results_df = pd.read_html(StringIO(str(results_table)))[0]
+    links = []
+    for row in results_table.find_all('tr'):
+        tds = row.find_all('td')
+        if len(tds) > 6 and tds[5].text.strip() == 'Registered':
+            link = tds[6].find('a')
+            if link and 'href' in link.attrs:
+                match = re.search(r'id=(\d+)&hash=(\d+)', link['href'])
+                if match:
+                    links.append({
+                        'details_url': f"{FRANCHISE_DETAILS_BASE_URL}?id={match.group(1)}&hash={match.group(2)}&search=external&type=GENERAL",
+                        'file_id': match.group(1),
+                        'hash': match.group(2)
+                    })
+    results = []
+    for i, row in results_df.iterrows():
+        if row['Status'] == 'Registered':
+            for link in links:
+                if str(row['File Number']) == link['file_id']:
+                    results.append({'file_number': str(row['File Number']), **link})
+    return results
+
+
+def streaming_search_results(content):
+    return [
+        {key: result[key] for key in ('file_number', 'details_url', 'file_id', 'hash')}
+        for result in parse_search_results(content, 'benchmark')
+    ]
+
+
+def legacy_active_filings(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    filings_table = soup.find('table', {'id': 'dgActiveFilings'})
+    return pd.read_html(StringIO(str(filings_table)))[0].to_dict('records')
+
+
+def streaming_active_filings(content):
+    return [row.cells for row in iter_table_rows(content, 'dgActiveFilings')]
+
+
+PAGES = {
+    'search': (make_search_page, legacy_search_results, streaming_search_results),
+    'active': (make_active_filings_page, legacy_active_filings, streaming_active_filings),
+}
+
+
+def best_time(parser, content, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parser(content)
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 5000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'page':>7} {'rows':>6} {'size KB':>8} {'bs4+pandas ms':>14} {'streaming ms':>13} {'speedup':>8}")
+    for page, (make_page, legacy, streaming) in PAGES.items():
+        for num_rows in args.rows:
+            content = make_page(num_rows)
+            old_rows, old_time = best_time(legacy, content, args.repeat)
+            new_rows, new_time = best_time(streaming, content, args.repeat)
+            assert old_rows == new_rows, f"{page}: parsers disagree"
+            print(f"{page:>7} {num_rows:>6} {len(content) / 1024:>8.0f} {old_time * 1000:>14.1f} "
+                  f"{new_time * 1000:>13.1f} {old_time / new_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark browser page loads with and without resource blocking and selector waits.
+
+Loads each page type the browser scrapers visit (activeFilings.aspx, the
+MainSearch.aspx form and its results, and a details.aspx page) from the
+live DFI site, first the old way (every resource, waiting for network
+idle) and then with the ``PageLoading`` defaults (documents only, waiting
+for the target element). Reports the mean load time and the requests each
+load sent and aborted. The response cache is not used.
+
+Usage:
+    python benchmarks/bench_page_loading.py [--search "1-800"] [--repeat 3] [--delay 1.0]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyppeteer import launch
+
+from src.config import ACTIVE_FILINGS_URL, FRANCHISE_SEARCH_URL, HEADLESS
+from src.scrapers.active_filings import ACTIVE_FILINGS_SELECTOR
+from src.scrapers.franchise_data import (
+    DETAILS_SELECTOR,
+    SEARCH_FORM_SELECTOR,
+    SEARCH_RESULTS_SELECTOR,
+    parse_search_results
+)
+from src.scrapers.page_loading import PageLoading
+
+
+MODES = {
+    'before': lambda: PageLoading(allowed_resources=None, wait_for_selector=False),
+    'after': lambda: PageLoading(),
+}
+
+
+async def load_active_filings(loading, page, search):
+    await loading.goto(page, ACTIVE_FILINGS_URL, ACTIVE_FILINGS_SELECTOR)
+
+
+async def load_search(loading, page, search):
+    await loading.goto(page, FRANCHISE_SEARCH_URL, SEARCH_FORM_SELECTOR)
+    await page.type('input#txtName', search)
+    await page.click('input#txtName')
+    await page.keyboard.press('Tab')
+    await page.keyboard.press('Enter')
+    await loading.wait_for_navigation(page, SEARCH_RESULTS_SELECTOR)
+    return await page.content()
+
+
+def make_load_details(details_url):
+    async def load_details(loading, page, search):
+        await loading.goto(page, details_url, DETAILS_SELECTOR)
+    return load_details
+
+
+async def time_load(browser, mode, load, search):
+    """Load a page type once in a fresh page and measure it."""
+    loading = MODES[mode]()
+    page = await browser.newPage()
+    sent = 0
+
+    def count(request):
+        nonlocal sent
+        sent += 1
+
+    page.on('request', count)
+    await loading.prepare(page)
+    start = time.perf_counter()
+    result = await load(loading, page, search)
+    elapsed = time.perf_counter() - start
+    await page.close()
+    return elapsed, sent - loading.stats['aborted'], loading.stats['aborted'], result
+
+
+async def run(search, repeat, delay):
+    browser = await launch(headless=HEADLESS)
+    try:
+        # Find a details page to load from the search results
+        _, _, _, content = await time_load(browser, 'after', load_search, search)
+        results = parse_search_results(content, search) or []
+        if not results:
+            raise SystemExit(f"No registered results for {search!r}, pick another --search")
+        page_types = [
+            ('activeFilings.aspx', load_active_filings),
+            ('MainSearch.aspx + results', load_search),
+            ('details.aspx', make_load_details(results[0]['details_url'])),
+        ]
+
+        print(f"{'page':<28} {'mode':<7} {'mean s':>8} {'min s':>8} {'requests':>9} {'aborted':>8}")
+        for name, load in page_types:
+            for mode in MODES:
+                times = []
+                for _ in range(repeat):
+                    elapsed, requests, aborted, _ = await time_load(browser, mode, load, search)
+                    times.append(elapsed)
+                    await asyncio.sleep(delay)
+                print(f"{name:<28} {mode:<7} {statistics.mean(times):>8.2f} {min(times):>8.2f} "
+                      f"{requests:>9} {aborted:>8}")
+    finally:
+        await browser.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--search', default='1-800', help="franchise name to search for")
+    parser.add_argument('--repeat', type=int, default=3, help="loads of each page type per mode")
+    parser.add_argument('--delay', type=float, default=1.0, help="seconds between loads, to stay polite")
+    args = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(run(args.search, args.repeat, args.delay))
+
+
+if __name__ == '__main__':
+    main()
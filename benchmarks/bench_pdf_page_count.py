@@ -0,0 +1,108 @@
+"""Benchmark the mmap page counter against a full PyPDF2 parse.
+
+Generates synthetic FDD-sized PDFs, then counts their pages with each
+method in a fresh process so that each method's peak resident memory is
+measured on its own. Both worker processes import the same modules, so the
+difference in peak RSS is the memory the parse itself needed.
+
+Usage:
+    python benchmarks/bench_pdf_page_count.py [--pages 300 600 1200] [--repeat 5]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2
+
+from src.utils.pdf_utils import count_pdf_pages_fast
+from src.utils.synthetic_pdf import make_synthetic_pdf
+
+
+def count_with_pypdf2(file_path):
+    with open(file_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+METHODS = {
+    'mmap': count_pdf_pages_fast,
+    'pypdf2': count_with_pypdf2,
+}
+
+
+def reset_peak_rss():
+    """Reset the process's high-water mark where the kernel allows it (Linux)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def measure(method, file_path, repeat, results):
+    """Run one method in this (fresh) process and report time and memory."""
+    counter = METHODS[method]
+    reset_peak_rss()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages = counter(file_path)
+        timings.append(time.perf_counter() - start)
+    results.put((pages, min(timings), peak_rss()))
+
+
+def run(method, file_path, repeat):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=measure, args=(method, file_path, repeat, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, nargs='+', default=[300, 600, 1200])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'layout':>11} {'size MB':>8} {'method':>7} {'best ms':>9} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for num_pages in args.pages:
+            for xref_stream in (False, True):
+                layout = 'xref-stream' if xref_stream else 'xref-table'
+                file_path = os.path.join(temp_dir, f"{num_pages}_{layout}.pdf")
+                with open(file_path, 'wb') as f:
+                    f.write(make_synthetic_pdf(num_pages, xref_stream=xref_stream))
+                size_mb = os.path.getsize(file_path) / 2 ** 20
+
+                for method in METHODS:
+                    pages, best, peak = run(method, file_path, args.repeat)
+                    assert pages == num_pages, f"{method} counted {pages} pages"
+                    print(f"{num_pages:>6} {layout:>11} {size_mb:>8.1f} {method:>7} "
+                          f"{best * 1000:>9.2f} {peak / 2 ** 20:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
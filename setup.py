@@ -10,12 +10,16 @@ setup(
         "playwright>=1.41.2",
         "beautifulsoup4>=4.12.2",
         "requests>=2.31.0",
+        "httpx>=0.27.0",
         "pyppeteer>=1.0.2",
-        "pandas>=2.1.4",
+        "lxml>=4.9.3",
         "sqlalchemy>=2.0.25",
         "pypdf2>=3.0.1",
         "python-dateutil>=2.8.2",
     ],
+    extras_require={
+        "zstd": ["zstandard>=0.22.0"],
+    },
     python_requires=">=3.9",
     entry_points={
         "console_scripts": [
@@ -14,6 +14,14 @@ os.makedirs(FDD_DIR, exist_ok=True)
 
 # Database settings
 DB_PATH = ROOT_DIR / "franchise_data.db"
+DB_JOURNAL_MODE = "WAL"  # Readers never block the writer and commits only append to the log
+DB_SYNCHRONOUS = "NORMAL"  # fsync at checkpoints rather than every commit (safe with WAL)
+DB_CACHE_SIZE = -64000  # Page cache per connection, negative values are KiB
+DB_MMAP_SIZE = 256 * 1024 * 1024  # Bytes of the database file read through mmap
+DB_BUSY_TIMEOUT = 30000  # Milliseconds a connection waits for a lock before "database is locked"
+DB_READ_CONNECTIONS = 4  # Connections serving reads for async callers
+DB_PAGE_SIZE = 1000  # Rows fetched per query when streaming records
+MIGRATION_BATCH_SIZE = 10000  # Rows a schema migration backfill updates per commit
 
 # Website URLs
 ACTIVE_FILINGS_URL = "https://apps.dfi.wi.gov/apps/FranchiseEFiling/activeFilings.aspx"
@@ -24,6 +32,58 @@ FRANCHISE_DETAILS_BASE_URL = "https://apps.dfi.wi.gov/apps/FranchiseSearch/detai
 HEADLESS = True  # Run browser in headless mode
 TIMEOUT = 30000  # Timeout in milliseconds
 DEFAULT_NAVIGATION_TIMEOUT = 60000  # Navigation timeout in milliseconds
+BROWSER_POOL_SIZE = 4  # Number of browser pages shared by concurrent franchise searches
+BROWSER_ALLOWED_RESOURCES = ('document',)  # Resource types pages load, the rest are aborted (None = load everything)
+BROWSER_WAIT_FOR_SELECTOR = True  # End navigations once the page's target element exists instead of at network idle
+
+# Franchise search settings
+SEARCH_BACKEND = "browser"  # "browser" (pyppeteer) or "http" (direct ASP.NET form postback)
+HTTP_SEARCH_CONCURRENCY = 16  # Concurrent searches when using the HTTP backend
+HTTP_TIMEOUT = 30  # Timeout in seconds for plain HTTP requests
+DETAILS_BACKEND = "http"  # "http" (one GET whose view state the FDD download reuses) or "browser" (search backend)
+
+# FDD download settings
+FDD_DOWNLOAD_CONCURRENCY = 4  # Documents downloaded at the same time
+FDD_DOWNLOAD_TIMEOUT = 120  # Timeout in seconds for each download request
+DOWNLOAD_CHUNK_SIZE = 65536  # Bytes read from the network per write to disk
+
+# HTTP response cache settings
+HTTP_CACHE_ENABLED = True  # Serve repeated page loads from disk instead of the network
+HTTP_CACHE_PATH = DATA_DIR / "http_cache.sqlite"  # SQLite file holding cached responses
+HTTP_CACHE_MAX_SIZE = 512 * 1024 * 1024  # Bytes of response bodies kept before evicting the least recently used
+HTTP_CACHE_MAX_ENTRY_SIZE = 8 * 1024 * 1024  # Larger responses are passed through uncached
+HTTP_CACHE_DEFAULT_TTL = 60 * 60  # Seconds a response stays fresh when no rule below matches
+HTTP_CACHE_TTLS = [  # (URL regex, seconds fresh) checked in order, 0 = never cache
+    (r'/FranchiseSearch/details\.aspx', 7 * 24 * 60 * 60),
+    (r'/FranchiseEFiling/activeFilings\.aspx', 24 * 60 * 60),
+    (r'/FranchiseSearch/MainSearch\.aspx', 0),
+]
+HTTP_CACHE_KEY_HEADERS = ('accept', 'accept-language')  # Request headers that distinguish cached variants
+
+# HTML snapshot settings
+SNAPSHOT_DIR = DATA_DIR / "snapshots"  # Segment files and index of archived pages
+SNAPSHOT_SEGMENT_SIZE = 64 * 1024 * 1024  # Bytes per segment file before starting a new one
+SNAPSHOT_COMPRESSION = "zstd"  # "zstd" (needs the zstandard package, else gzip is used) or "gzip"
+SNAPSHOT_QUEUE_SIZE = 256  # Pages waiting for the background writer before the full-queue policy applies
+SNAPSHOT_BATCH_SIZE = 64  # Most pages the writer stores per index transaction
+SNAPSHOT_FULL_POLICY = "block"  # "block" (wait for the writer) or "drop" (skip the snapshot) when the queue is full
+
+# Pipeline settings
+PIPELINE_QUEUE_SIZE = 100  # Items buffered between two pipeline stages
+PIPELINE_DETAILS_WORKERS = 4  # Workers fetching franchise details pages
+
+# PDF processing settings
+PDF_PROCESS_WORKERS = os.cpu_count() or 2  # Worker processes parsing downloaded PDFs (0 = one thread)
+
+# Politeness settings
+PER_HOST_CONCURRENCY = 4  # Maximum in-flight page loads per host
+RATE_LIMIT_INITIAL_RPS = 1.0  # Starting requests per second for each host
+RATE_LIMIT_MIN_RPS = 0.2  # Floor the rate backs off to under errors or slow responses
+RATE_LIMIT_MAX_RPS = 10.0  # Ceiling the rate grows to while the host stays fast
+RATE_LIMIT_BURST = 2  # Requests that may be sent back to back
+RATE_LIMIT_INCREASE_RPS = 0.1  # Additive increase after each fast, successful response
+RATE_LIMIT_DECREASE_FACTOR = 0.5  # Multiplicative decrease on 429/5xx/errors/high latency
+RATE_LIMIT_LATENCY_TARGET = 2.0  # Smoothed response latency in seconds that triggers backoff
 
 # User agent string for HTTP requests
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36" 
\ No newline at end of file
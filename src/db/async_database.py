@@ -0,0 +1,134 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List
+
+from src.config import DB_READ_CONNECTIONS
+from src.db.database import Database
+
+
+# Marks the end of the writer's input
+_STOP = object()
+
+DatabaseCall = Callable[..., Any]
+
+
+class AsyncDatabase:
+    """Database access for coroutines that never blocks the event loop.
+
+    Every write goes through one queue to a dedicated writer thread that owns
+    the only writing connection, so concurrent workers never compete for
+    SQLite's write lock. Reads run on a small thread pool, each borrowing one
+    of a set of separate connections; with WAL journaling they see every
+    committed write without waiting for the writer.
+
+    Calls take a function of a ``Database`` followed by its arguments, which
+    is usually an unbound ``Database`` method::
+
+        fdd_id = await async_db.write(Database.insert_fdd_metadata, metadata_id, url, name, path)
+        fdd = await async_db.read(Database.get_fdd_by_sha256, sha256)
+    """
+
+    def __init__(self, db_path, read_connections: int = DB_READ_CONNECTIONS):
+        """Initialize the database connections and start the writer thread.
+
+        Args:
+            db_path (str): Path to the SQLite database file
+            read_connections (int): Connections serving concurrent reads
+        """
+        self.db_path = db_path
+        self._writer_db = Database(db_path)
+        self._writer_db.connect()
+        self._readers: queue.Queue = queue.Queue()
+        self._reader_dbs: List[Database] = []
+        for _ in range(read_connections):
+            reader = Database(db_path)
+            reader.connect()
+            self._reader_dbs.append(reader)
+            self._readers.put(reader)
+        self._read_executor = ThreadPoolExecutor(max_workers=read_connections, thread_name_prefix='db-reader')
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: DatabaseCall, *args, **kwargs) -> Future:
+        """Queue a write for the writer thread.
+
+        Args:
+            fn (callable): Called as ``fn(db, *args, **kwargs)`` with the writer's connection
+
+        Returns:
+            Future: Resolves to what ``fn`` returned, or raises what it raised
+        """
+        if self._closed:
+            raise RuntimeError("Database writer is closed")
+        future: Future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    async def write(self, fn: DatabaseCall, *args, **kwargs) -> Any:
+        """Run a write on the writer thread and wait for it without blocking the loop.
+
+        Args:
+            fn (callable): Called as ``fn(db, *args, **kwargs)`` with the writer's connection
+
+        Returns:
+            What ``fn`` returned
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    async def read(self, fn: DatabaseCall, *args, **kwargs) -> Any:
+        """Run a read on one of the reader connections.
+
+        Args:
+            fn (callable): Called as ``fn(db, *args, **kwargs)`` with a reader connection
+
+        Returns:
+            What ``fn`` returned
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._read_executor, self._read, fn, args, kwargs)
+
+    def _read(self, fn: DatabaseCall, args, kwargs) -> Any:
+        reader = self._readers.get()
+        try:
+            return fn(reader, *args, **kwargs)
+        finally:
+            self._readers.put(reader)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(self._writer_db, *args, **kwargs)
+            except Exception as e:
+                self._writer_db.connection.rollback()
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def close(self):
+        """Finish every queued write, then stop the threads and close the connections."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._read_executor.shutdown(wait=True)
+        self._writer_db.connection.commit()
+        self._writer_db.close()
+        for reader in self._reader_dbs:
+            reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
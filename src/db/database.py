@@ -1,7 +1,128 @@
 import os
+import re
 import sqlite3
+from datetime import date, datetime
 from pathlib import Path
 
+from src.config import (
+    DB_JOURNAL_MODE,
+    DB_SYNCHRONOUS,
+    DB_CACHE_SIZE,
+    DB_MMAP_SIZE,
+    DB_BUSY_TIMEOUT,
+    DB_PAGE_SIZE
+)
+from src.db.migrations import migrate
+
+
+# Date formats found in scraped pages, tried in order
+DATE_FORMATS = ('%m/%d/%Y', '%Y-%m-%d')
+
+# A search's terms: quoted phrases and runs of anything else but whitespace
+_SEARCH_TERM_RE = re.compile(r'"[^"]*"?|[^\s"]+')
+_FTS_OPERATORS = {'AND', 'OR', 'NOT'}
+
+
+def iso_date(value):
+    """Normalize a date to YYYY-MM-DD so that dates compare in order.
+    
+    Registered on every connection as the SQL function ``iso_date``.
+    
+    Args:
+        value (str or date): Date as stored, such as "1/31/2025" or "2025-01-31"
+        
+    Returns:
+        str: The ISO date or None if the value is not a recognized date
+    """
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y-%m-%d')
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def fts_query(text):
+    """Turn a search typed by a user into an FTS5 query.
+    
+    Every term is quoted as an FTS5 string, so punctuation such as the
+    hyphen in "non-compete" or "1-800" is part of the term rather than
+    query syntax. Quoted phrases stay phrases and AND, OR and NOT stay
+    operators.
+    
+    Args:
+        text (str): Search, such as ``non-compete`` or ``"royalty fee" OR royalties``
+        
+    Returns:
+        str: The FTS5 query
+    """
+    terms = []
+    for term in _SEARCH_TERM_RE.findall(text):
+        if term in _FTS_OPERATORS:
+            terms.append(term)
+        else:
+            terms.append('"' + term.strip('"').replace('"', '""') + '"')
+    return ' '.join(terms)
+
+
+# Inserts that update the existing row with the same natural key instead
+# of adding a duplicate; append RETURNING_ID to get the row's ID either way
+UPSERT_ACTIVE_FILING = '''
+INSERT INTO active_filings (franchise_name, expiration_date, active_state)
+VALUES (?, ?, ?)
+ON CONFLICT (franchise_name, active_state) DO UPDATE SET
+    expiration_date = excluded.expiration_date
+'''
+
+UPSERT_FRANCHISE_METADATA = '''
+INSERT INTO franchise_metadata (
+    active_filing_id, file_number, legal_name, effective_date, 
+    expiration_date, status, address_line1, address_line2, 
+    city, state, zip, wi_webpage_url
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (file_number) DO UPDATE SET
+    active_filing_id = excluded.active_filing_id,
+    legal_name = excluded.legal_name,
+    effective_date = excluded.effective_date,
+    expiration_date = excluded.expiration_date,
+    status = excluded.status,
+    address_line1 = excluded.address_line1,
+    address_line2 = excluded.address_line2,
+    city = excluded.city,
+    state = excluded.state,
+    zip = excluded.zip,
+    wi_webpage_url = excluded.wi_webpage_url
+'''
+
+RETURNING_ID = ' RETURNING id'
+
+# Rows read back by natural key per query after a bulk upsert
+ID_LOOKUP_BATCH_SIZE = 500
+
+LINK_FRANCHISE_FILING = '''
+INSERT OR IGNORE INTO franchise_filings (active_filing_id, franchise_metadata_id) VALUES (?, ?)
+'''
+
+# A stored page count stays valid as long as the document is unchanged
+UPSERT_FDD_METADATA = '''
+INSERT INTO fdd_metadata (
+    franchise_metadata_id, fdd_url, fdd_file_name, fdd_file_path,
+    fdd_file_size, fdd_file_download_date, num_pages, sha256
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (fdd_url) DO UPDATE SET
+    franchise_metadata_id = excluded.franchise_metadata_id,
+    fdd_file_name = excluded.fdd_file_name,
+    fdd_file_path = excluded.fdd_file_path,
+    fdd_file_size = excluded.fdd_file_size,
+    fdd_file_download_date = excluded.fdd_file_download_date,
+    num_pages = CASE WHEN excluded.sha256 IS fdd_metadata.sha256
+        THEN COALESCE(excluded.num_pages, fdd_metadata.num_pages)
+        ELSE excluded.num_pages END,
+    sha256 = excluded.sha256
+'''
+
 
 class Database:
     """SQLite database connection manager for franchise data."""
@@ -17,10 +138,21 @@ class Database:
         self.cursor = None
 
     def connect(self):
-        """Create a connection to the database."""
-        self.connection = sqlite3.connect(self.db_path)
+        """Create a connection to the database.
+        
+        The connection may be handed to another thread as long as only one
+        thread uses it at a time.
+        """
+        self.connection = sqlite3.connect(
+            self.db_path, timeout=DB_BUSY_TIMEOUT / 1000, check_same_thread=False
+        )
         self.connection.row_factory = sqlite3.Row
+        self.connection.create_function('iso_date', 1, iso_date, deterministic=True)
         self.cursor = self.connection.cursor()
+        self.cursor.execute(f"PRAGMA journal_mode = {DB_JOURNAL_MODE}")
+        self.cursor.execute(f"PRAGMA synchronous = {DB_SYNCHRONOUS}")
+        self.cursor.execute(f"PRAGMA cache_size = {DB_CACHE_SIZE}")
+        self.cursor.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
         return self.connection
 
     def close(self):
@@ -43,58 +175,17 @@ class Database:
             self.close()
 
     def initialize_database(self):
-        """Create database tables if they don't exist."""
-        self.connect()
+        """Bring the schema up to date by applying any pending migrations.
         
-        # Create Active Filings table
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS active_filings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            franchise_name TEXT NOT NULL,
-            expiration_date TEXT NOT NULL,
-            active_state TEXT NOT NULL DEFAULT 'wisconsin'
-        )
-        ''')
-        
-        # Create Franchise Metadata table
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS franchise_metadata (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            active_filing_id INTEGER NOT NULL,
-            file_number TEXT NOT NULL,
-            legal_name TEXT NOT NULL,
-            effective_date TEXT NOT NULL,
-            expiration_date TEXT NOT NULL,
-            status TEXT NOT NULL,
-            address_line1 TEXT,
-            address_line2 TEXT,
-            city TEXT,
-            state TEXT,
-            zip TEXT,
-            wi_webpage_url TEXT,
-            FOREIGN KEY (active_filing_id) REFERENCES active_filings (id)
-        )
-        ''')
-        
-        # Create FDD Metadata table
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS fdd_metadata (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            franchise_metadata_id INTEGER NOT NULL,
-            fdd_url TEXT NOT NULL,
-            fdd_file_name TEXT NOT NULL,
-            fdd_file_path TEXT NOT NULL,
-            fdd_file_size INTEGER,
-            fdd_file_download_date TEXT,
-            num_pages INTEGER,
-            FOREIGN KEY (franchise_metadata_id) REFERENCES franchise_metadata (id)
-        )
-        ''')
-        
-        self.connection.commit()
+        Returns:
+            int: Schema version of the database
+        """
+        if self.connection is None:
+            self.connect()
+        return migrate(self)
 
     def insert_active_filing(self, franchise_name, expiration_date, active_state="wisconsin"):
-        """Insert a new active filing record.
+        """Insert an active filing record, or update the one with the same name and state.
         
         Args:
             franchise_name (str): Name of the franchise
@@ -102,22 +193,19 @@ class Database:
             active_state (str): State where the filing is active
             
         Returns:
-            int: The ID of the inserted record
+            int: The ID of the inserted or updated record
         """
-        query = '''
-        INSERT INTO active_filings (franchise_name, expiration_date, active_state)
-        VALUES (?, ?, ?)
-        '''
-        self.cursor.execute(query, (franchise_name, expiration_date, active_state))
+        self.cursor.execute(UPSERT_ACTIVE_FILING + RETURNING_ID, (franchise_name, expiration_date, active_state))
+        filing_id = self.cursor.fetchone()[0]
         self.connection.commit()
-        return self.cursor.lastrowid
+        return filing_id
 
     def insert_franchise_metadata(self, active_filing_id, file_number, legal_name, 
                                 effective_date, expiration_date, status, 
                                 address_line1=None, address_line2=None, 
                                 city=None, state=None, zip_code=None, 
                                 wi_webpage_url=None):
-        """Insert franchise metadata.
+        """Insert franchise metadata, or update the record with the same file number.
         
         Args:
             active_filing_id (int): Foreign key to active_filings table
@@ -134,27 +222,34 @@ class Database:
             wi_webpage_url (str, optional): Wisconsin webpage URL
             
         Returns:
-            int: The ID of the inserted record
+            int: The ID of the inserted or updated record
         """
-        query = '''
-        INSERT INTO franchise_metadata (
-            active_filing_id, file_number, legal_name, effective_date, 
-            expiration_date, status, address_line1, address_line2, 
-            city, state, zip, wi_webpage_url
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        '''
-        self.cursor.execute(query, (
+        self.cursor.execute(UPSERT_FRANCHISE_METADATA + RETURNING_ID, (
             active_filing_id, file_number, legal_name, effective_date, 
             expiration_date, status, address_line1, address_line2, 
             city, state, zip_code, wi_webpage_url
         ))
+        metadata_id = self.cursor.fetchone()[0]
+        self.cursor.execute(LINK_FRANCHISE_FILING, (active_filing_id, metadata_id))
+        self.connection.commit()
+        return metadata_id
+
+    def link_franchise_filing(self, active_filing_id, franchise_metadata_id):
+        """Record that an active filing's search also found an existing franchise record.
+        
+        Args:
+            active_filing_id (int): ID of the active filing
+            franchise_metadata_id (int): ID of the franchise_metadata record
+        """
+        self.cursor.execute(LINK_FRANCHISE_FILING, (active_filing_id, franchise_metadata_id))
         self.connection.commit()
-        return self.cursor.lastrowid
 
     def insert_fdd_metadata(self, franchise_metadata_id, fdd_url, fdd_file_name,
                           fdd_file_path, fdd_file_size=None, 
-                          fdd_file_download_date=None, num_pages=None):
-        """Insert FDD metadata.
+                          fdd_file_download_date=None, num_pages=None, sha256=None):
+        """Insert FDD metadata, or update the record with the same URL.
+        
+        An updated record keeps its page count unless the document's hash changed.
         
         Args:
             franchise_metadata_id (int): Foreign key to franchise_metadata table
@@ -164,32 +259,342 @@ class Database:
             fdd_file_size (int, optional): File size of the FDD document
             fdd_file_download_date (str, optional): Download date of the FDD document
             num_pages (int, optional): Number of pages in the FDD document
+            sha256 (str, optional): Hex SHA-256 of the FDD document
             
         Returns:
-            int: The ID of the inserted record
+            int: The ID of the inserted or updated record
         """
-        query = '''
-        INSERT INTO fdd_metadata (
-            franchise_metadata_id, fdd_url, fdd_file_name, fdd_file_path,
-            fdd_file_size, fdd_file_download_date, num_pages
-        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        '''
-        self.cursor.execute(query, (
+        self.cursor.execute(UPSERT_FDD_METADATA + RETURNING_ID, (
             franchise_metadata_id, fdd_url, fdd_file_name, fdd_file_path,
-            fdd_file_size, fdd_file_download_date, num_pages
+            fdd_file_size, fdd_file_download_date, num_pages, sha256
         ))
+        fdd_id = self.cursor.fetchone()[0]
         self.connection.commit()
-        return self.cursor.lastrowid
+        return fdd_id
+    
+    def _insert_many(self, query, rows, table, key, link_filings=False):
+        """Upsert rows with one ``executemany`` in a single transaction.
+        
+        ``executemany`` cannot run a statement that returns rows, so the IDs
+        are read back afterwards by each row's natural key, a batch of rows
+        per query.
+        
+        Args:
+            query (str): Upsert statement with ? placeholders
+            rows (list): Parameter tuples, one per row
+            table (str): Table the statement writes to
+            key (dict): Natural key columns of the table, mapped to the index
+                of their parameter in a row; the first is used to look rows up
+            link_filings (bool): Also link the active filing whose ID is each
+                row's first parameter to the record in ``franchise_filings``
+            
+        Returns:
+            list: The IDs of the inserted or updated records, in the order of rows
+        """
+        keys = [tuple(row[index] for index in key.values()) for row in rows]
+        columns = ', '.join(key)
+        lookup_column = next(iter(key))
+        found = {}
+        try:
+            self.cursor.executemany(query, rows)
+            for start in range(0, len(keys), ID_LOOKUP_BATCH_SIZE):
+                values = list({row_key[0] for row_key in keys[start:start + ID_LOOKUP_BATCH_SIZE]})
+                self.cursor.execute(
+                    f"SELECT id, {columns} FROM {table} WHERE {lookup_column} IN ({', '.join('?' * len(values))})",
+                    values
+                )
+                for row in self.cursor.fetchall():
+                    found[tuple(row)[1:]] = row[0]
+            ids = [found[row_key] for row_key in keys]
+            if link_filings:
+                self.cursor.executemany(LINK_FRANCHISE_FILING, ((row[0], id_) for row, id_ in zip(rows, ids)))
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        return ids
+
+    def insert_active_filings_bulk(self, filings):
+        """Insert or update many active filing records in one transaction.
+        
+        Args:
+            filings (list): Dicts with ``franchise_name``, ``expiration_date``
+                and optionally ``active_state``
+            
+        Returns:
+            list: The IDs of the inserted or updated records, in the order given
+        """
+        return self._insert_many(UPSERT_ACTIVE_FILING, [
+            (filing['franchise_name'], filing['expiration_date'], filing.get('active_state', 'wisconsin'))
+            for filing in filings
+        ], 'active_filings', {'franchise_name': 0, 'active_state': 2})
+
+    def insert_franchise_metadata_bulk(self, records):
+        """Insert or update many franchise metadata records in one transaction.
+        
+        Args:
+            records (list): Dicts keyed like the arguments of
+                ``insert_franchise_metadata``; the address fields and
+                ``wi_webpage_url`` are optional
+            
+        Returns:
+            list: The IDs of the inserted or updated records, in the order given
+        """
+        return self._insert_many(UPSERT_FRANCHISE_METADATA, [
+            (
+                record['active_filing_id'], record['file_number'], record['legal_name'],
+                record['effective_date'], record['expiration_date'], record['status'],
+                record.get('address_line1'), record.get('address_line2'),
+                record.get('city'), record.get('state'), record.get('zip_code'),
+                record.get('wi_webpage_url')
+            )
+            for record in records
+        ], 'franchise_metadata', {'file_number': 1}, link_filings=True)
+
+    def insert_fdd_metadata_bulk(self, records):
+        """Insert or update many FDD metadata records in one transaction.
+        
+        Args:
+            records (list): Dicts keyed like the arguments of
+                ``insert_fdd_metadata``; size, download date, page count
+                and hash are optional
+            
+        Returns:
+            list: The IDs of the inserted or updated records, in the order given
+        """
+        return self._insert_many(UPSERT_FDD_METADATA, [
+            (
+                record['franchise_metadata_id'], record['fdd_url'], record['fdd_file_name'],
+                record['fdd_file_path'], record.get('fdd_file_size'),
+                record.get('fdd_file_download_date'), record.get('num_pages'), record.get('sha256')
+            )
+            for record in records
+        ], 'fdd_metadata', {'fdd_url': 1})
+    
+    def update_fdd_page_count(self, fdd_metadata_id, num_pages):
+        """Record the page count of a downloaded FDD.
+        
+        Args:
+            fdd_metadata_id (int): ID of the fdd_metadata record
+            num_pages (int): Number of pages in the FDD document
+        """
+        query = "UPDATE fdd_metadata SET num_pages = ? WHERE id = ?"
+        self.cursor.execute(query, (num_pages, fdd_metadata_id))
+        self.connection.commit()
+    
+    def get_fdd_by_sha256(self, sha256):
+        """Get an FDD that has already been stored with the given content.
+        
+        Args:
+            sha256 (str): Hex SHA-256 of the FDD document
+            
+        Returns:
+            dict: The earliest FDD metadata record with that hash or None if not found
+        """
+        query = "SELECT * FROM fdd_metadata WHERE sha256 = ? ORDER BY id LIMIT 1"
+        self.cursor.execute(query, (sha256,))
+        row = self.cursor.fetchone()
+        return dict(row) if row else None
+    
+    def is_fdd_text_indexed(self, sha256):
+        """Check whether a document's text is already in the full-text index.
+        
+        Args:
+            sha256 (str): Hex SHA-256 of the FDD document
+            
+        Returns:
+            bool: True if its pages have been indexed
+        """
+        self.cursor.execute("SELECT 1 FROM fdd_text_documents WHERE sha256 = ?", (sha256,))
+        return self.cursor.fetchone() is not None
+    
+    def insert_fdd_text(self, sha256, pages):
+        """Store a document's page text in the full-text index, replacing any earlier text.
+        
+        Args:
+            sha256 (str): Hex SHA-256 of the FDD document
+            pages (list): Text of each page in order
+        """
+        try:
+            self.cursor.execute("DELETE FROM fdd_text WHERE sha256 = ?", (sha256,))
+            self.cursor.executemany(
+                "INSERT INTO fdd_text (text, sha256, page_number) VALUES (?, ?, ?)",
+                ((text, sha256, page_number) for page_number, text in enumerate(pages, 1) if text.strip())
+            )
+            self.cursor.execute(
+                "INSERT OR REPLACE INTO fdd_text_documents (sha256, num_pages, extracted_at) VALUES (?, ?, ?)",
+                (sha256, len(pages), datetime.now().isoformat())
+            )
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+    
+    def search_fdd_text(self, query, limit=20):
+        """Find the FDD pages best matching a full-text query.
+        
+        Args:
+            query (str): Search terms, such as ``non-compete`` or ``"royalty fee" OR royalties``;
+                see ``fts_query``
+            limit (int): Most matching pages to return
+            
+        Returns:
+            list: Hits ordered from best to worst, each with the franchise's
+                name, legal name and file number, the ``fdd_id``, the
+                ``page_number`` and a ``snippet`` with matches in [brackets].
+                A page shared by several filings, or of a franchise record
+                linked to several filings, is returned for each.
+        """
+        sql = '''
+        WITH hits AS (
+            SELECT sha256, page_number, rank,
+                   snippet(fdd_text, 0, '[', ']', '...', 16) AS snippet
+            FROM fdd_text WHERE fdd_text MATCH ?
+            ORDER BY rank LIMIT ?
+        )
+        SELECT af.franchise_name, fm.legal_name, fm.file_number, fd.id AS fdd_id,
+               hits.page_number, hits.snippet, hits.rank
+        FROM hits
+        JOIN fdd_metadata fd ON fd.sha256 = hits.sha256
+        JOIN franchise_metadata fm ON fm.id = fd.franchise_metadata_id
+        JOIN franchise_filings ff ON ff.franchise_metadata_id = fm.id
+        JOIN active_filings af ON af.id = ff.active_filing_id
+        ORDER BY hits.rank, fm.file_number, af.id, hits.page_number
+        '''
+        self.cursor.execute(sql, (fts_query(query), limit))
+        return [dict(row) for row in self.cursor.fetchall()]
+    
+    def get_downloaded_fdds(self):
+        """Get the most recently stored FDD for every file number.
+        
+        Returns:
+            dict: FDD metadata (path, size and hash) keyed by file number
+        """
+        query = '''
+        SELECT fm.file_number, fd.fdd_file_path, fd.fdd_file_size, fd.sha256
+        FROM fdd_metadata fd
+        JOIN franchise_metadata fm ON fm.id = fd.franchise_metadata_id
+        ORDER BY fd.id
+        '''
+        self.cursor.execute(query)
+        return {row['file_number']: dict(row) for row in self.cursor.fetchall()}
+    
+    def get_filing_file_numbers(self):
+        """Get the file numbers previously found for each active filing.
+        
+        Returns:
+            dict: Sets of file numbers keyed by (franchise_name, expiration_date)
+        """
+        query = '''
+        SELECT af.franchise_name, af.expiration_date, fm.file_number
+        FROM active_filings af
+        JOIN franchise_filings ff ON ff.active_filing_id = af.id
+        JOIN franchise_metadata fm ON fm.id = ff.franchise_metadata_id
+        '''
+        self.cursor.execute(query)
+        file_numbers = {}
+        for row in self.cursor.fetchall():
+            key = (row['franchise_name'], row['expiration_date'])
+            file_numbers.setdefault(key, set()).add(row['file_number'])
+        return file_numbers
+    
+    def iter_rows(self, table, columns=None, conditions=(), params=(), page_size=DB_PAGE_SIZE):
+        """Stream a table's rows in ID order, one page per query.
+        
+        Each page starts after the last ID of the one before (keyset
+        pagination), so every query is an index range scan, memory stays
+        constant, and no read transaction is held between pages.
+        
+        Args:
+            table (str): Table to read
+            columns (sequence, optional): Columns to return, defaults to all;
+                ``id`` is always included
+            conditions (sequence): SQL conditions that every row must meet
+            params (sequence): Parameters of the placeholders in ``conditions``
+            page_size (int): Rows fetched per query
+            
+        Yields:
+            dict: Each matching row
+        """
+        if columns:
+            known = {row['name'] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+            unknown = set(columns) - known
+            if unknown:
+                raise ValueError(f"Unknown {table} columns: {', '.join(sorted(unknown))}")
+            columns = ['id', *(column for column in columns if column != 'id')]
+            projection = ', '.join(f"{table}.{column}" for column in columns)
+        else:
+            projection = f"{table}.*"
+        where = ''.join(f" AND ({condition})" for condition in conditions)
+        query = f"SELECT {projection} FROM {table} WHERE {table}.id > ?{where} ORDER BY {table}.id LIMIT ?"
+        
+        last_id = 0
+        while True:
+            # A cursor of its own, so other queries can run between pages
+            rows = self.connection.execute(query, (last_id, *params, page_size)).fetchall()
+            for row in rows:
+                yield dict(row)
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]['id']
+    
+    def iter_active_filings(self, columns=None, state=None, expires_from=None, expires_to=None,
+                            missing_fdd=False, page_size=DB_PAGE_SIZE):
+        """Stream active filings in ID order with constant memory.
+        
+        Args:
+            columns (sequence, optional): Columns to return, defaults to all; ``id`` is always included
+            state (str, optional): Only filings active in this state
+            expires_from (str or date, optional): Only filings expiring on or after this date
+            expires_to (str or date, optional): Only filings expiring on or before this date
+            missing_fdd (bool): Only filings none of whose franchise records has a stored FDD
+            page_size (int): Rows fetched per query
+            
+        Yields:
+            dict: Each matching active filing
+        """
+        conditions = []
+        params = []
+        if state is not None:
+            conditions.append("active_filings.active_state = ?")
+            params.append(state)
+        if expires_from is not None:
+            conditions.append("iso_date(active_filings.expiration_date) >= ?")
+            params.append(iso_date(expires_from))
+        if expires_to is not None:
+            conditions.append("iso_date(active_filings.expiration_date) <= ?")
+            params.append(iso_date(expires_to))
+        if missing_fdd:
+            conditions.append('''NOT EXISTS (
+                SELECT 1 FROM franchise_filings ff
+                JOIN fdd_metadata fd ON fd.franchise_metadata_id = ff.franchise_metadata_id
+                WHERE ff.active_filing_id = active_filings.id
+            )''')
+        return self.iter_rows('active_filings', columns, conditions, params, page_size)
+    
+    def iter_fdd_metadata(self, columns=None, missing_num_pages=False, page_size=DB_PAGE_SIZE):
+        """Stream FDD metadata records in ID order with constant memory.
+        
+        Args:
+            columns (sequence, optional): Columns to return, defaults to all; ``id`` is always included
+            missing_num_pages (bool): Only FDDs whose page count has not been recorded
+            page_size (int): Rows fetched per query
+            
+        Yields:
+            dict: Each matching FDD metadata record
+        """
+        conditions = ["fdd_metadata.num_pages IS NULL"] if missing_num_pages else []
+        return self.iter_rows('fdd_metadata', columns, conditions, (), page_size)
     
     def get_all_active_filings(self):
         """Get all active filings from the database.
         
+        Prefer ``iter_active_filings`` for anything that may be large.
+        
         Returns:
             list: List of active filings
         """
-        query = "SELECT * FROM active_filings"
-        self.cursor.execute(query)
-        return [dict(row) for row in self.cursor.fetchall()]
+        return list(self.iter_active_filings())
     
     def get_franchise_by_name(self, franchise_name):
         """Get franchise by name.
@@ -0,0 +1,148 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.db.database import Database
+
+
+# Journal stages, in the order an item passes through them
+QUEUED = 'queued'
+SEARCHED = 'searched'
+DETAILS = 'details'
+DOWNLOADED = 'downloaded'
+PROCESSED = 'processed'
+
+
+class CrawlJournal:
+    """Durable record of how far every item of a crawl has progressed.
+
+    Each pipeline stage writes an entry, with the item it handed to the next
+    stage as a JSON payload, as soon as it finishes an item. After a crash the
+    journal of the unfinished run is enough to put every item back on the
+    queue of the first stage it has not completed.
+    """
+
+    def __init__(self, db: Database):
+        """Initialize the journal, migrating the database if needed.
+
+        Args:
+            db (Database): Open database connection
+        """
+        self.db = db
+        self.run_id: Optional[int] = None
+        self.initialize()
+
+    def initialize(self):
+        """Bring the schema, which includes the journal tables, up to date."""
+        self.db.initialize_database()
+
+    def start_run(self, filings: Iterable[Dict[str, Any]]) -> int:
+        """Start a new run and queue its filings.
+
+        Args:
+            filings (iterable): Active filings with ``id``, consumed as they are queued
+
+        Returns:
+            int: ID of the new run
+        """
+        now = datetime.now().isoformat()
+        self.db.cursor.execute("INSERT INTO crawl_runs (started_at) VALUES (?)", (now,))
+        self.run_id = self.db.cursor.lastrowid
+        self.db.cursor.executemany('''
+        INSERT INTO crawl_journal (run_id, active_filing_id, stage, payload, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+        ''', ((self.run_id, filing['id'], QUEUED, json.dumps(filing, default=str), now) for filing in filings))
+        self.db.connection.commit()
+        return self.run_id
+
+    def iter_queued(self) -> Iterator[Dict[str, Any]]:
+        """Stream the filings queued for the current run, in the order they were queued.
+
+        Yields:
+            dict: Each queued active filing
+        """
+        entries = self.db.iter_rows(
+            'crawl_journal', ('payload',), ["run_id = ?", "stage = ?"], (self.run_id, QUEUED)
+        )
+        for entry in entries:
+            yield json.loads(entry['payload'])
+
+    def resume_run(self) -> Optional[int]:
+        """Continue the most recent run that did not finish.
+
+        Returns:
+            int: ID of the resumed run or None if every run finished
+        """
+        self.db.cursor.execute(
+            "SELECT id FROM crawl_runs WHERE finished_at IS NULL ORDER BY id DESC LIMIT 1"
+        )
+        row = self.db.cursor.fetchone()
+        self.run_id = row['id'] if row else None
+        return self.run_id
+
+    def finish_run(self):
+        """Mark the current run as complete so it is never resumed."""
+        self.db.cursor.execute(
+            "UPDATE crawl_runs SET finished_at = ? WHERE id = ?",
+            (datetime.now().isoformat(), self.run_id)
+        )
+        self.db.connection.commit()
+
+    def record(self, active_filing_id: int, stage: str, payload: Any = None, file_number: str = '',
+               db: Optional[Database] = None):
+        """Durably record that an item completed a stage.
+
+        Args:
+            active_filing_id (int): Active filing the item belongs to
+            stage (str): Stage the item completed
+            payload: JSON-serializable result of the stage
+            file_number (str): File number for per-filing items, empty for the filing itself
+            db (Database, optional): Connection to write with, such as a
+                database writer's, defaults to the journal's
+        """
+        db = db or self.db
+        db.cursor.execute('''
+        INSERT OR REPLACE INTO crawl_journal (run_id, active_filing_id, file_number, stage, payload, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (
+            self.run_id, active_filing_id, file_number or '', stage,
+            json.dumps(payload, default=str), datetime.now().isoformat()
+        ))
+        db.connection.commit()
+
+    def pending_work(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Rebuild the work queue of the current run.
+
+        Returns:
+            list: (stage to run, item) pairs for everything not yet processed,
+                where stage is ``search``, ``details``, ``download`` or ``postprocess``
+        """
+        self.db.cursor.execute('''
+        SELECT active_filing_id, file_number, stage, payload
+        FROM crawl_journal WHERE run_id = ? ORDER BY id
+        ''', (self.run_id,))
+        entries: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        filing_ids = []
+        for row in self.db.cursor.fetchall():
+            key = (row['active_filing_id'], row['file_number'])
+            if row['stage'] == QUEUED:
+                filing_ids.append(row['active_filing_id'])
+            entries.setdefault(key, {})[row['stage']] = json.loads(row['payload'])
+
+        work = []
+        for filing_id in filing_ids:
+            filing = entries[(filing_id, '')]
+            if SEARCHED not in filing:
+                work.append(('search', filing[QUEUED]))
+                continue
+            for result in filing[SEARCHED]:
+                stages = entries.get((filing_id, result['file_number']), {})
+                if PROCESSED in stages:
+                    continue
+                if DOWNLOADED in stages:
+                    work.append(('postprocess', stages[DOWNLOADED]))
+                elif DETAILS in stages:
+                    work.append(('download', stages[DETAILS]))
+                else:
+                    work.append(('details', result))
+        return work
@@ -0,0 +1,335 @@
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.config import MIGRATION_BATCH_SIZE
+
+
+class MigrationError(Exception):
+    """Raised when a database's schema is newer than any known migration."""
+
+
+class Migration(NamedTuple):
+    """One step of the schema's history.
+
+    Attributes:
+        version: ``PRAGMA user_version`` of the database after the step
+        description: What the step changes
+        apply: Called with the open ``Database`` to make the change
+    """
+    version: int
+    description: str
+    apply: Callable
+
+
+# Every schema change, in order
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Register a function as the migration to the given schema version.
+
+    Steps run inside a transaction that is rolled back if they fail, but
+    ``create_index`` and ``backfill`` commit as they go so that large tables
+    are never locked for long. Steps using them must be safe to run again
+    after an interruption.
+
+    Args:
+        version (int): Schema version the step migrates to, one more than the last
+        description (str): What the step changes
+    """
+    def register(apply: Callable) -> Callable:
+        if version != len(MIGRATIONS) + 1:
+            raise ValueError(f"Migration {version} is out of order, expected {len(MIGRATIONS) + 1}")
+        MIGRATIONS.append(Migration(version, description, apply))
+        return apply
+    return register
+
+
+def get_schema_version(db) -> int:
+    """Get the schema version a database has been migrated to.
+
+    Args:
+        db (Database): Open database connection
+
+    Returns:
+        int: Its ``PRAGMA user_version``, 0 for new or unversioned databases
+    """
+    db.cursor.execute("PRAGMA user_version")
+    return db.cursor.fetchone()[0]
+
+
+def migrate(db, target: Optional[int] = None, migrations: Sequence[Migration] = MIGRATIONS) -> int:
+    """Apply every pending migration up to the target version, oldest first.
+
+    The version is recorded after each step, so an interrupted upgrade
+    continues from the first step that did not finish.
+
+    Args:
+        db (Database): Open database connection
+        target (int, optional): Version to stop at, defaults to the latest
+        migrations (sequence): Migrations to choose from, defaults to ``MIGRATIONS``
+
+    Returns:
+        int: Schema version of the database afterwards
+
+    Raises:
+        MigrationError: If the database was migrated by a newer version of this code
+    """
+    latest = migrations[-1].version if migrations else 0
+    target = latest if target is None else target
+    current = get_schema_version(db)
+    if current > latest:
+        raise MigrationError(f"Database schema version {current} is newer than this code's {latest}")
+
+    db.connection.commit()
+    for step in migrations:
+        if step.version <= current or step.version > target:
+            continue
+        print(f"Migrating database to version {step.version}: {step.description}")
+        try:
+            db.cursor.execute("BEGIN")
+            step.apply(db)
+            db.cursor.execute(f"PRAGMA user_version = {step.version}")
+            db.connection.commit()
+        except Exception:
+            db.connection.rollback()
+            raise
+        current = step.version
+    return current
+
+
+def create_index(db, name: str, table: str, columns: Sequence[str], unique: bool = False,
+                 where: Optional[str] = None):
+    """Create an index without holding up readers.
+
+    SQLite builds an index in one statement under the write lock, so the
+    index is committed on its own straight away. With WAL journaling,
+    readers keep working from the last commit throughout and writers only
+    wait for the build itself.
+
+    Args:
+        db (Database): Open database connection
+        name (str): Name of the index
+        table (str): Table to index
+        columns (sequence): Indexed columns
+        unique (bool): Whether to make it a unique index
+        where (str, optional): Condition making it a partial index
+    """
+    if db.connection.in_transaction:
+        db.connection.commit()
+    query = f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+    if where:
+        query += f" WHERE {where}"
+    db.cursor.execute(query)
+    db.connection.commit()
+
+
+def backfill(db, table: str, assignments: str, where: Optional[str] = None, params: Tuple = (),
+             batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """Update a table in chunks of rowids, committing after each chunk.
+
+    Each chunk holds the write lock only briefly, so scrapers can keep
+    writing while a large table is backfilled, and an interrupted backfill
+    loses at most one chunk.
+
+    Args:
+        db (Database): Open database connection
+        table (str): Table to update
+        assignments (str): SET clause, such as ``"num_pages = NULL"``
+        where (str, optional): Condition selecting the rows to update
+        params (tuple): Parameters of the placeholders in ``assignments`` and ``where``
+        batch_size (int): Rowids covered by each chunk
+
+    Returns:
+        int: Number of rows updated
+    """
+    db.cursor.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {table}")
+    first, last = db.cursor.fetchone()
+    if first is None:
+        return 0
+
+    condition = f" AND ({where})" if where else ''
+    query = f"UPDATE {table} SET {assignments} WHERE rowid >= ? AND rowid < ?{condition}"
+    updated = 0
+    for start in range(first, last + 1, batch_size):
+        db.cursor.execute(query, (*params, start, start + batch_size))
+        updated += db.cursor.rowcount
+        db.connection.commit()
+    return updated
+
+
+# Each table's natural key: (index name, key columns, tables and columns referencing its ID).
+# Referencing tables that a database does not have yet are skipped.
+NATURAL_KEYS = {
+    'active_filings': (
+        'idx_active_filings_name_state', ('franchise_name', 'active_state'),
+        [('franchise_metadata', 'active_filing_id'), ('franchise_filings', 'active_filing_id'),
+         ('crawl_journal', 'active_filing_id')]
+    ),
+    'franchise_metadata': (
+        'idx_franchise_metadata_file_number', ('file_number',),
+        [('fdd_metadata', 'franchise_metadata_id'), ('franchise_filings', 'franchise_metadata_id')]
+    ),
+    'fdd_metadata': ('idx_fdd_metadata_url', ('fdd_url',), []),
+}
+
+# Secondary indexes on foreign keys and lookup columns: (index name, table, columns)
+INDEXES = [
+    ('idx_franchise_metadata_active_filing', 'franchise_metadata', ('active_filing_id',)),
+    ('idx_fdd_metadata_franchise_metadata', 'fdd_metadata', ('franchise_metadata_id',)),
+    ('idx_fdd_metadata_sha256', 'fdd_metadata', ('sha256',)),
+]
+
+
+def _merge_duplicates(db, table: str, columns: Sequence[str], references: List[Tuple[str, str]]):
+    """Keep the newest row for each key and point references to the others at it.
+
+    Rows were only ever added, so the one with the highest ID holds the
+    latest values, such as an FDD's current path, size and hash. A
+    reference that now duplicates another row's replaces it.
+    """
+    key_columns = ', '.join(columns)
+    keep = f"SELECT MAX(id) FROM {table} GROUP BY {key_columns}"
+    same_key = ' AND '.join(f"kept.{column} = duplicate.{column}" for column in columns)
+    db.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    tables = {row['name'] for row in db.cursor.fetchall()}
+    for ref_table, ref_column in references:
+        if ref_table not in tables:
+            continue
+        db.cursor.execute(f'''
+        UPDATE OR REPLACE {ref_table} SET {ref_column} = (
+            SELECT MAX(kept.id) FROM {table} kept
+            JOIN {table} duplicate ON {same_key}
+            WHERE duplicate.id = {ref_table}.{ref_column}
+        )
+        WHERE {ref_column} IN (SELECT id FROM {table} WHERE id NOT IN ({keep}))
+        ''')
+    db.cursor.execute(f"DELETE FROM {table} WHERE id NOT IN ({keep})")
+
+
+@migration(1, "create active_filings, franchise_metadata and fdd_metadata")
+def _create_tables(db):
+    db.cursor.execute('''
+    CREATE TABLE IF NOT EXISTS active_filings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        franchise_name TEXT NOT NULL,
+        expiration_date TEXT NOT NULL,
+        active_state TEXT NOT NULL DEFAULT 'wisconsin'
+    )
+    ''')
+    db.cursor.execute('''
+    CREATE TABLE IF NOT EXISTS franchise_metadata (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        active_filing_id INTEGER NOT NULL,
+        file_number TEXT NOT NULL,
+        legal_name TEXT NOT NULL,
+        effective_date TEXT NOT NULL,
+        expiration_date TEXT NOT NULL,
+        status TEXT NOT NULL,
+        address_line1 TEXT,
+        address_line2 TEXT,
+        city TEXT,
+        state TEXT,
+        zip TEXT,
+        wi_webpage_url TEXT,
+        FOREIGN KEY (active_filing_id) REFERENCES active_filings (id)
+    )
+    ''')
+    db.cursor.execute('''
+    CREATE TABLE IF NOT EXISTS fdd_metadata (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        franchise_metadata_id INTEGER NOT NULL,
+        fdd_url TEXT NOT NULL,
+        fdd_file_name TEXT NOT NULL,
+        fdd_file_path TEXT NOT NULL,
+        fdd_file_size INTEGER,
+        fdd_file_download_date TEXT,
+        num_pages INTEGER,
+        FOREIGN KEY (franchise_metadata_id) REFERENCES franchise_metadata (id)
+    )
+    ''')
+
+
+@migration(2, "add fdd_metadata.sha256 for content-addressed storage")
+def _add_fdd_sha256(db):
+    db.cursor.execute("PRAGMA table_info(fdd_metadata)")
+    if 'sha256' not in [row['name'] for row in db.cursor.fetchall()]:
+        db.cursor.execute("ALTER TABLE fdd_metadata ADD COLUMN sha256 TEXT")
+
+
+@migration(3, "add natural-key unique indexes and lookup indexes")
+def _add_natural_keys(db):
+    for table, (index, columns, references) in NATURAL_KEYS.items():
+        db.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (index,))
+        if db.cursor.fetchone():
+            continue
+        # Databases created before the keys existed may hold duplicates
+        _merge_duplicates(db, table, columns, references)
+        create_index(db, index, table, columns, unique=True)
+    for index, table, columns in INDEXES:
+        create_index(db, index, table, columns)
+
+
+@migration(4, "add the fdd_text full-text index of FDD pages")
+def _add_fdd_text(db):
+    # Text is stored once per distinct document and reaches its filings
+    # through fdd_metadata.sha256
+    db.cursor.execute('''
+    CREATE TABLE IF NOT EXISTS fdd_text_documents (
+        sha256 TEXT PRIMARY KEY,
+        num_pages INTEGER NOT NULL,
+        extracted_at TEXT NOT NULL
+    )
+    ''')
+    db.cursor.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS fdd_text USING fts5(
+        text,
+        sha256 UNINDEXED,
+        page_number UNINDEXED,
+        tokenize = 'porter unicode61'
+    )
+    ''')
+
+
+@migration(5, "add franchise_filings linking every active filing to the franchise records it found")
+def _add_franchise_filings(db):
+    # Overlapping searches find the same file number for several filings,
+    # while franchise_metadata.active_filing_id holds only one of them
+    db.cursor.execute('''
+    CREATE TABLE IF NOT EXISTS franchise_filings (
+        active_filing_id INTEGER NOT NULL,
+        franchise_metadata_id INTEGER NOT NULL,
+        PRIMARY KEY (active_filing_id, franchise_metadata_id),
+        FOREIGN KEY (active_filing_id) REFERENCES active_filings (id),
+        FOREIGN KEY (franchise_metadata_id) REFERENCES franchise_metadata (id)
+    ) WITHOUT ROWID
+    ''')
+    db.cursor.execute('''
+    INSERT OR IGNORE INTO franchise_filings (active_filing_id, franchise_metadata_id)
+    SELECT active_filing_id, id FROM franchise_metadata
+    ''')
+    create_index(db, 'idx_franchise_filings_franchise_metadata', 'franchise_filings', ('franchise_metadata_id',))
+
+
+@migration(6, "add crawl_runs and crawl_journal for resumable crawls")
+def _add_crawl_journal(db):
+    # Databases used by earlier versions may already have them, created by the journal itself
+    db.cursor.execute('''
+    CREATE TABLE IF NOT EXISTS crawl_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at TEXT NOT NULL,
+        finished_at TEXT
+    )
+    ''')
+    db.cursor.execute('''
+    CREATE TABLE IF NOT EXISTS crawl_journal (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER NOT NULL,
+        active_filing_id INTEGER NOT NULL,
+        file_number TEXT NOT NULL DEFAULT '',
+        stage TEXT NOT NULL,
+        payload TEXT,
+        updated_at TEXT NOT NULL,
+        UNIQUE (run_id, active_filing_id, file_number, stage),
+        FOREIGN KEY (run_id) REFERENCES crawl_runs (id)
+    )
+    ''')
@@ -1,161 +1,258 @@
+import argparse
 import asyncio
 import os
+import sqlite3
 import sys
 from typing import List, Dict, Any, Optional
 import datetime
 
-from src.config import DB_PATH
+from src.config import DB_PATH, DETAILS_BACKEND
+from src.db.async_database import AsyncDatabase
 from src.db.database import Database
+from src.db.journal import CrawlJournal
 from src.scrapers.active_filings import scrape_active_filings
-from src.scrapers.franchise_data import scrape_franchise_data
-from src.scrapers.fdd_downloader import download_fdd
+from src.scrapers.franchise_data import create_franchise_scraper
+from src.scrapers.fdd_downloader import FDDDownloader
+from src.scrapers.session_bridge import SessionBridge
+from src.pipeline import Pipeline
+from src.utils.http_cache import get_response_cache
+from src.utils.pdf_utils import PdfProcessor
+from src.utils.snapshot_store import close_snapshot_writer
 
 
-async def process_active_filings() -> List[Dict[str, Any]]:
+async def process_active_filings() -> int:
     """Scrape and store active filings.
     
     Returns:
-        list: List of active filings
+        int: Number of active filings scraped
     """
     print("Scraping active filings...")
     filings, html_path = await scrape_active_filings()
-    print(f"Found {len(filings)} active filings. HTML saved to {html_path}")
+    print(f"Found {len(filings)} active filings. HTML archived as {html_path}")
     
     # Store active filings in the database
     with Database(DB_PATH) as db:
         db.initialize_database()
         
-        # Insert each filing
-        for filing in filings:
-            db.insert_active_filing(
-                franchise_name=filing['franchise_name'],
-                expiration_date=filing['expiration_date'],
-                active_state=filing['active_state']
-            )
-        
-        # Return all active filings with IDs
-        return db.get_all_active_filings()
+        # Insert all filings in one transaction
+        db.insert_active_filings_bulk(filings)
+    
+    return len(filings)
 
 
-async def process_franchise_data(active_filings: List[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
-    """Process franchise data for each active filing.
+def find_unfinished_run() -> Optional[int]:
+    """Find the most recent crawl that was interrupted.
+    
+    Returns:
+        int: ID of the run or None if every run finished
+    """
+    with Database(DB_PATH) as db:
+        db.initialize_database()
+        return CrawlJournal(db).resume_run()
+
+
+async def run_pipeline(incremental: bool = False, verify_files: bool = False,
+                       resume: bool = False) -> Dict[str, int]:
+    """Search, scrape details and download FDDs for every stored active filing.
+    
+    Filings are streamed from the database as the pipeline has room for
+    them, so memory use does not grow with the number of filings.
     
     Args:
-        active_filings (list): List of active filings
+        incremental (bool): Only fetch details and FDDs for new or missing file numbers
+        verify_files (bool): In incremental mode, re-download FDDs whose file is
+            missing or has the wrong size
+        resume (bool): Finish the last interrupted run from its journal instead
         
     Returns:
-        dict: Dictionary mapping active filing IDs to franchise metadata
+        dict: Number of items that completed each pipeline stage
     """
-    results = {}
-    
-    with Database(DB_PATH) as db:
-        for filing in active_filings:
-            franchise_name = filing['franchise_name']
-            active_filing_id = filing['id']
-            
-            print(f"Processing franchise: {franchise_name}")
-            franchise_data = await scrape_franchise_data(franchise_name)
-            
-            if not franchise_data:
-                print(f"No data found for franchise: {franchise_name}")
-                continue
-            
-            # Store franchise metadata in the database
-            franchise_metadata_ids = []
-            for data in franchise_data:
-                # Insert franchise metadata
-                metadata_id = db.insert_franchise_metadata(
-                    active_filing_id=active_filing_id,
-                    file_number=data['file_number'],
-                    legal_name=data['legal_name'],
-                    effective_date=data['effective_date'],
-                    expiration_date=data['expiration_date'],
-                    status=data['status'],
-                    address_line1=data.get('address_line1'),
-                    address_line2=data.get('address_line2'),
-                    city=data.get('city'),
-                    state=data.get('state'),
-                    zip_code=data.get('zip'),
-                    wi_webpage_url=data.get('wi_webpage_url')
+    with Database(DB_PATH) as db, AsyncDatabase(DB_PATH) as async_db, PdfProcessor() as pdf_processor:
+        journal = CrawlJournal(db)
+        # The downloader continues the session the searches establish
+        session = SessionBridge()
+        scraper = create_franchise_scraper(session=session)
+        try:
+            async with FDDDownloader(session=session) as downloader:
+                pipeline = Pipeline(
+                    db, scraper, downloader, pdf_processor,
+                    incremental=incremental, verify_files=verify_files, journal=journal,
+                    async_db=async_db,
+                    # Details pages over the downloader's client leave only the POST for the download
+                    details_scraper=downloader if DETAILS_BACKEND == 'http' else None
+                )
+                if resume and journal.resume_run() is not None:
+                    return await pipeline.resume()
+                return await pipeline.run(
+                    db.iter_active_filings(columns=('franchise_name', 'expiration_date'))
                 )
-                data['metadata_id'] = metadata_id
-                franchise_metadata_ids.append(metadata_id)
-            
-            # Store the results
-            results[active_filing_id] = franchise_data
+        finally:
+            await scraper.close()
+
+
+async def index_fdd_text() -> int:
+    """Add stored FDDs whose text is not yet indexed to the full-text index.
     
-    return results
+    Returns:
+        int: Number of distinct documents indexed
+    """
+    indexed = 0
+    with Database(DB_PATH) as db, PdfProcessor() as pdf_processor:
+        db.initialize_database()
+        fdds = db.iter_rows('fdd_metadata', ('fdd_file_path', 'sha256'), [
+            "sha256 IS NOT NULL",
+            "sha256 NOT IN (SELECT sha256 FROM fdd_text_documents)"
+        ])
+        
+        async def index(fdd):
+            pages = await pdf_processor.extract_text(fdd['fdd_file_path'])
+            if pages is not None:
+                db.insert_fdd_text(fdd['sha256'], pages)
+            return pages is not None
+        
+        # Keep every worker busy, one document per hash
+        seen = set()
+        batch = []
+        for fdd in fdds:
+            if fdd['sha256'] in seen:
+                continue
+            seen.add(fdd['sha256'])
+            batch.append(index(fdd))
+            if len(batch) >= max(1, pdf_processor.workers) * 2:
+                indexed += sum(await asyncio.gather(*batch))
+                batch = []
+        indexed += sum(await asyncio.gather(*batch))
+    return indexed
 
 
-def process_fdd_downloads(franchise_data_by_filing: Dict[int, List[Dict[str, Any]]]):
-    """Download and process FDD documents.
+def search_fdd_text(query: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """Search the full-text index of downloaded FDDs.
     
     Args:
-        franchise_data_by_filing (dict): Dictionary mapping active filing IDs to franchise metadata
+        query (str): Search terms, quoted for FTS5 by ``fts_query``
+        limit (int): Most matching pages to return
+        
+    Returns:
+        list: Ranked (franchise, page) hits
+        
+    Raises:
+        sqlite3.OperationalError: If the search is not a valid query, such as a lone ``OR``
     """
     with Database(DB_PATH) as db:
-        for active_filing_id, franchise_data_list in franchise_data_by_filing.items():
-            for franchise_data in franchise_data_list:
-                franchise_name = franchise_data.get('trade_name', 'Unknown')
-                fdd_url = franchise_data.get('fdd_url')
-                metadata_id = franchise_data.get('metadata_id')
-                
-                if not fdd_url or not metadata_id:
-                    print(f"Missing URL or metadata ID for franchise: {franchise_name}")
-                    continue
-                
-                print(f"Downloading FDD for franchise: {franchise_name}")
-                fdd_metadata = download_fdd(fdd_url, franchise_data)
-                
-                if not fdd_metadata:
-                    print(f"Failed to download FDD for franchise: {franchise_name}")
-                    continue
-                
-                # Insert FDD metadata
-                db.insert_fdd_metadata(
-                    franchise_metadata_id=metadata_id,
-                    fdd_url=fdd_metadata['fdd_url'],
-                    fdd_file_name=fdd_metadata['fdd_file_name'],
-                    fdd_file_path=fdd_metadata['fdd_file_path'],
-                    fdd_file_size=fdd_metadata['fdd_file_size'],
-                    fdd_file_download_date=fdd_metadata['fdd_file_download_date'],
-                    num_pages=fdd_metadata['num_pages']
-                )
-                
-                print(f"Successfully processed FDD for franchise: {franchise_name}")
-                
-                # Sleep to avoid overloading the server
-                import time
-                time.sleep(2)
+        db.initialize_database()
+        return db.search_fdd_text(query, limit)
 
 
-async def main():
-    """Main application entry point."""
+async def main(incremental: bool = False, verify_files: bool = False, resume: bool = False):
+    """Main application entry point.
+    
+    Args:
+        incremental (bool): Skip filings and file numbers whose FDDs are already stored
+        verify_files (bool): Also check stored FDDs are on disk with the recorded size
+        resume (bool): Continue the last interrupted run instead of starting a new one
+    """
     try:
         print("Starting FDD WebScrape...")
         
-        # Step 1: Process active filings
-        active_filings = await process_active_filings()
+        run_id = find_unfinished_run() if resume else None
+        if run_id is not None:
+            # The interrupted run's filings and progress come from its journal
+            print(f"Resuming interrupted run {run_id}...")
+        else:
+            if resume:
+                print("No interrupted run to resume, starting a new run")
+            # Step 1: Process active filings
+            await process_active_filings()
         
-        # Step 2: Process franchise data
-        franchise_data_by_filing = await process_franchise_data(active_filings)
-        
-        # Step 3: Download and process FDD documents
-        process_fdd_downloads(franchise_data_by_filing)
+        # Step 2: Search franchises, scrape details and download FDDs as one pipeline
+        stats = await run_pipeline(
+            incremental=incremental, verify_files=verify_files, resume=run_id is not None
+        )
         
+        if run_id is not None:
+            print(f"Resumed {stats['resumed']} items past the search stage")
+        if incremental:
+            print(f"Skipped {stats['skipped']} filings whose FDDs are already stored")
+        if stats['linked']:
+            print(f"Linked {stats['linked']} search results to franchise records already fetched this run")
+        print(f"Searched {stats['searched']} franchises, stored {stats['details']} franchise records, "
+              f"downloaded {stats['downloaded']} FDDs, processed {stats['processed']} "
+              f"and indexed the text of {stats['indexed']}")
+        cache = get_response_cache()
+        if cache:
+            print(f"Response cache: {cache.stats['hits']} hits, {cache.stats['revalidated']} revalidated, "
+                  f"{cache.stats['misses']} misses, {cache.stats['evicted']} evicted")
         print("FDD WebScrape completed successfully!")
     
     except Exception as e:
         print(f"Error running the application: {e}")
         sys.exit(1)
+    
+    finally:
+        # Write out any HTML snapshots still queued
+        close_snapshot_writer()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments.
+    
+    Args:
+        argv (list, optional): Arguments to parse, defaults to sys.argv
+        
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Scrape Wisconsin franchise filings and download their FDDs.")
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help="only fetch details and FDDs for file numbers not already in the database"
+    )
+    parser.add_argument(
+        '--verify-files', action='store_true',
+        help="with --incremental, re-download FDDs whose file is missing or has the wrong size"
+    )
+    parser.add_argument(
+        '--resume', action='store_true',
+        help="continue the last interrupted run from its journal instead of starting over"
+    )
+    parser.add_argument(
+        '--index-text', action='store_true',
+        help="only add stored FDDs missing from the full-text index to it, without scraping"
+    )
+    parser.add_argument(
+        '--search', metavar='QUERY',
+        help="only search the full-text index of downloaded FDDs and print the best matching pages"
+    )
+    args = parser.parse_args(argv)
+    if args.verify_files:
+        args.incremental = True
+    return args
 
 
 def main_entry():
     """Entry point for console script."""
+    args = parse_args()
+    
+    if args.search:
+        try:
+            hits = search_fdd_text(args.search)
+        except sqlite3.OperationalError as e:
+            print(f"Invalid search query {args.search!r}: {e}")
+            sys.exit(1)
+        for hit in hits:
+            print(f"{hit['franchise_name']} ({hit['file_number']}) page {hit['page_number']}: {hit['snippet']}")
+        return
+    
     # Create event loop
     loop = asyncio.get_event_loop()
     try:
-        loop.run_until_complete(main())
+        if args.index_text:
+            indexed = loop.run_until_complete(index_fdd_text())
+            print(f"Indexed the text of {indexed} FDDs")
+            return
+        loop.run_until_complete(main(
+            incremental=args.incremental, verify_files=args.verify_files, resume=args.resume
+        ))
     finally:
         loop.close()
 
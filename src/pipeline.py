@@ -0,0 +1,493 @@
+import asyncio
+import os
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.config import PIPELINE_QUEUE_SIZE, PIPELINE_DETAILS_WORKERS
+from src.db.async_database import AsyncDatabase, DatabaseCall
+from src.db.database import Database
+from src.db.journal import CrawlJournal, SEARCHED, DETAILS, DOWNLOADED, PROCESSED
+from src.scrapers.fdd_downloader import FDDDownloader
+from src.scrapers.franchise_data import FranchiseDataScraper, combine_search_and_details
+from src.utils.pdf_utils import PdfProcessor
+from src.utils.throttling import host_limiter
+
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+def _search_key(franchise_name: str) -> str:
+    """Normalize a franchise name so searches differing only in case or spacing are shared."""
+    return ' '.join(franchise_name.split()).casefold()
+
+
+StageHandler = Callable[[Dict[str, Any]], Awaitable[Optional[List[Dict[str, Any]]]]]
+
+
+class Pipeline:
+    """Staged producer/consumer crawl: filings -> search -> details -> download -> post-processing -> text index.
+
+    Each stage has its own pool of workers and hands items to the next stage
+    through a bounded queue, so downloads start as soon as the first search
+    finishes and a slow stage applies backpressure to the ones before it
+    instead of letting work pile up in memory.
+    """
+
+    def __init__(self, db: Database, scraper: FranchiseDataScraper, downloader: FDDDownloader,
+                 pdf_processor: PdfProcessor,
+                 search_workers: Optional[int] = None,
+                 details_workers: int = PIPELINE_DETAILS_WORKERS,
+                 download_workers: Optional[int] = None,
+                 postprocess_workers: Optional[int] = None,
+                 index_workers: Optional[int] = None,
+                 queue_size: int = PIPELINE_QUEUE_SIZE,
+                 incremental: bool = False,
+                 verify_files: bool = False,
+                 journal: Optional[CrawlJournal] = None,
+                 async_db: Optional[AsyncDatabase] = None,
+                 details_scraper: Optional[Any] = None):
+        """Initialize the pipeline.
+
+        Args:
+            db (Database): Open database connection results are written to without ``async_db``
+            scraper (FranchiseDataScraper): Scraper used for searches and details pages
+            downloader (FDDDownloader): Downloader used for FDD documents
+            pdf_processor (PdfProcessor): Worker pool that analyzes downloaded PDFs
+            search_workers (int, optional): Search workers, defaults to the scraper's concurrency
+            details_workers (int): Details page workers
+            download_workers (int, optional): Download workers, defaults to the downloader's concurrency
+            postprocess_workers (int, optional): PDFs in flight to the processor,
+                defaults to its number of workers
+            index_workers (int, optional): PDFs in flight to the processor for
+                text extraction, defaults to its number of workers
+            queue_size (int): Capacity of each queue between stages
+            incremental (bool): Skip file numbers that already have a stored FDD,
+                and filings whose file numbers all do, without any network requests
+            verify_files (bool): In incremental mode, only count an FDD as stored
+                if its file is on disk with the recorded size
+            journal (CrawlJournal, optional): Journal recording each item's
+                progress, which makes the run resumable after a crash
+            async_db (AsyncDatabase, optional): Writer thread and reader
+                connections the stages use instead of ``db``, so database
+                work never blocks the event loop
+            details_scraper (optional): Anything with ``get_franchise_details``
+                used for details pages instead of ``scraper``. Passing the
+                downloader fetches each page once over HTTP and reuses its
+                download form for the FDD.
+        """
+        self.db = db
+        self.scraper = scraper
+        self.downloader = downloader
+        self.details_scraper = details_scraper or scraper
+        self.pdf_processor = pdf_processor
+        self.search_workers = search_workers or scraper.concurrency
+        self.details_workers = details_workers
+        self.download_workers = download_workers or downloader.concurrency
+        self.postprocess_workers = postprocess_workers or max(1, pdf_processor.workers)
+        self.index_workers = index_workers or max(1, pdf_processor.workers)
+        self.queue_size = queue_size
+        self.incremental = incremental
+        self.verify_files = verify_files
+        self.journal = journal
+        self.async_db = async_db
+        self._downloaded: Dict[str, Dict[str, Any]] = {}
+        self._filing_file_numbers: Dict[tuple, set] = {}
+        # The search in flight for each normalized name and how many filings
+        # wait on it, and for each file ID the franchise record its first
+        # details fetch stores
+        self._searches: Dict[str, asyncio.Future] = {}
+        self._search_waiters: Counter = Counter()
+        self._claims: Dict[str, asyncio.Future] = {}
+        # Hashes of the documents the index stage has taken this run
+        self._indexing: set = set()
+        self.stats = {
+            'filings': 0,
+            'resumed': 0,
+            'skipped': 0,
+            'searched': 0,
+            'details': 0,
+            'downloaded': 0,
+            'processed': 0,
+            'indexed': 0,
+            'shared_searches': 0,
+            'linked': 0,
+            'errors': 0
+        }
+
+    async def run(self, filings: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Run every filing through all stages.
+
+        Args:
+            filings (iterable): Active filings with ``id`` and ``franchise_name``,
+                read only as the search stage has room for them
+
+        Returns:
+            dict: Number of items that completed each stage
+        """
+        if self.journal:
+            self.journal.start_run(filings)
+            filings = self.journal.iter_queued()
+        return await self._run(('search', filing) for filing in filings)
+
+    async def resume(self) -> Dict[str, int]:
+        """Finish the journal's current run, starting each item at its first incomplete stage.
+
+        Returns:
+            dict: Number of items that completed each stage
+        """
+        return await self._run(self.journal.pending_work())
+
+    async def _run(self, work: Iterable[Tuple[str, Dict[str, Any]]]) -> Dict[str, int]:
+        """Feed work items to their stages and wait for every stage to drain."""
+        if self.incremental:
+            self._downloaded = await self._read(Database.get_downloaded_fdds)
+            self._filing_file_numbers = await self._read(Database.get_filing_file_numbers)
+
+        queues = {
+            'search': asyncio.Queue(maxsize=self.queue_size),
+            'details': asyncio.Queue(maxsize=self.queue_size),
+            'download': asyncio.Queue(maxsize=self.queue_size),
+            'postprocess': asyncio.Queue(maxsize=self.queue_size),
+            'index': asyncio.Queue(maxsize=self.queue_size)
+        }
+
+        tasks = [
+            asyncio.ensure_future(self._feed(work, queues)),
+            asyncio.ensure_future(self._run_stage(
+                self.search, queues['search'], self.search_workers,
+                queues['details'], self.details_workers
+            )),
+            asyncio.ensure_future(self._run_stage(
+                self.fetch_details, queues['details'], self.details_workers,
+                queues['download'], self.download_workers
+            )),
+            asyncio.ensure_future(self._run_stage(
+                self.download, queues['download'], self.download_workers,
+                queues['postprocess'], self.postprocess_workers
+            )),
+            asyncio.ensure_future(self._run_stage(
+                self.postprocess, queues['postprocess'], self.postprocess_workers,
+                queues['index'], self.index_workers
+            )),
+            asyncio.ensure_future(self._run_stage(
+                self.index_text, queues['index'], self.index_workers
+            ))
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # Runs with failed items stay resumable so a restart retries them.
+        # Scrapers report most failures by returning nothing, which the
+        # stages count as errors just like the exceptions they catch.
+        if self.journal and not self.stats['errors']:
+            self.journal.finish_run()
+        return self.stats
+
+    async def _feed(self, work: Iterable[Tuple[str, Dict[str, Any]]], queues: Dict[str, asyncio.Queue]):
+        """Put every work item on its stage's queue, then one end marker per search worker.
+
+        Resumed items are queued before the search stage can finish, so the
+        end markers each stage passes on always arrive after them.
+        """
+        for stage, item in work:
+            await queues[stage].put(item)
+            if stage == 'search':
+                self.stats['filings'] += 1
+            else:
+                self.stats['resumed'] += 1
+        for _ in range(self.search_workers):
+            await queues['search'].put(_DONE)
+
+    async def _run_stage(self, handler: StageHandler, inbox: asyncio.Queue, workers: int,
+                         outbox: Optional[asyncio.Queue] = None, downstream_workers: int = 0):
+        """Run a stage's workers until its input is exhausted.
+
+        Args:
+            handler (callable): Coroutine turning one item into a list of items for the next stage
+            inbox (asyncio.Queue): Queue the stage reads from
+            workers (int): Number of concurrent workers
+            outbox (asyncio.Queue, optional): Queue of the next stage
+            downstream_workers (int): Workers of the next stage, each of which needs an end marker
+        """
+        async def worker():
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    return
+                try:
+                    results = await handler(item)
+                except Exception as e:
+                    print(f"Error in {handler.__name__} stage: {e}")
+                    self.stats['errors'] += 1
+                    continue
+                if outbox is not None:
+                    for result in results or []:
+                        await outbox.put(result)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        if outbox is not None:
+            for _ in range(downstream_workers):
+                await outbox.put(_DONE)
+
+    def is_downloaded(self, file_number: str) -> bool:
+        """Check whether a file number's FDD was stored by an earlier run.
+
+        Args:
+            file_number (str): Franchise file number
+
+        Returns:
+            bool: True if the FDD is recorded (and, when verifying, on disk
+                with the recorded size)
+        """
+        fdd = self._downloaded.get(file_number)
+        if fdd is None:
+            return False
+        if not self.verify_files:
+            return True
+        try:
+            size = os.path.getsize(fdd['fdd_file_path'])
+        except OSError:
+            return False
+        return fdd['fdd_file_size'] is None or size == fdd['fdd_file_size']
+
+    async def search(self, filing: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Search for an active filing's franchise.
+
+        Args:
+            filing (dict): Active filing
+
+        Returns:
+            list: Registered search results tagged with the active filing ID
+        """
+        franchise_name = filing['franchise_name']
+
+        if self.incremental:
+            known = self._filing_file_numbers.get((franchise_name, filing.get('expiration_date')))
+            if known and all(self.is_downloaded(file_number) for file_number in known):
+                self.stats['skipped'] += 1
+                await self._record(filing['id'], SEARCHED, [])
+                return []
+
+        print(f"Processing franchise: {franchise_name}")
+        key = _search_key(franchise_name)
+        search = self._searches.get(key)
+        if search is None:
+            search = asyncio.ensure_future(self.scraper.search_franchise(franchise_name))
+            self._searches[key] = search
+        else:
+            self.stats['shared_searches'] += 1
+        self._search_waiters[key] += 1
+        try:
+            search_results = await asyncio.shield(search)
+        finally:
+            # Results are only kept while some filing still waits for them
+            self._search_waiters[key] -= 1
+            if not self._search_waiters[key]:
+                del self._search_waiters[key]
+                if self._searches.get(key) is search:
+                    del self._searches[key]
+
+        # Filings without results are journaled too, so a resumed run does not search them again
+        if not search_results:
+            print(f"No data found for franchise: {franchise_name}")
+            await self._record(filing['id'], SEARCHED, [])
+            return []
+
+        self.stats['searched'] += 1
+        if self.incremental:
+            new_results = [result for result in search_results if not self.is_downloaded(result['file_number'])]
+            if len(new_results) < len(search_results):
+                print(f"Skipping {len(search_results) - len(new_results)} stored FDDs for franchise: {franchise_name}")
+            search_results = new_results
+        results = [{**result, 'active_filing_id': filing['id']} for result in search_results]
+        await self._record(filing['id'], SEARCHED, results)
+        return results
+
+    async def fetch_details(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fetch a search result's details page and store its franchise metadata.
+
+        Each file ID is fetched at most once per run. When another filing's
+        search found it first, this filing is linked to that franchise record
+        instead, once it has been stored.
+
+        Args:
+            result (dict): Search result
+
+        Returns:
+            list: The combined franchise data with its ``metadata_id``, or
+                nothing if the result was linked to an existing record
+        """
+        file_id = result['file_id']
+        while file_id in self._claims:
+            metadata_id = await asyncio.shield(self._claims[file_id])
+            if metadata_id is not None:
+                await self._write(Database.link_franchise_filing, result['active_filing_id'], metadata_id)
+                self.stats['linked'] += 1
+                await self._record(
+                    result['active_filing_id'], PROCESSED, {'linked_to': metadata_id}, result['file_number']
+                )
+                return []
+            # The first fetch failed, so take it over unless another filing already has claimed it
+
+        claim = asyncio.get_event_loop().create_future()
+        self._claims[file_id] = claim
+        data = None
+        try:
+            data = await self._fetch_details(result)
+        finally:
+            if data is None:
+                del self._claims[file_id]
+            claim.set_result(data['metadata_id'] if data else None)
+        return [data] if data else []
+
+    async def _fetch_details(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Fetch and store the details of a search result that no other filing claimed."""
+        async with host_limiter.acquire(result['details_url']):
+            details = await self.details_scraper.get_franchise_details(result['details_url'])
+        if not details:
+            print(f"Failed to fetch details for file number: {result['file_number']}")
+            self.stats['errors'] += 1
+            return None
+
+        data = combine_search_and_details(result, details)
+        data['metadata_id'] = await self._write(
+            Database.insert_franchise_metadata,
+            active_filing_id=data['active_filing_id'],
+            file_number=data['file_number'],
+            legal_name=data['legal_name'],
+            effective_date=data['effective_date'],
+            expiration_date=data['expiration_date'],
+            status=data['status'],
+            address_line1=data.get('address_line1'),
+            address_line2=data.get('address_line2'),
+            city=data.get('city'),
+            state=data.get('state'),
+            zip_code=data.get('zip'),
+            wi_webpage_url=data.get('wi_webpage_url')
+        )
+        self.stats['details'] += 1
+        # A resumed download fetches a fresh view state instead
+        journaled = {key: value for key, value in data.items() if key != 'download_form'}
+        await self._record(data['active_filing_id'], DETAILS, journaled, data['file_number'])
+        return data
+
+    async def download(self, franchise_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Download a franchise's FDD and store its metadata.
+
+        Args:
+            franchise_data (dict): Franchise data with ``fdd_url`` and ``metadata_id``
+
+        Returns:
+            list: The stored FDD, ready for post-processing
+        """
+        franchise_name = franchise_data.get('trade_name', 'Unknown')
+        fdd_url = franchise_data.get('fdd_url')
+        metadata_id = franchise_data.get('metadata_id')
+
+        if not fdd_url or not metadata_id:
+            print(f"Missing URL or metadata ID for franchise: {franchise_name}")
+            return []
+
+        print(f"Downloading FDD for franchise: {franchise_name}")
+        fdd_metadata = await self.downloader.download_fdd(fdd_url, franchise_data)
+
+        if not fdd_metadata:
+            print(f"Failed to download FDD for franchise: {franchise_name}")
+            self.stats['errors'] += 1
+            return []
+
+        # An identical document stored earlier has already been analyzed
+        known = None
+        if fdd_metadata.get('sha256'):
+            known = await self._read(Database.get_fdd_by_sha256, fdd_metadata['sha256'])
+        num_pages = known['num_pages'] if known else None
+
+        fdd_id = await self._write(
+            Database.insert_fdd_metadata,
+            franchise_metadata_id=metadata_id,
+            fdd_url=fdd_metadata['fdd_url'],
+            fdd_file_name=fdd_metadata['fdd_file_name'],
+            fdd_file_path=fdd_metadata['fdd_file_path'],
+            fdd_file_size=fdd_metadata['fdd_file_size'],
+            fdd_file_download_date=fdd_metadata['fdd_file_download_date'],
+            num_pages=num_pages,
+            sha256=fdd_metadata.get('sha256')
+        )
+        self.stats['downloaded'] += 1
+        fdd = {
+            **fdd_metadata,
+            'fdd_id': fdd_id,
+            'trade_name': franchise_name,
+            'active_filing_id': franchise_data['active_filing_id'],
+            'file_number': franchise_data['file_number']
+        }
+        await self._record(fdd['active_filing_id'], DOWNLOADED, fdd, fdd['file_number'])
+        if num_pages is not None:
+            print(f"Reusing stored analysis of identical FDD for franchise: {franchise_name}")
+            await self._record(fdd['active_filing_id'], PROCESSED, {'num_pages': num_pages}, fdd['file_number'])
+            return []
+        return [fdd]
+
+    async def postprocess(self, fdd: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Analyze a downloaded FDD in the PDF worker pool and store the result.
+
+        Args:
+            fdd (dict): Stored FDD with ``fdd_id`` and ``fdd_file_path``
+
+        Returns:
+            list: The FDD for the index stage if it has a content hash
+        """
+        pdf_metadata = await self.pdf_processor.analyze(fdd['fdd_file_path'])
+        await self._write(Database.update_fdd_page_count, fdd['fdd_id'], pdf_metadata['num_pages'])
+        self.stats['processed'] += 1
+        await self._record(fdd['active_filing_id'], PROCESSED, pdf_metadata, fdd['file_number'])
+        print(f"Successfully processed FDD for franchise: {fdd['trade_name']}")
+        return [fdd] if fdd.get('sha256') else []
+
+    async def index_text(self, fdd: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Extract a processed FDD's text in the PDF worker pool and add it to the full-text index.
+
+        The index is not journaled: an FDD whose run stops before this stage
+        is picked up by ``--index-text``.
+
+        Args:
+            fdd (dict): Processed FDD with ``sha256`` and ``fdd_file_path``
+
+        Returns:
+            list: Nothing; this is the last stage
+        """
+        # Documents are indexed once per distinct content
+        sha256 = fdd['sha256']
+        if sha256 in self._indexing:
+            return []
+        self._indexing.add(sha256)
+        if await self._read(Database.is_fdd_text_indexed, sha256):
+            return []
+        pages = await self.pdf_processor.extract_text(fdd['fdd_file_path'])
+        if pages is not None:
+            await self._write(Database.insert_fdd_text, sha256, pages)
+            self.stats['indexed'] += 1
+        return []
+
+    async def _write(self, fn: DatabaseCall, *args, **kwargs) -> Any:
+        """Run a database write on the writer thread, or on ``db`` without one."""
+        if self.async_db:
+            return await self.async_db.write(fn, *args, **kwargs)
+        return fn(self.db, *args, **kwargs)
+
+    async def _read(self, fn: DatabaseCall, *args, **kwargs) -> Any:
+        """Run a database read on a reader connection, or on ``db`` without one."""
+        if self.async_db:
+            return await self.async_db.read(fn, *args, **kwargs)
+        return fn(self.db, *args, **kwargs)
+
+    async def _record(self, active_filing_id: int, stage: str, payload: Any, file_number: str = ''):
+        """Write a journal entry if this pipeline keeps a journal."""
+        if self.journal:
+            await self._write(
+                lambda db: self.journal.record(active_filing_id, stage, payload, file_number, db=db)
+            )
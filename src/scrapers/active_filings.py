@@ -1,24 +1,36 @@
 import asyncio
 from typing import List, Dict, Any, Optional
 from pyppeteer import launch
-from bs4 import BeautifulSoup
-import pandas as pd
-from datetime import datetime
 
-from src.config import ACTIVE_FILINGS_URL, HEADLESS, TIMEOUT, DEFAULT_NAVIGATION_TIMEOUT
-from src.utils.file_operations import save_html_to_file
+from src.config import ACTIVE_FILINGS_URL, HEADLESS, DEFAULT_NAVIGATION_TIMEOUT
+from src.scrapers.page_loading import PageLoading
+from src.utils.file_operations import save_html_snapshot_async
+from src.utils.html_tables import TableNotFound, iter_table_rows
+from src.utils.http_cache import ResponseCache, get_response_cache
+from src.utils.throttling import rate_limiter
+
+
+# Element showing the filings page is ready to read
+ACTIVE_FILINGS_SELECTOR = '#dgActiveFilings'
 
 
 class ActiveFilingsScraper:
     """Scraper for active franchise filings."""
 
-    def __init__(self, headless: bool = HEADLESS):
+    def __init__(self, headless: bool = HEADLESS, cache: Optional[ResponseCache] = None,
+                 loading: Optional[PageLoading] = None):
         """Initialize the scraper.
         
         Args:
             headless (bool): Whether to run the browser in headless mode
+            cache (ResponseCache, optional): Cache of the rendered filings page,
+                defaults to the process-wide cache if it is enabled
+            loading (PageLoading, optional): Resource blocking and navigation
+                waits, defaults to the ``BROWSER_*`` settings
         """
         self.headless = headless
+        self.cache = cache or get_response_cache()
+        self.loading = loading or PageLoading()
         self.browser = None
         self.page = None
 
@@ -27,6 +39,7 @@ class ActiveFilingsScraper:
         self.browser = await launch(headless=self.headless)
         self.page = await self.browser.newPage()
         await self.page.setDefaultNavigationTimeout(DEFAULT_NAVIGATION_TIMEOUT)
+        await self.loading.prepare(self.page)
 
     async def close(self):
         """Close the browser."""
@@ -39,42 +52,41 @@ class ActiveFilingsScraper:
         """Scrape active filings from the website.
         
         Returns:
-            tuple: List of active filings and the path to the saved HTML file
+            tuple: List of active filings and the reference to the archived HTML
         """
-        if not self.page:
-            await self.initialize()
+        # A recent copy of the page needs no browser
+        content = await asyncio.to_thread(self.cache.get_page, ACTIVE_FILINGS_URL) if self.cache else None
+        if content is None:
+            if not self.page:
+                await self.initialize()
 
-        # Navigate to the active filings page
-        await self.page.goto(ACTIVE_FILINGS_URL, {'timeout': TIMEOUT, 'waitUntil': 'networkidle0'})
+            # Navigate to the active filings page
+            await rate_limiter.call(ACTIVE_FILINGS_URL, lambda: self.loading.goto(
+                self.page, ACTIVE_FILINGS_URL, ACTIVE_FILINGS_SELECTOR
+            ))
 
-        # Get the page content
-        content = await self.page.content()
+            # Get the page content
+            content = await self.page.content()
 
-        # Save the HTML content to a file
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        html_path = save_html_to_file(content, f"active_filings_{timestamp}.html")
+            if self.cache:
+                await asyncio.to_thread(self.cache.put_page, ACTIVE_FILINGS_URL, content)
 
-        # Parse the HTML content to extract active filings
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # Find the table containing active filings
-        filings_table = soup.find('table', {'id': 'dgActiveFilings'})
-        
-        if not filings_table:
+        # Archive the HTML content
+        html_path = await save_html_snapshot_async(content, "active_filings", ACTIVE_FILINGS_URL)
+
+        # Extract active filings from their table
+        filings = []
+        try:
+            for row in iter_table_rows(content, 'dgActiveFilings', base_url=ACTIVE_FILINGS_URL):
+                filing = row.cells
+                # Rename columns to match our database schema
+                filing['franchise_name'] = filing.pop('Franchise Name')
+                filing['expiration_date'] = filing.pop('Expiration Date')
+                filing['active_state'] = 'wisconsin'
+                filings.append(filing)
+        except TableNotFound:
             print("Could not find active filings table")
             return [], html_path
-
-        # Convert HTML table to a DataFrame
-        filings_df = pd.read_html(str(filings_table))[0]
-        
-        # Convert DataFrame to list of dictionaries
-        filings = filings_df.to_dict('records')
-        
-        # Rename columns to match our database schema
-        for filing in filings:
-            filing['franchise_name'] = filing.pop('Franchise Name')
-            filing['expiration_date'] = filing.pop('Expiration Date')
-            filing['active_state'] = 'wisconsin'
         
         return filings, html_path
 
@@ -82,7 +94,7 @@ class ActiveFilingsScraper:
         """Main scrape method.
         
         Returns:
-            tuple: List of active filings and the path to the saved HTML file
+            tuple: List of active filings and the reference to the archived HTML
         """
         try:
             filings, html_path = await self.get_active_filings()
@@ -96,7 +108,7 @@ async def scrape_active_filings() -> tuple[List[Dict[str, Any]], Optional[str]]:
     """Scrape active filings from the website.
     
     Returns:
-        tuple: List of active filings and the path to the saved HTML file
+        tuple: List of active filings and the reference to the archived HTML
     """
     scraper = ActiveFilingsScraper()
     return await scraper.scrape() 
\ No newline at end of file
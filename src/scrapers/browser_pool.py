@@ -0,0 +1,110 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from pyppeteer import launch
+
+from src.config import BROWSER_POOL_SIZE, HEADLESS, DEFAULT_NAVIGATION_TIMEOUT
+from src.scrapers.page_loading import PageLoading
+
+
+class BrowserPool:
+    """A single long-lived browser with a bounded pool of reusable pages."""
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE, headless: bool = HEADLESS,
+                 loading: Optional[PageLoading] = None):
+        """Initialize the pool.
+
+        Args:
+            size (int): Maximum number of pages that can be checked out at once
+            headless (bool): Whether to run the browser in headless mode
+            loading (PageLoading, optional): Prepares each new page, e.g. to
+                block resources. Pages load everything without it.
+        """
+        if size < 1:
+            raise ValueError("Browser pool size must be at least 1")
+        self.size = size
+        self.headless = headless
+        self.loading = loading
+        self.browser = None
+        self._pages: Optional[asyncio.Queue] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+
+    async def start(self):
+        """Launch the browser and open the pool's pages."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.browser:
+                return
+            self.browser = await launch(headless=self.headless)
+            self._pages = asyncio.Queue()
+            for _ in range(self.size):
+                self._pages.put_nowait(await self._new_page())
+
+    async def close(self):
+        """Close the browser and every page in the pool."""
+        if self.browser:
+            await self.browser.close()
+            self.browser = None
+            self._pages = None
+
+    async def _new_page(self):
+        """Open a new page with the default navigation timeout and the pool's loading options applied."""
+        page = await self.browser.newPage()
+        page.setDefaultNavigationTimeout(DEFAULT_NAVIGATION_TIMEOUT)
+        if self.loading:
+            await self.loading.prepare(page)
+        return page
+
+    async def _recycle(self, page):
+        """Replace a page that errored or was closed while checked out.
+
+        Args:
+            page: The page to replace
+
+        Returns:
+            The page to return to the pool
+        """
+        try:
+            if not page.isClosed():
+                await page.close()
+        except Exception:
+            pass
+        try:
+            return await self._new_page()
+        except Exception as e:
+            print(f"Error replacing browser page: {e}")
+            return page
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator:
+        """Check a page out of the pool for the duration of a ``with`` block.
+
+        Waits until a page is free. Pages that raise or get closed while
+        checked out are replaced before they go back into the pool.
+
+        Yields:
+            A pyppeteer page
+        """
+        if not self.browser:
+            await self.start()
+        pages = self._pages
+        page = await pages.get()
+        healthy = True
+        try:
+            yield page
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            if self.browser and (not healthy or page.isClosed()):
+                page = await self._recycle(page)
+            pages.put_nowait(page)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
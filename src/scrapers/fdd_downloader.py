@@ -1,113 +1,241 @@
 import os
 import asyncio
+import hashlib
 import re
-import requests
 from typing import Dict, Any, Optional, Tuple
-from datetime import datetime
-import time
-from urllib.parse import urljoin
 
-from src.config import USER_AGENT, FDD_DIR
+import httpx
+
+from src.config import (
+    USER_AGENT,
+    FDD_DOWNLOAD_CONCURRENCY,
+    FDD_DOWNLOAD_TIMEOUT,
+    DOWNLOAD_CHUNK_SIZE
+)
+from src.scrapers.franchise_data import parse_details_page
+from src.scrapers.session_bridge import SessionBridge
+from src.utils.blob_store import BlobStore
+from src.utils.http_cache import cached_transport
 from src.utils.file_operations import (
     generate_fdd_filename,
     create_fdd_filepath,
-    get_file_size,
-    get_current_date_string
+    get_current_date_string,
+    save_html_snapshot_async
 )
-from src.utils.pdf_utils import get_pdf_page_count
+from src.utils.throttling import RateLimitedTransport
+
+
+# Details pages whose form will be posted must carry a current view state,
+# so they are always fetched from the server rather than the response cache
+_FRESH_PAGE_HEADERS = {'Cache-Control': 'no-cache'}
+
+
+def build_download_form(viewstate: Dict[str, str]) -> Dict[str, str]:
+    """Build the form data that triggers the FDD download on a details page.
+
+    Args:
+        viewstate (dict): ``__VIEWSTATE``, ``__VIEWSTATE<n>`` and
+            ``__VIEWSTATEGENERATOR`` fields of the page, keyed by ID
+
+    Returns:
+        dict: Form data for the download POST request
+    """
+    viewstate_fields = {name: value for name, value in viewstate.items() if name[len('__VIEWSTATE'):].isdigit()}
+
+    # Build the form data for the POST request
+    form_data = {
+        '__VIEWSTATEFIELDCOUNT': str(len(viewstate_fields) + 1) if viewstate_fields else '1',
+        '__VIEWSTATE': viewstate.get('__VIEWSTATE', ''),
+        '__VIEWSTATEGENERATOR': viewstate.get('__VIEWSTATEGENERATOR', ''),
+        '__VIEWSTATEENCRYPTED': '',
+        'upload_downloadFile': 'Download'
+    }
+
+    # Add additional viewstate fields
+    form_data.update(viewstate_fields)
+
+    return form_data
+
+
+def parse_download_form(html: str) -> Dict[str, str]:
+    """Build the form data that triggers the FDD download on a details page.
+
+    The download form requires the VIEWSTATE parameters which are dynamically
+    generated, so they are read from the details page HTML.
+
+    Args:
+        html (str): HTML of the franchise details page
+
+    Returns:
+        dict: Form data for the download POST request
+    """
+    return build_download_form(parse_details_page(html, '').viewstate)
 
 
 class FDDDownloader:
-    """Downloader for Franchise Disclosure Documents."""
-
-    def __init__(self):
-        """Initialize the downloader."""
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Cache-Control': 'max-age=0',
-            'DNT': '1',
-            'Upgrade-Insecure-Requests': '1',
-            'Content-Type': 'application/x-www-form-urlencoded'
-        })
-
-    def download_fdd(self, fdd_url: str, franchise_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Downloader for Franchise Disclosure Documents.
+
+    One pooled HTTP client is shared by every download in a run, and up to
+    ``concurrency`` documents are streamed to disk at the same time. Each
+    document is hashed as it streams and kept once in a content-addressed
+    ``BlobStore``; its readable filename is a link to the blob.
+    """
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None,
+                 concurrency: int = FDD_DOWNLOAD_CONCURRENCY,
+                 blob_store: Optional[BlobStore] = None,
+                 session: Optional[SessionBridge] = None):
+        """Initialize the downloader.
+
+        Args:
+            client (httpx.AsyncClient, optional): Shared HTTP client. If omitted,
+                the downloader creates and owns its own client.
+            concurrency (int): Maximum number of simultaneous downloads
+            blob_store (BlobStore, optional): Where document content is kept,
+                defaults to a store under ``FDD_DIR``
+            session (SessionBridge, optional): Cookie jar shared with the
+                browser, so downloads continue its ASP.NET session
+        """
+        self.client = client
+        self._owns_client = client is None
+        self.concurrency = concurrency
+        self.blob_store = blob_store or BlobStore()
+        self.session = session
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def initialize(self):
+        """Initialize the HTTP client."""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                headers={
+                    'User-Agent': USER_AGENT,
+                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+                    'Accept-Language': 'en-US,en;q=0.9',
+                    'DNT': '1',
+                    'Upgrade-Insecure-Requests': '1'
+                },
+                timeout=FDD_DOWNLOAD_TIMEOUT,
+                follow_redirects=True,
+                transport=cached_transport(RateLimitedTransport(httpx.AsyncHTTPTransport(
+                    limits=httpx.Limits(max_connections=self.concurrency)
+                )))
+            )
+        if self.session:
+            self.session.attach(self.client)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self):
+        """Close the HTTP client if this downloader owns it."""
+        if self.client and self._owns_client:
+            await self.client.aclose()
+            self.client = None
+
+    async def __aenter__(self):
+        await self.initialize()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def get_franchise_details(self, details_url: str) -> Optional[Dict[str, Any]]:
+        """Get detailed information about a franchise with one GET of its details page.
+
+        The page's download form is parsed in the same pass and returned as
+        ``download_form``, so ``download_fdd`` only has to POST it over the
+        same pooled connection instead of loading the page again. The page
+        always comes from the server, since an old view state is rejected.
+
+        Args:
+            details_url (str): URL of the franchise details page
+
+        Returns:
+            dict: Franchise details with ``download_form``, or None if an error occurs
+        """
+        try:
+            if self.client is None:
+                await self.initialize()
+
+            response = await self.client.get(details_url, headers=_FRESH_PAGE_HEADERS)
+            response.raise_for_status()
+            content = response.text
+
+            # Archive the details page
+            file_id = re.search(r'id=(\d+)', details_url).group(1)
+            await save_html_snapshot_async(content, f"franchise_details_{file_id}", details_url)
+
+            page = parse_details_page(content, details_url)
+            return {**page.details, 'download_form': build_download_form(page.viewstate)}
+
+        except Exception as e:
+            print(f"Error getting franchise details: {e}")
+            return None
+
+    async def download_fdd(self, fdd_url: str, franchise_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Download an FDD document.
-        
+
+        Waits for a free download slot, so any number of calls may be
+        scheduled at once. A ``download_form`` in the franchise data, from
+        ``get_franchise_details``, is posted without fetching the details
+        page again.
+
         Args:
             fdd_url (str): URL of the FDD document
             franchise_data (dict): Franchise data
-            
+
         Returns:
             dict: Metadata about the downloaded FDD or None if an error occurs
         """
+        if self.client is None or self._semaphore is None:
+            await self.initialize()
+
+        async with self._semaphore:
+            return await self._download_fdd(fdd_url, franchise_data)
+
+    async def _download_fdd(self, fdd_url: str, franchise_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Download an FDD document while holding a download slot."""
         try:
             # Extract information for the filename
             file_id = franchise_data['file_id']
             franchise_name = franchise_data['trade_name']
             effective_date = franchise_data['effective_date']
             effective_year = effective_date.split('/')[-1]  # Extract year from MM/DD/YYYY
-            
+
             # Generate filename and filepath
             filename = generate_fdd_filename(file_id, franchise_name, effective_year)
             filepath = create_fdd_filepath(filename)
-            
+
             # Ensure directory exists
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            
-            # Get necessary request parameters
-            # The download form requires the VIEWSTATE parameters which are dynamically generated
-            # We need to make an initial request to get these values
-            response = self.session.get(fdd_url)
-            response.raise_for_status()
-            
-            # Extract VIEWSTATE fields
-            viewstate = re.search(r'id="__VIEWSTATE" value="([^"]*)"', response.text)
-            viewstate_generator = re.search(r'id="__VIEWSTATEGENERATOR" value="([^"]*)"', response.text)
-            
-            # Also look for additional viewstate fields
-            viewstate_fields = {}
-            viewstate_count_match = re.search(r'id="__VIEWSTATEFIELDCOUNT" value="([^"]*)"', response.text)
-            if viewstate_count_match:
-                viewstate_count = int(viewstate_count_match.group(1))
-                # Extract each viewstate field
-                for i in range(1, viewstate_count):
-                    field_match = re.search(rf'id="__VIEWSTATE{i}" value="([^"]*)"', response.text)
-                    if field_match:
-                        viewstate_fields[f'__VIEWSTATE{i}'] = field_match.group(1)
-            
-            # Build the form data for the POST request
-            form_data = {
-                '__VIEWSTATEFIELDCOUNT': str(len(viewstate_fields) + 1) if viewstate_fields else '1',
-                '__VIEWSTATE': viewstate.group(1) if viewstate else '',
-                '__VIEWSTATEGENERATOR': viewstate_generator.group(1) if viewstate_generator else '',
-                '__VIEWSTATEENCRYPTED': '',
-                'upload_downloadFile': 'Download'
-            }
-            
-            # Add additional viewstate fields
-            form_data.update(viewstate_fields)
-            
-            # Make the download request
-            download_response = self.session.post(fdd_url, data=form_data, stream=True)
-            download_response.raise_for_status()
-            
-            # Check if the response is a PDF
-            if 'application/pdf' not in download_response.headers.get('Content-Type', ''):
-                print(f"Warning: Response is not a PDF for {franchise_name}")
-                
-            # Save the file
-            with open(filepath, 'wb') as file:
-                for chunk in download_response.iter_content(chunk_size=8192):
-                    file.write(chunk)
-            
-            # Get file metadata
-            file_size = get_file_size(filepath)
+
+            partial_path = f"{filepath}.part"
+            # The view state may come from the details stage; one the server
+            # rejects, with an error status or an HTML error page, is refetched once
+            form_data = franchise_data.get('download_form')
+            for attempt in range(2):
+                if form_data is None or attempt > 0:
+                    # Get the details page to read the download form's VIEWSTATE
+                    response = await self.client.get(fdd_url, headers=_FRESH_PAGE_HEADERS)
+                    response.raise_for_status()
+                    form_data = parse_download_form(response.text)
+
+                # Make the download request and stream it to disk
+                async with self.client.stream('POST', fdd_url, data=form_data) as download_response:
+                    content_type = download_response.headers.get('Content-Type', '')
+                    is_pdf = 'application/pdf' in content_type
+                    if (download_response.is_error or not is_pdf) and attempt == 0:
+                        continue
+                    download_response.raise_for_status()
+                    if not is_pdf:
+                        raise ValueError(f"Response is not a PDF ({content_type or 'no Content-Type'})")
+
+                    sha256, file_size = await self._save_stream(download_response, partial_path)
+                break
+
+            # Keep one copy per distinct document and link the readable name to it
+            await asyncio.to_thread(self._store, partial_path, sha256, filepath)
             download_date = get_current_date_string()
-            num_pages = get_pdf_page_count(filepath)
-            
+
             # Return metadata
             return {
                 'fdd_url': fdd_url,
@@ -115,32 +243,64 @@ class FDDDownloader:
                 'fdd_file_path': filepath,
                 'fdd_file_size': file_size,
                 'fdd_file_download_date': download_date,
-                'num_pages': num_pages
+                'sha256': sha256
             }
-        
+
         except Exception as e:
             print(f"Error downloading FDD for {franchise_data.get('trade_name', 'unknown')}: {e}")
             return None
 
-    def close(self):
-        """Close the session."""
-        if self.session:
-            self.session.close()
+    async def _save_stream(self, response: httpx.Response, partial_path: str) -> Tuple[str, int]:
+        """Stream a response body to disk without blocking the event loop.
+
+        Chunks are hashed and written in a worker thread as they arrive, so
+        the file never has to be read back to learn its size or checksum.
+        The partial file is removed if the transfer fails.
+
+        Args:
+            response (httpx.Response): Open streaming response
+            partial_path (str): Temporary path to write the body to
+
+        Returns:
+            tuple: Hex SHA-256 and size in bytes of the body
+        """
+        digest = hashlib.sha256()
+        size = 0
+
+        def write(chunk: bytes):
+            file.write(chunk)
+            digest.update(chunk)
+
+        file = await asyncio.to_thread(open, partial_path, 'wb')
+        try:
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                await asyncio.to_thread(write, chunk)
+                size += len(chunk)
+        except BaseException:
+            await asyncio.to_thread(file.close)
+            await asyncio.to_thread(os.remove, partial_path)
+            raise
+        await asyncio.to_thread(file.close)
+        return digest.hexdigest(), size
+
+    def _store(self, partial_path: str, sha256: str, filepath: str):
+        """Move a finished download into the blob store and link ``filepath`` to it."""
+        _, added = self.blob_store.add(partial_path, sha256)
+        if not added:
+            print(f"Already have document {sha256[:12]}, linking {os.path.basename(filepath)}")
+        self.blob_store.link(sha256, filepath)
 
 
 # Function to download an FDD
-def download_fdd(fdd_url: str, franchise_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+async def download_fdd(fdd_url: str, franchise_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Download an FDD document.
-    
+
     Args:
         fdd_url (str): URL of the FDD document
         franchise_data (dict): Franchise data
-        
+
     Returns:
         dict: Metadata about the downloaded FDD or None if an error occurs
     """
-    downloader = FDDDownloader()
-    try:
-        return downloader.download_fdd(fdd_url, franchise_data)
-    finally:
-        downloader.close() 
\ No newline at end of file
+    async with FDDDownloader() as downloader:
+        return await downloader.download_fdd(fdd_url, franchise_data)
@@ -1,47 +1,232 @@
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple
+from io import BytesIO
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 import re
-from pyppeteer import launch
-from bs4 import BeautifulSoup
-import pandas as pd
-from datetime import datetime
-import time
+
+from lxml import etree
 
 from src.config import (
     FRANCHISE_SEARCH_URL, 
     FRANCHISE_DETAILS_BASE_URL,
     HEADLESS, 
-    TIMEOUT, 
-    DEFAULT_NAVIGATION_TIMEOUT
+    BROWSER_POOL_SIZE,
+    SEARCH_BACKEND
 )
-from src.utils.file_operations import save_html_to_file
+from src.scrapers.browser_pool import BrowserPool
+from src.scrapers.page_loading import PageLoading
+from src.scrapers.session_bridge import SessionBridge
+from src.utils.file_operations import save_html_snapshot_async
+from src.utils.html_tables import TableNotFound, iter_table_rows
+from src.utils.http_cache import ResponseCache, get_response_cache
+from src.utils.throttling import host_limiter, rate_limiter
+
+
+# ID and hash of a filing in its Details link
+_DETAILS_LINK_RE = re.compile(r'id=(\d+)&hash=(\d+)')
+
+# Elements showing each page is ready to read. The results page always
+# renders the search box again, so a search without results does not
+# wait for a grid that never comes.
+SEARCH_FORM_SELECTOR = '#txtName'
+SEARCH_RESULTS_SELECTOR = '#grdSearchResults, #txtName'
+DETAILS_SELECTOR = '#lblFranchiseAddressLine1'
+
+
+def parse_search_results(content: str, franchise_name: str) -> Optional[List[Dict[str, Any]]]:
+    """Extract the registered rows from a MainSearch.aspx results page.
+    
+    Args:
+        content (str): HTML of the search results page
+        franchise_name (str): Name of the franchise that was searched for
+        
+    Returns:
+        list: List of search results or None if the results table is missing
+    """
+    try:
+        rows = iter_table_rows(content, 'grdSearchResults', base_url=FRANCHISE_SEARCH_URL)
+        results = []
+        for row in rows:
+            cells = row.cells
+            if cells.get('Status') != 'Registered':
+                continue
+            
+            # The Details link carries the ID and hash of the filing
+            for href in row.links.values():
+                match = _DETAILS_LINK_RE.search(href)
+                if match and match.group(1) == cells.get('File Number'):
+                    break
+            else:
+                continue
+            
+            file_id, hash_value = match.groups()
+            results.append({
+                'file_number': cells['File Number'],
+                'legal_name': cells.get('Legal Name'),
+                'trade_name': cells.get('Trade Name'),
+                'effective_date': cells.get('Effective Date'),
+                'expiration_date': cells.get('Expiration Date'),
+                'status': cells['Status'],
+                'details_url': f"{FRANCHISE_DETAILS_BASE_URL}?id={file_id}&hash={hash_value}&search=external&type=GENERAL",
+                'file_id': file_id,
+                'hash': hash_value
+            })
+    except TableNotFound:
+        print(f"No results found for franchise: {franchise_name}")
+        return None
+    
+    return results
+
+
+# Address labels of a details.aspx page and the keys they are stored under
+_ADDRESS_LABELS = {
+    'lblFranchiseAddressLine1': 'address_line1',
+    'lblFranchiseAddressLine2': 'address_line2',
+    'lblFranchiseCity': 'city',
+    'lblFranchiseState': 'state',
+    'lblFranchiseZip': 'zip',
+}
+
+# Hidden ASP.NET state fields a details page's download form posts back
+_VIEWSTATE_FIELD_RE = re.compile(r'__VIEWSTATE(\d*|GENERATOR)$')
+
+
+class DetailsPage(NamedTuple):
+    """What a details.aspx page holds.
+
+    Attributes:
+        details: Franchise details, as returned by ``parse_franchise_details``
+        viewstate: ``__VIEWSTATE``, ``__VIEWSTATE<n>`` and ``__VIEWSTATEGENERATOR``
+            hidden fields keyed by ID, which the FDD download form posts back
+    """
+    details: Dict[str, Any]
+    viewstate: Dict[str, str]
+
+
+def parse_details_page(content: str, details_url: str) -> DetailsPage:
+    """Read the franchisor address and the download form's view state from a details.aspx page.
+
+    Both come out of a single incremental lxml pass over the page, so the
+    same response serves the details stage and the FDD download.
+
+    Args:
+        content (str): HTML of the franchise details page
+        details_url (str): URL of the franchise details page
+
+    Returns:
+        DetailsPage: Franchise details and view state fields
+    """
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    labels = {}
+    viewstate = {}
+    events = etree.iterparse(BytesIO(data), events=('end',), tag=('span', 'input'), html=True, huge_tree=True)
+    for _, element in events:
+        element_id = element.get('id') or ''
+        if element.tag == 'span' and element_id in _ADDRESS_LABELS:
+            labels[_ADDRESS_LABELS[element_id]] = ''.join(element.itertext()).strip()
+        elif element.tag == 'input' and _VIEWSTATE_FIELD_RE.match(element_id):
+            viewstate[element_id] = element.get('value', '')
+        element.clear()
+
+    # Extract address information
+    address = {}
+    try:
+        address['address_line1'] = labels['address_line1']
+        address['address_line2'] = labels.get('address_line2') or None
+        address['city'] = labels['city']
+        address['state'] = labels['state']
+        address['zip'] = labels['zip']
+    except KeyError as e:
+        print(f"Error extracting address information: no {e.args[0]} label")
+
+    # The URL for the FDD download is the current details URL
+    details = {
+        'address': address,
+        'wi_webpage_url': details_url,
+        'fdd_url': details_url
+    }
+    return DetailsPage(details, viewstate)
+
+
+def parse_franchise_details(content: str, details_url: str) -> Dict[str, Any]:
+    """Extract the franchisor address from a details.aspx page.
+    
+    Args:
+        content (str): HTML of the franchise details page
+        details_url (str): URL of the franchise details page
+        
+    Returns:
+        dict: Franchise details
+    """
+    return parse_details_page(content, details_url).details
+
+
+def combine_search_and_details(result: Dict[str, Any], details: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge a search result row with its details page.
+    
+    Args:
+        result (dict): Search result from ``parse_search_results``
+        details (dict): Details from ``parse_franchise_details``
+        
+    Returns:
+        dict: Combined franchise data
+    """
+    combined = {**result}
+    
+    if 'address' in details:
+        combined['address_line1'] = details['address'].get('address_line1')
+        combined['address_line2'] = details['address'].get('address_line2')
+        combined['city'] = details['address'].get('city')
+        combined['state'] = details['address'].get('state')
+        combined['zip'] = details['address'].get('zip')
+    
+    combined['wi_webpage_url'] = details.get('wi_webpage_url')
+    combined['fdd_url'] = details.get('fdd_url')
+    if 'download_form' in details:
+        combined['download_form'] = details['download_form']
+    
+    return combined
 
 
 class FranchiseDataScraper:
     """Scraper for detailed franchise metadata."""
 
-    def __init__(self, headless: bool = HEADLESS):
+    def __init__(self, headless: bool = HEADLESS, pool: Optional[BrowserPool] = None,
+                 pool_size: int = 1, cache: Optional[ResponseCache] = None,
+                 loading: Optional[PageLoading] = None, session: Optional[SessionBridge] = None):
         """Initialize the scraper.
         
         Args:
             headless (bool): Whether to run the browser in headless mode
+            pool (BrowserPool, optional): Shared browser pool to check pages out of.
+                If omitted, the scraper launches and owns its own pool.
+            pool_size (int): Number of pages in the scraper's own pool
+            cache (ResponseCache, optional): Cache of rendered details pages,
+                defaults to the process-wide cache if it is enabled
+            loading (PageLoading, optional): Resource blocking and navigation
+                waits, defaults to the ``BROWSER_*`` settings. A shared pool's
+                pages keep the resource blocking they were opened with.
+            session (SessionBridge, optional): Cookie jar the browser's session
+                is shared through with HTTP clients such as the downloader
         """
         self.headless = headless
-        self.browser = None
-        self.page = None
+        self.pool = pool
+        self._owns_pool = pool is None
+        self.concurrency = pool.size if pool else pool_size
+        self.cache = cache or get_response_cache()
+        self.loading = loading or PageLoading()
+        self.session = session
 
     async def initialize(self):
-        """Initialize the browser and page."""
-        self.browser = await launch(headless=self.headless)
-        self.page = await self.browser.newPage()
-        await self.page.setDefaultNavigationTimeout(DEFAULT_NAVIGATION_TIMEOUT)
+        """Initialize the browser pool."""
+        if self.pool is None:
+            self.pool = BrowserPool(size=self.concurrency, headless=self.headless, loading=self.loading)
+        await self.pool.start()
 
     async def close(self):
-        """Close the browser."""
-        if self.browser:
-            await self.browser.close()
-            self.browser = None
-            self.page = None
+        """Close the browser if this scraper owns it."""
+        if self.pool and self._owns_pool:
+            await self.pool.close()
+            self.pool = None
 
     async def search_franchise(self, franchise_name: str) -> Optional[List[Dict[str, Any]]]:
         """Search for a franchise by name.
@@ -53,89 +238,43 @@ class FranchiseDataScraper:
             list: List of search results or None if an error occurs
         """
         try:
-            if not self.page:
+            if not self.pool:
                 await self.initialize()
 
-            # Navigate to the search page
-            await self.page.goto(FRANCHISE_SEARCH_URL, {'timeout': TIMEOUT, 'waitUntil': 'networkidle0'})
+            async with self.pool.page() as page:
+                if self.session:
+                    await self.session.import_into(page)
+                
+                # Navigate to the search page
+                await rate_limiter.call(FRANCHISE_SEARCH_URL, lambda: self.loading.goto(
+                    page, FRANCHISE_SEARCH_URL, SEARCH_FORM_SELECTOR
+                ))
 
-            # Type the franchise name in the search box
-            await self.page.type('input#txtName', franchise_name)
-            
-            # Wait for 1 second
-            await asyncio.sleep(1)
-            
-            # Click on the input element again
-            await self.page.click('input#txtName')
-            
-            # Send tab and enter keys
-            await self.page.keyboard.press('Tab')
-            await self.page.keyboard.press('Enter')
-            
-            # Wait for the results page to load
-            await self.page.waitForNavigation({'timeout': TIMEOUT, 'waitUntil': 'networkidle0'})
-            
-            # Get the page content
-            content = await self.page.content()
-            
-            # Save the search results to a file
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            save_html_to_file(content, f"search_results_{franchise_name.replace(' ', '_')}_{timestamp}.html")
-            
-            # Parse the search results
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Find the results table
-            results_table = soup.find('table', {'id': 'grdSearchResults'})
-            
-            if not results_table:
-                print(f"No results found for franchise: {franchise_name}")
-                return None
-            
-            # Convert table to DataFrame
-            results_df = pd.read_html(str(results_table))[0]
-            
-            # Get the "Details" links for registered franchises
-            links = []
-            for row in results_table.find_all('tr'):
-                tds = row.find_all('td')
-                if len(tds) > 6 and tds[5].text.strip() == 'Registered':
-                    link = tds[6].find('a')
-                    if link and 'href' in link.attrs:
-                        href = link['href']
-                        # Extract ID and hash from the href
-                        match = re.search(r'id=(\d+)&hash=(\d+)', href)
-                        if match:
-                            file_id = match.group(1)
-                            hash_value = match.group(2)
-                            links.append({
-                                'details_url': f"{FRANCHISE_DETAILS_BASE_URL}?id={file_id}&hash={hash_value}&search=external&type=GENERAL",
-                                'file_id': file_id,
-                                'hash': hash_value
-                            })
+                # Type the franchise name in the search box
+                await page.type('input#txtName', franchise_name)
+                
+                # Click on the input element again
+                await page.click('input#txtName')
+                
+                # Send tab and enter keys, then wait for the results page to load
+                async def submit():
+                    await page.keyboard.press('Tab')
+                    await page.keyboard.press('Enter')
+                    return await self.loading.wait_for_navigation(page, SEARCH_RESULTS_SELECTOR)
+                
+                await rate_limiter.call(FRANCHISE_SEARCH_URL, submit)
+                
+                # Get the page content
+                content = await page.content()
+                
+                # Let HTTP clients continue the session the search used
+                if self.session:
+                    await self.session.export_from(page)
             
-            # Combine DataFrame and links
-            results = []
-            for i, row in results_df.iterrows():
-                if row['Status'] == 'Registered':
-                    # Find the corresponding link
-                    for link in links:
-                        if str(row['File Number']) == link['file_id']:
-                            # Create a single result dictionary
-                            result = {
-                                'file_number': str(row['File Number']),
-                                'legal_name': row['Legal Name'],
-                                'trade_name': row['Trade Name'],
-                                'effective_date': row['Effective Date'],
-                                'expiration_date': row['Expiration Date'],
-                                'status': row['Status'],
-                                'details_url': link['details_url'],
-                                'file_id': link['file_id'],
-                                'hash': link['hash']
-                            }
-                            results.append(result)
+            # Archive the search results
+            await save_html_snapshot_async(content, f"search_results_{franchise_name.replace(' ', '_')}", FRANCHISE_SEARCH_URL)
             
-            return results
+            return parse_search_results(content, franchise_name)
         
         except Exception as e:
             print(f"Error searching for franchise {franchise_name}: {e}")
@@ -151,53 +290,52 @@ class FranchiseDataScraper:
             dict: Franchise details or None if an error occurs
         """
         try:
-            if not self.page:
-                await self.initialize()
-            
-            # Navigate to the details page
-            await self.page.goto(details_url, {'timeout': TIMEOUT, 'waitUntil': 'networkidle0'})
-            
-            # Get the page content
-            content = await self.page.content()
-            
-            # Save the details page to a file
-            file_id = re.search(r'id=(\d+)', details_url).group(1)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            save_html_to_file(content, f"franchise_details_{file_id}_{timestamp}.html")
-            
-            # Parse the details page
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Extract address information
-            address = {}
-            try:
-                address['address_line1'] = soup.find('span', {'id': 'lblFranchiseAddressLine1'}).text.strip()
+            # Details pages rarely change, so a recent copy needs no browser
+            content = await asyncio.to_thread(self.cache.get_page, details_url) if self.cache else None
+            if content is None:
+                if not self.pool:
+                    await self.initialize()
                 
-                address_line2_element = soup.find('span', {'id': 'lblFranchiseAddressLine2'})
-                if address_line2_element and address_line2_element.text.strip():
-                    address['address_line2'] = address_line2_element.text.strip()
-                else:
-                    address['address_line2'] = None
+                async with self.pool.page() as page:
+                    if self.session:
+                        await self.session.import_into(page)
+                    
+                    # Navigate to the details page
+                    await rate_limiter.call(details_url, lambda: self.loading.goto(
+                        page, details_url, DETAILS_SELECTOR
+                    ))
+                    
+                    # Get the page content
+                    content = await page.content()
+                    
+                    if self.session:
+                        await self.session.export_from(page)
                 
-                address['city'] = soup.find('span', {'id': 'lblFranchiseCity'}).text.strip()
-                address['state'] = soup.find('span', {'id': 'lblFranchiseState'}).text.strip()
-                address['zip'] = soup.find('span', {'id': 'lblFranchiseZip'}).text.strip()
-            except (AttributeError, ValueError) as e:
-                print(f"Error extracting address information: {e}")
+                if self.cache:
+                    await asyncio.to_thread(self.cache.put_page, details_url, content)
             
-            # The URL for the FDD download is the current details URL
-            fdd_url = details_url
+            # Archive the details page
+            file_id = re.search(r'id=(\d+)', details_url).group(1)
+            await save_html_snapshot_async(content, f"franchise_details_{file_id}", details_url)
             
-            return {
-                'address': address,
-                'wi_webpage_url': details_url,
-                'fdd_url': fdd_url
-            }
+            return parse_franchise_details(content, details_url)
         
         except Exception as e:
             print(f"Error getting franchise details: {e}")
             return None
 
+    async def _get_franchise_details_limited(self, details_url: str) -> Optional[Dict[str, Any]]:
+        """Get franchise details while holding a per-host request slot.
+        
+        Args:
+            details_url (str): URL of the franchise details page
+            
+        Returns:
+            dict: Franchise details or None if an error occurs
+        """
+        async with host_limiter.acquire(details_url):
+            return await self.get_franchise_details(details_url)
+
     async def scrape_franchise(self, franchise_name: str) -> Optional[List[Dict[str, Any]]]:
         """Scrape data for a specific franchise.
         
@@ -215,25 +353,17 @@ class FranchiseDataScraper:
                 print(f"No registered results found for franchise: {franchise_name}")
                 return None
             
-            # Get details for each registered franchise
+            # Fetch details for every registered franchise at once, keeping
+            # the search result order
+            details_list = await asyncio.gather(*(
+                self._get_franchise_details_limited(result['details_url'])
+                for result in search_results
+            ))
+            
             full_results = []
-            for result in search_results:
-                details = await self.get_franchise_details(result['details_url'])
+            for result, details in zip(search_results, details_list):
                 if details:
-                    # Combine search results and details
-                    combined = {**result}
-                    
-                    if 'address' in details:
-                        combined['address_line1'] = details['address'].get('address_line1')
-                        combined['address_line2'] = details['address'].get('address_line2')
-                        combined['city'] = details['address'].get('city')
-                        combined['state'] = details['address'].get('state')
-                        combined['zip'] = details['address'].get('zip')
-                    
-                    combined['wi_webpage_url'] = details.get('wi_webpage_url')
-                    combined['fdd_url'] = details.get('fdd_url')
-                    
-                    full_results.append(combined)
+                    full_results.append(combine_search_and_details(result, details))
             
             return full_results
         
@@ -256,15 +386,39 @@ class FranchiseDataScraper:
             await self.close()
 
 
+def create_franchise_scraper(backend: str = SEARCH_BACKEND,
+                             session: Optional[SessionBridge] = None) -> FranchiseDataScraper:
+    """Create a franchise scraper for the configured search backend.
+    
+    Args:
+        backend (str): ``"browser"`` to drive Chromium through pyppeteer or
+            ``"http"`` to replay the ASP.NET form postback directly
+        session (SessionBridge, optional): Cookie jar to share the scraper's
+            session through
+        
+    Returns:
+        FranchiseDataScraper: A scraper whose ``concurrency`` attribute is the
+            number of searches it can run at once
+    """
+    if backend == 'http':
+        from src.scrapers.franchise_search_http import HttpFranchiseDataScraper
+        return HttpFranchiseDataScraper(session=session)
+    if backend == 'browser':
+        return FranchiseDataScraper(pool_size=BROWSER_POOL_SIZE, session=session)
+    raise ValueError(f"Unknown search backend: {backend}")
+
+
 # Function to run the scraper
-async def scrape_franchise_data(franchise_name: str) -> Optional[List[Dict[str, Any]]]:
+async def scrape_franchise_data(franchise_name: str, pool: Optional[BrowserPool] = None) -> Optional[List[Dict[str, Any]]]:
     """Scrape data for a specific franchise.
     
     Args:
         franchise_name (str): Name of the franchise to scrape
+        pool (BrowserPool, optional): Shared browser pool. When given, pages are
+            checked out of it and the browser is left running afterwards.
         
     Returns:
         list: List of franchise data or None if an error occurs
     """
-    scraper = FranchiseDataScraper()
+    scraper = FranchiseDataScraper(pool=pool)
     return await scraper.scrape(franchise_name) 
\ No newline at end of file
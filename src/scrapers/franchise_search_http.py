@@ -0,0 +1,210 @@
+import asyncio
+import re
+from typing import List, Dict, Any, Optional, Tuple
+
+import httpx
+from bs4 import BeautifulSoup
+
+from src.config import (
+    FRANCHISE_SEARCH_URL,
+    HTTP_SEARCH_CONCURRENCY,
+    HTTP_TIMEOUT,
+    USER_AGENT
+)
+from src.scrapers.franchise_data import (
+    FranchiseDataScraper,
+    parse_search_results,
+    parse_franchise_details
+)
+from src.scrapers.session_bridge import SessionBridge
+from src.utils.file_operations import save_html_snapshot_async
+from src.utils.http_cache import cached_transport
+from src.utils.throttling import RateLimitedTransport
+
+
+def parse_search_form(content: str, field_id: str = 'txtName') -> Tuple[Dict[str, str], str]:
+    """Collect the fields a browser would post back from MainSearch.aspx.
+
+    Hidden ASP.NET state (``__VIEWSTATE``, ``__EVENTVALIDATION``, ...) is
+    replayed as-is. The submit button that follows the name box is included,
+    which is what pressing Tab then Enter in the browser triggers.
+
+    Args:
+        content (str): HTML of the search page
+        field_id (str): ID of the franchise name input
+
+    Returns:
+        tuple: Form fields to post and the form name of the franchise name input
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    form = soup.find('form') or soup
+
+    fields = {}
+    name_field = None
+    submit = None
+    first_submit = None
+    for element in form.find_all(['input', 'select', 'textarea']):
+        name = element.get('name')
+        if not name:
+            continue
+
+        input_type = (element.get('type') or 'text').lower()
+        if input_type in ('submit', 'image', 'button'):
+            if input_type == 'submit':
+                button = (name, element.get('value', ''))
+                first_submit = first_submit or button
+                if name_field and not submit:
+                    submit = button
+            continue
+        if input_type in ('checkbox', 'radio') and not element.has_attr('checked'):
+            continue
+
+        if element.name == 'select':
+            option = element.find('option', selected=True) or element.find('option')
+            value = option.get('value', option.text) if option else ''
+        elif element.name == 'textarea':
+            value = element.text
+        else:
+            value = element.get('value', '')
+        fields[name] = value
+
+        if element.get('id') == field_id:
+            name_field = name
+
+    if not name_field:
+        raise ValueError(f"Search form has no input with id {field_id}")
+
+    submit = submit or first_submit
+    if submit:
+        fields[submit[0]] = submit[1]
+
+    return fields, name_field
+
+
+class HttpFranchiseDataScraper(FranchiseDataScraper):
+    """Franchise scraper that replays the MainSearch.aspx postback over plain HTTP.
+
+    The search form is fetched once and its view state reused for every
+    search, so each search costs a single POST and no browser is needed.
+    """
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None,
+                 concurrency: int = HTTP_SEARCH_CONCURRENCY,
+                 session: Optional[SessionBridge] = None):
+        """Initialize the scraper.
+
+        Args:
+            client (httpx.AsyncClient, optional): Shared HTTP client. If omitted,
+                the scraper creates and owns its own client.
+            concurrency (int): Number of searches that can run at once
+            session (SessionBridge, optional): Cookie jar the client shares
+                its session through
+        """
+        super().__init__(session=session)
+        self.client = client
+        self._owns_client = client is None
+        if client and session:
+            session.attach(client)
+        self.concurrency = concurrency
+        self._form: Optional[Tuple[Dict[str, str], str]] = None
+        self._form_lock: Optional[asyncio.Lock] = None
+
+    async def initialize(self):
+        """Initialize the HTTP client."""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                headers={'User-Agent': USER_AGENT},
+                timeout=HTTP_TIMEOUT,
+                follow_redirects=True,
+                transport=cached_transport(RateLimitedTransport(httpx.AsyncHTTPTransport(
+                    limits=httpx.Limits(max_connections=self.concurrency)
+                )))
+            )
+        if self.session:
+            self.session.attach(self.client)
+
+    async def close(self):
+        """Close the HTTP client if this scraper owns it."""
+        if self.client and self._owns_client:
+            await self.client.aclose()
+            self.client = None
+        self._form = None
+
+    async def _get_search_form(self, refresh: bool = False) -> Tuple[Dict[str, str], str]:
+        """Get the search form fields, fetching MainSearch.aspx if needed.
+
+        Args:
+            refresh (bool): Discard the cached view state and fetch it again
+
+        Returns:
+            tuple: Form fields to post and the form name of the franchise name input
+        """
+        if self._form_lock is None:
+            self._form_lock = asyncio.Lock()
+        async with self._form_lock:
+            if refresh or self._form is None:
+                response = await self.client.get(FRANCHISE_SEARCH_URL)
+                response.raise_for_status()
+                self._form = parse_search_form(response.text)
+            return self._form
+
+    async def search_franchise(self, franchise_name: str) -> Optional[List[Dict[str, Any]]]:
+        """Search for a franchise by name.
+
+        Args:
+            franchise_name (str): Name of the franchise to search for
+
+        Returns:
+            list: List of search results or None if an error occurs
+        """
+        try:
+            if not self.client:
+                await self.initialize()
+
+            # A stale view state is rejected by the server, so refetch once
+            for attempt in range(2):
+                fields, name_field = await self._get_search_form(refresh=attempt > 0)
+                response = await self.client.post(
+                    FRANCHISE_SEARCH_URL,
+                    data={**fields, name_field: franchise_name}
+                )
+                if response.is_success or attempt > 0:
+                    break
+            response.raise_for_status()
+            content = response.text
+
+            # Archive the search results
+            await save_html_snapshot_async(content, f"search_results_{franchise_name.replace(' ', '_')}", FRANCHISE_SEARCH_URL)
+
+            return parse_search_results(content, franchise_name)
+
+        except Exception as e:
+            print(f"Error searching for franchise {franchise_name}: {e}")
+            return None
+
+    async def get_franchise_details(self, details_url: str) -> Optional[Dict[str, Any]]:
+        """Get detailed information about a franchise.
+
+        Args:
+            details_url (str): URL of the franchise details page
+
+        Returns:
+            dict: Franchise details or None if an error occurs
+        """
+        try:
+            if not self.client:
+                await self.initialize()
+
+            response = await self.client.get(details_url)
+            response.raise_for_status()
+            content = response.text
+
+            # Archive the details page
+            file_id = re.search(r'id=(\d+)', details_url).group(1)
+            await save_html_snapshot_async(content, f"franchise_details_{file_id}", details_url)
+
+            return parse_franchise_details(content, details_url)
+
+        except Exception as e:
+            print(f"Error getting franchise details: {e}")
+            return None
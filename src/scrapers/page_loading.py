@@ -0,0 +1,112 @@
+import asyncio
+from collections import Counter
+from typing import Iterable, Optional
+
+from pyppeteer.errors import TimeoutError as PageTimeoutError
+
+from src.config import BROWSER_ALLOWED_RESOURCES, BROWSER_WAIT_FOR_SELECTOR, TIMEOUT
+
+
+class PageLoading:
+    """How a scraper's browser pages load.
+
+    The DFI pages are rendered on the server, so the scrapers only need the
+    HTML document: with request interception every other resource (images,
+    stylesheets, fonts, scripts, ...) is aborted before it is requested.
+    Navigations end as soon as the DOM is parsed and the element the
+    scraper reads exists, instead of waiting for the network to go idle.
+
+    ``stats`` counts the ``continued`` and ``aborted`` requests.
+    """
+
+    def __init__(self, allowed_resources: Optional[Iterable[str]] = BROWSER_ALLOWED_RESOURCES,
+                 wait_for_selector: bool = BROWSER_WAIT_FOR_SELECTOR,
+                 timeout: int = TIMEOUT):
+        """Initialize the loading options.
+
+        Args:
+            allowed_resources (iterable, optional): Resource types pages may load,
+                such as ``document`` or ``script``. None loads everything
+                without intercepting requests.
+            wait_for_selector (bool): End navigations once the target element
+                exists rather than at network idle
+            timeout (int): Milliseconds to wait for a navigation or element
+        """
+        self.allowed_resources = frozenset(allowed_resources) if allowed_resources is not None else None
+        self.wait_for_selector = wait_for_selector
+        self.timeout = timeout
+        self.stats: Counter = Counter()
+
+    @property
+    def wait_until(self) -> str:
+        """The lifecycle event navigations wait for."""
+        return 'domcontentloaded' if self.wait_for_selector else 'networkidle0'
+
+    async def prepare(self, page):
+        """Start intercepting a new page's requests, if any resource types are blocked.
+
+        Args:
+            page: A pyppeteer page
+        """
+        if self.allowed_resources is None:
+            return
+        await page.setRequestInterception(True)
+        page.on('request', lambda request: asyncio.ensure_future(self._intercept(request)))
+
+    async def _intercept(self, request):
+        try:
+            if request.resourceType in self.allowed_resources:
+                self.stats['continued'] += 1
+                await request.continue_()
+            else:
+                self.stats['aborted'] += 1
+                await request.abort()
+        except Exception:
+            # The page was closed or navigated away while the request waited
+            pass
+
+    async def goto(self, page, url: str, selector: str):
+        """Navigate to a URL and wait until the page is ready to read.
+
+        Args:
+            page: A pyppeteer page
+            url (str): URL to load
+            selector (str): CSS selector of the element the scraper reads
+
+        Returns:
+            The navigation's response
+        """
+        response = await page.goto(url, {'timeout': self.timeout, 'waitUntil': self.wait_until})
+        await self.wait_for(page, selector)
+        return response
+
+    async def wait_for_navigation(self, page, selector: str):
+        """Wait for a navigation the page started, such as a form submission, to be ready to read.
+
+        Args:
+            page: A pyppeteer page
+            selector (str): CSS selector of the element the scraper reads
+
+        Returns:
+            The navigation's response
+        """
+        response = await page.waitForNavigation({'timeout': self.timeout, 'waitUntil': self.wait_until})
+        await self.wait_for(page, selector)
+        return response
+
+    async def wait_for(self, page, selector: str):
+        """Wait for an element to exist, when navigations end before network idle.
+
+        A page that never shows the element is returned as it is, so the
+        scraper's parser reports what is missing.
+
+        Args:
+            page: A pyppeteer page
+            selector (str): CSS selector of the element
+        """
+        if not self.wait_for_selector:
+            return
+        try:
+            await page.waitForSelector(selector, {'timeout': self.timeout})
+        except PageTimeoutError:
+            print(f"Timed out waiting for {selector} on {page.url}")
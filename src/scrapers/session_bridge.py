@@ -0,0 +1,92 @@
+from collections import Counter
+from http.cookiejar import CookieJar
+from typing import Dict, List
+
+import httpx
+
+
+class SessionBridge:
+    """One cookie jar shared by the browser and the HTTP clients of a run.
+
+    The ASP.NET session the browser establishes while searching is copied
+    into the jar after each navigation, and every attached httpx client
+    sends and updates that jar, so the downloader continues the browser's
+    session instead of starting its own. Cookies set over HTTP go back to
+    the browser before its next navigation.
+
+    All pages of one browser share its cookies, so a bridge serves one
+    browser and any number of clients. ``stats`` counts the ``exported``
+    (browser to jar) and ``imported`` (jar to browser) cookies.
+    """
+
+    def __init__(self):
+        """Initialize the bridge with an empty jar."""
+        self.jar = CookieJar()
+        self.stats: Counter = Counter()
+        # Cookies the browser is known to hold, to skip imports that change nothing
+        self._browser_cookies: frozenset = frozenset()
+
+    @property
+    def cookies(self) -> httpx.Cookies:
+        """The shared jar as httpx cookies."""
+        return httpx.Cookies(self.jar)
+
+    def attach(self, client: httpx.AsyncClient):
+        """Make a client send and store cookies through the shared jar.
+
+        Cookies the client already holds are moved into the jar.
+
+        Args:
+            client (httpx.AsyncClient): Client to attach
+        """
+        if client.cookies.jar is self.jar:
+            return
+        for cookie in client.cookies.jar:
+            self.jar.set_cookie(cookie)
+        client.cookies.jar = self.jar
+
+    def _signature(self) -> frozenset:
+        return frozenset((cookie.name, cookie.value, cookie.domain, cookie.path) for cookie in self.jar)
+
+    async def export_from(self, page):
+        """Copy the cookies of a browser page's current URL into the jar.
+
+        Args:
+            page: A pyppeteer page
+        """
+        cookies = self.cookies
+        browser_cookies: List[Dict] = await page.cookies()
+        known = set(self._browser_cookies)
+        for cookie in browser_cookies:
+            domain, path = cookie.get('domain', ''), cookie.get('path', '/')
+            cookies.set(cookie['name'], cookie['value'], domain=domain, path=path)
+            known.add((cookie['name'], cookie['value'], domain, path))
+        self.stats['exported'] += len(browser_cookies)
+        self._browser_cookies = frozenset(known)
+
+    async def import_into(self, page):
+        """Give a browser page the jar's cookies, if the browser does not have them yet.
+
+        Args:
+            page: A pyppeteer page
+        """
+        signature = self._signature()
+        if signature <= self._browser_cookies:
+            return
+        await page.setCookie(*[_to_browser_cookie(cookie) for cookie in self.jar])
+        self.stats['imported'] += len(signature - self._browser_cookies)
+        self._browser_cookies = self._browser_cookies | signature
+
+
+def _to_browser_cookie(cookie) -> Dict:
+    """Convert a ``http.cookiejar.Cookie`` to the form ``page.setCookie`` takes."""
+    browser_cookie = {
+        'name': cookie.name,
+        'value': cookie.value,
+        'domain': cookie.domain,
+        'path': cookie.path or '/',
+        'secure': bool(cookie.secure),
+    }
+    if cookie.expires is not None:
+        browser_cookie['expires'] = cookie.expires
+    return browser_cookie
@@ -0,0 +1,107 @@
+import os
+import shutil
+from pathlib import Path
+from typing import Optional, Tuple
+
+from src.config import FDD_DIR
+
+
+class BlobStore:
+    """Content-addressed store for downloaded documents.
+
+    Each distinct file is kept once under ``<root>/<ab>/<cd>/<sha256>.pdf``,
+    where ``ab`` and ``cd`` are the first two byte pairs of its SHA-256, so
+    no directory grows too large. Human-readable FDD filenames are links to
+    the blob, which means the same PDF filed under several trade names or
+    years only takes up disk space once.
+    """
+
+    def __init__(self, root: Optional[Path] = None, suffix: str = '.pdf'):
+        """Initialize the store.
+
+        Args:
+            root (Path, optional): Directory holding the blobs, defaults to
+                ``FDD_DIR / 'blobs'``
+            suffix (str): File extension given to blobs
+        """
+        self.root = Path(root) if root else FDD_DIR / 'blobs'
+        self.suffix = suffix
+
+    def path_for(self, sha256: str) -> Path:
+        """Get where the blob with the given hash is stored.
+
+        Args:
+            sha256 (str): Hex SHA-256 of the content
+
+        Returns:
+            Path: Path of the blob
+        """
+        sha256 = sha256.lower()
+        return self.root / sha256[:2] / sha256[2:4] / f"{sha256}{self.suffix}"
+
+    def contains(self, sha256: str, size: Optional[int] = None) -> bool:
+        """Check whether a blob is stored, without reading its content.
+
+        Blobs are immutable and named by their hash, so a file of the right
+        size at the right path is trusted to hold the right bytes.
+
+        Args:
+            sha256 (str): Hex SHA-256 of the content
+            size (int, optional): Expected size in bytes
+
+        Returns:
+            bool: True if the blob exists (with the expected size)
+        """
+        try:
+            stat = os.stat(self.path_for(sha256))
+        except OSError:
+            return False
+        return size is None or stat.st_size == size
+
+    def add(self, source_path: str, sha256: str) -> Tuple[Path, bool]:
+        """Move a finished file into the store.
+
+        Args:
+            source_path (str): Fully written file whose content hashes to ``sha256``.
+                It is moved into the store, or deleted if the blob already exists.
+            sha256 (str): Hex SHA-256 of the file
+
+        Returns:
+            tuple: Path of the blob and whether it was newly added
+        """
+        blob_path = self.path_for(sha256)
+        if blob_path.exists():
+            os.remove(source_path)
+            return blob_path, False
+        os.makedirs(blob_path.parent, exist_ok=True)
+        os.replace(source_path, blob_path)
+        return blob_path, True
+
+    def link(self, sha256: str, alias_path: str):
+        """Make ``alias_path`` point at a stored blob.
+
+        A hard link is used where possible, then a relative symlink, and as
+        a last resort a copy.
+
+        Args:
+            sha256 (str): Hex SHA-256 of the blob
+            alias_path (str): Human-readable path to create or replace
+        """
+        blob_path = self.path_for(sha256)
+        os.makedirs(os.path.dirname(alias_path) or '.', exist_ok=True)
+        if os.path.lexists(alias_path):
+            if os.path.exists(alias_path) and os.path.samefile(alias_path, blob_path):
+                return
+            os.remove(alias_path)
+
+        try:
+            os.link(blob_path, alias_path)
+            return
+        except OSError:
+            pass
+        try:
+            os.symlink(os.path.relpath(blob_path, os.path.dirname(alias_path) or '.'), alias_path)
+            return
+        except OSError:
+            pass
+        shutil.copyfile(blob_path, alias_path)
@@ -50,6 +50,47 @@ def save_html_to_file(html_content: str, filename: str) -> str:
     return str(output_path)
 
 
+def save_html_snapshot(html_content: str, name: str, url: Optional[str] = None) -> Optional[str]:
+    """Queue HTML content for the compressed snapshot archive.
+    
+    The page is written by a background thread, so this returns without
+    touching the disk unless the writer's queue is full.
+    
+    Args:
+        html_content (str): HTML content to save
+        name (str): Descriptive name of the page, e.g. ``franchise_details_637375``
+        url (str, optional): URL the page was loaded from
+        
+    Returns:
+        str: Reference to the snapshot, ``snapshot:<sha256>``, or None if it was dropped
+    """
+    # Imported here so that merely importing this module starts no writer
+    from src.utils.snapshot_store import get_snapshot_writer
+    
+    sha256 = get_snapshot_writer().submit(html_content, url=url, name=name)
+    return f"snapshot:{sha256}" if sha256 else None
+
+
+async def save_html_snapshot_async(html_content: str, name: str, url: Optional[str] = None) -> Optional[str]:
+    """Queue HTML content for the compressed snapshot archive from a coroutine.
+    
+    Like ``save_html_snapshot``, but a full writer queue only suspends the
+    calling coroutine instead of blocking the event loop.
+    
+    Args:
+        html_content (str): HTML content to save
+        name (str): Descriptive name of the page, e.g. ``franchise_details_637375``
+        url (str, optional): URL the page was loaded from
+        
+    Returns:
+        str: Reference to the snapshot, ``snapshot:<sha256>``, or None if it was dropped
+    """
+    from src.utils.snapshot_store import get_snapshot_writer
+    
+    sha256 = await get_snapshot_writer().submit_async(html_content, url=url, name=name)
+    return f"snapshot:{sha256}" if sha256 else None
+
+
 def generate_fdd_filename(file_id: str, franchise_name: str, effective_year: str) -> str:
     """Generate a standardized filename for an FDD document.
     
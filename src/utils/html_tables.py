@@ -0,0 +1,102 @@
+from io import BytesIO
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from urllib.parse import urljoin
+
+from lxml import etree
+
+
+class TableNotFound(LookupError):
+    """Raised when a page has no table with the requested ID."""
+
+
+class TableRow(NamedTuple):
+    """One body row of an HTML table.
+
+    Attributes:
+        cells: Whitespace-normalized cell text keyed by column header
+        links: Absolute URL of the first link in each cell that has one,
+            keyed by column header
+    """
+    cells: Dict[str, str]
+    links: Dict[str, str]
+
+
+def _text(element) -> str:
+    return ' '.join(''.join(element.itertext()).split())
+
+
+def iter_table_rows(content: str, table_id: str, base_url: Optional[str] = None) -> Iterator[TableRow]:
+    """Stream the rows of one table out of an HTML page in a single pass.
+
+    The page is parsed incrementally with lxml and each row is released as
+    soon as it has been read, so large tables are never held in memory
+    twice. The first row of the table is its header. Rows that wrap a
+    nested table, such as ASP.NET grid pagers, are skipped.
+
+    Args:
+        content (str): HTML of the page
+        table_id (str): ID of the table to read
+        base_url (str, optional): URL of the page, used to make links absolute
+
+    Yields:
+        TableRow: Each row after the header
+
+    Raises:
+        TableNotFound: If the page has no table with that ID
+    """
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    header: Optional[List[str]] = None
+    found = False
+    # Depth of tables nested inside the target table, and whether the
+    # current row contains one
+    depth = 0
+    nested_in_row = False
+
+    events = etree.iterparse(BytesIO(data), events=('start', 'end'), tag=('table', 'tr'), html=True)
+    for event, element in events:
+        tag = element.tag
+        if not found:
+            if event == 'start' and tag == 'table' and element.get('id') == table_id:
+                found = True
+            continue
+
+        if tag == 'table':
+            if event == 'start':
+                depth += 1
+                nested_in_row = True
+            elif depth:
+                depth -= 1
+            else:
+                # End of the target table, nothing after it is needed
+                return
+            continue
+
+        if tag != 'tr' or event != 'end' or depth:
+            continue
+
+        if nested_in_row:
+            nested_in_row = False
+        else:
+            cells = [child for child in element if child.tag in ('td', 'th')]
+            if header is None:
+                header = [_text(cell) or str(i) for i, cell in enumerate(cells)]
+            else:
+                row_cells = {}
+                row_links = {}
+                for name, cell in zip(header, cells):
+                    row_cells[name] = _text(cell)
+                    link = next((a.get('href') for a in cell.iter('a') if a.get('href')), None)
+                    if link:
+                        row_links[name] = urljoin(base_url, link) if base_url else link
+                for name in header[len(cells):]:
+                    row_cells[name] = ''
+                yield TableRow(row_cells, row_links)
+
+        # Free the row and everything before it
+        element.clear()
+        parent = element.getparent()
+        while parent is not None and element.getprevious() is not None:
+            del parent[0]
+
+    if not found:
+        raise TableNotFound(f"No table with id {table_id}")
@@ -0,0 +1,434 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import httpx
+
+from src.config import (
+    HTTP_CACHE_ENABLED,
+    HTTP_CACHE_PATH,
+    HTTP_CACHE_MAX_SIZE,
+    HTTP_CACHE_MAX_ENTRY_SIZE,
+    HTTP_CACHE_DEFAULT_TTL,
+    HTTP_CACHE_TTLS,
+    HTTP_CACHE_KEY_HEADERS
+)
+
+
+# Method recorded for pages rendered by the browser, whose DOM differs
+# from the raw HTML of a GET to the same URL
+RENDER = 'RENDER'
+
+# Headers that belong to one connection or session and are never replayed
+# from the cache: a stale Set-Cookie would overwrite the live session
+_UNCACHED_HEADERS = frozenset({'set-cookie', 'set-cookie2', 'connection', 'keep-alive', 'transfer-encoding'})
+
+
+class CachedResponse(NamedTuple):
+    """A stored response.
+
+    Attributes:
+        url: URL the response was fetched from
+        status: HTTP status code
+        headers: Response headers as (name, value) pairs
+        body: Response body as received, before any content decoding
+        etag: ``ETag`` validator, if the server sent one
+        last_modified: ``Last-Modified`` validator, if the server sent one
+        expires_at: Unix time after which the response must be revalidated
+    """
+    url: str
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+
+class ResponseCache:
+    """Disk-backed cache of GET responses and rendered pages.
+
+    Responses are kept in one SQLite file keyed by a fingerprint of the
+    method, URL and the request headers that select a variant. How long a
+    response stays fresh depends on the first TTL rule its URL matches;
+    stale responses carrying an ``ETag`` or ``Last-Modified`` header are
+    revalidated with a conditional request instead of fetched again. Once
+    the bodies exceed ``max_size`` the least recently used are evicted.
+
+    ``stats`` counts ``hits``, ``misses``, ``revalidated`` (stale but
+    confirmed unchanged by a 304), ``stored`` and ``evicted`` responses.
+    """
+
+    def __init__(self, path: Optional[Path] = None,
+                 max_size: int = HTTP_CACHE_MAX_SIZE,
+                 max_entry_size: int = HTTP_CACHE_MAX_ENTRY_SIZE,
+                 ttls: Sequence[Tuple[str, float]] = HTTP_CACHE_TTLS,
+                 default_ttl: float = HTTP_CACHE_DEFAULT_TTL,
+                 key_headers: Sequence[str] = HTTP_CACHE_KEY_HEADERS,
+                 clock: Callable[[], float] = time.time):
+        """Initialize the cache, creating its file if needed.
+
+        Args:
+            path (Path, optional): SQLite file, defaults to ``HTTP_CACHE_PATH``
+            max_size (int): Bytes of bodies kept before evicting
+            max_entry_size (int): Largest body that is stored
+            ttls (sequence): (URL regex, seconds fresh) rules checked in order;
+                a TTL of 0 keeps matching URLs out of the cache
+            default_ttl (float): Seconds fresh for URLs no rule matches
+            key_headers (sequence): Request headers that are part of the key
+            clock (callable): Wall clock in seconds, replaceable for tests
+        """
+        self.path = Path(path) if path else HTTP_CACHE_PATH
+        self.max_size = max_size
+        self.max_entry_size = max_entry_size
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self.default_ttl = default_ttl
+        self.key_headers = [header.lower() for header in key_headers]
+        self.clock = clock
+        self.stats: Counter = Counter()
+        os.makedirs(self.path.parent, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript('''
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            status INTEGER NOT NULL,
+            headers TEXT NOT NULL,
+            body BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            expires_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at);
+        ''')
+        self.connection.commit()
+        self._size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def key(self, method: str, url: str, headers: Optional[Mapping[str, str]] = None) -> str:
+        """Fingerprint a request.
+
+        Args:
+            method (str): HTTP method, or ``RENDER`` for browser pages
+            url (str): Requested URL
+            headers (mapping, optional): Request headers
+
+        Returns:
+            str: Hex SHA-256 identifying the cached variant
+        """
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        parts = [f"{method.upper()} {url}"]
+        parts.extend(f"{name}: {headers.get(name, '')}" for name in self.key_headers)
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def ttl_for(self, url: str) -> float:
+        """Get how long responses from a URL stay fresh.
+
+        Args:
+            url (str): URL of the response
+
+        Returns:
+            float: Seconds fresh, 0 if the URL is not cached
+        """
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        """Check whether a stored response can be used without asking the server.
+
+        Args:
+            entry (CachedResponse): Stored response
+
+        Returns:
+            bool: True until the response's TTL has passed
+        """
+        return self.clock() < entry.expires_at
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Look up a response, fresh or stale, and mark it as recently used.
+
+        Args:
+            key (str): Fingerprint from ``key``
+
+        Returns:
+            CachedResponse: The stored response or None
+        """
+        with self._lock:
+            row = self.connection.execute('''
+            SELECT url, status, headers, body, etag, last_modified, expires_at
+            FROM responses WHERE key = ?
+            ''', (key,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (self.clock(), key))
+            self.connection.commit()
+        return CachedResponse(
+            row['url'], row['status'], [tuple(pair) for pair in json.loads(row['headers'])], row['body'],
+            row['etag'], row['last_modified'], row['expires_at']
+        )
+
+    def put(self, key: str, url: str, status: int, headers: Sequence[Tuple[str, str]], body: bytes) -> bool:
+        """Store a response, evicting the least recently used ones if the cache is full.
+
+        Args:
+            key (str): Fingerprint from ``key``
+            url (str): URL of the response
+            status (int): HTTP status code
+            headers (sequence): Response headers as (name, value) pairs; cookies
+                and connection headers are not stored
+            body (bytes): Response body as received
+
+        Returns:
+            bool: True if it was stored, False if its URL is not cached or it is too large
+        """
+        ttl = self.ttl_for(url)
+        if ttl <= 0 or len(body) > self.max_entry_size:
+            return False
+        headers = [(name, value) for name, value in headers if name.lower() not in _UNCACHED_HEADERS]
+        etag = _header(headers, 'etag')
+        last_modified = _header(headers, 'last-modified')
+        now = self.clock()
+        with self._lock:
+            previous = self.connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.connection.execute('''
+            INSERT OR REPLACE INTO responses
+                (key, url, status, headers, body, size, etag, last_modified, expires_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (key, url, status, json.dumps(headers), body, len(body), etag, last_modified, now + ttl, now))
+            self._size += len(body) - (previous['size'] if previous else 0)
+            self._evict()
+            self.connection.commit()
+        self.stats['stored'] += 1
+        return True
+
+    def refresh(self, key: str, headers: Sequence[Tuple[str, str]] = ()):
+        """Start a stale response's TTL again after the server confirmed it is unchanged.
+
+        Args:
+            key (str): Fingerprint from ``key``
+            headers (sequence): Headers of the 304 response, whose validators replace the stored ones
+        """
+        etag = _header(headers, 'etag')
+        last_modified = _header(headers, 'last-modified')
+        now = self.clock()
+        with self._lock:
+            row = self.connection.execute("SELECT url FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            self.connection.execute('''
+            UPDATE responses
+            SET expires_at = ?, accessed_at = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+            WHERE key = ?
+            ''', (now + self.ttl_for(row['url']), now, etag, last_modified, key))
+            self.connection.commit()
+
+    def _evict(self):
+        """Delete the least recently used responses until the bodies fit in ``max_size``."""
+        if self._size <= self.max_size:
+            return
+        evicted = []
+        for row in self.connection.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if self._size <= self.max_size:
+                break
+            evicted.append((row['key'],))
+            self._size -= row['size']
+        self.connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self.stats['evicted'] += len(evicted)
+
+    def get_page(self, url: str) -> Optional[str]:
+        """Get the fresh HTML of a page the browser rendered earlier.
+
+        Args:
+            url (str): URL the browser navigated to
+
+        Returns:
+            str: The page's HTML, or None if it must be loaded again
+        """
+        entry = self.get(self.key(RENDER, url))
+        if entry is None or not self.is_fresh(entry):
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return entry.body.decode('utf-8')
+
+    def put_page(self, url: str, content: str) -> bool:
+        """Store the HTML of a page the browser rendered.
+
+        Args:
+            url (str): URL the browser navigated to
+            content (str): HTML of the page
+
+        Returns:
+            bool: True if it was stored
+        """
+        return self.put(self.key(RENDER, url), url, 200,
+                        [('Content-Type', 'text/html; charset=utf-8')], content.encode('utf-8'))
+
+    @property
+    def size(self) -> int:
+        """Total bytes of the stored bodies."""
+        return self._size
+
+    def clear(self):
+        """Delete every stored response."""
+        with self._lock:
+            self.connection.execute("DELETE FROM responses")
+            self.connection.commit()
+            self._size = 0
+
+    def close(self):
+        """Close the cache file."""
+        with self._lock:
+            self.connection.close()
+
+
+def _header(headers: Sequence[Tuple[str, str]], name: str) -> Optional[str]:
+    """Find a header's value in (name, value) pairs, ignoring case."""
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+# Request directives for which neither a stored response is used nor the response stored
+_BYPASS_DIRECTIVES = {'no-store', 'no-cache', 'max-age=0'}
+
+
+def _cache_directives(headers: httpx.Headers) -> List[str]:
+    """Get the lower-cased directives of a Cache-Control header."""
+    return [directive.strip().lower() for directive in headers.get('cache-control', '').split(',')]
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """httpx transport that answers GETs from a ``ResponseCache`` when it can.
+
+    Fresh responses are returned without a request. Stale responses with
+    validators are revalidated with ``If-None-Match``/``If-Modified-Since``
+    and served from disk on a 304. Successful responses are stored unless
+    the server marks them ``no-store``. Requests sent with ``no-cache``,
+    ``max-age=0`` or ``no-store`` bypass the cache entirely: they want a
+    page for this session only, such as a form's one-time state, which
+    must not be served to a later request either. Freshness comes from the cache's TTL
+    rules, not from the server's ``max-age``, since the state's pages send
+    none.
+
+    Wrap the rate-limited transport with it, so that hits cost no token.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 cache: Optional[ResponseCache] = None):
+        """Initialize the transport.
+
+        Args:
+            transport (httpx.AsyncBaseTransport, optional): Transport to wrap
+            cache (ResponseCache, optional): Cache to use, defaults to the
+                process-wide cache
+        """
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self._cache = cache or get_response_cache() or ResponseCache()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != 'GET' or _BYPASS_DIRECTIVES.intersection(_cache_directives(request.headers)):
+            return await self._transport.handle_async_request(request)
+
+        url = str(request.url)
+        key = self._cache.key(request.method, url, request.headers)
+        entry = await asyncio.to_thread(self._cache.get, key)
+        if entry is not None and self._cache.is_fresh(entry):
+            self._cache.stats['hits'] += 1
+            return self._from_cache(entry, request)
+
+        if entry is not None:
+            if entry.etag:
+                request.headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                request.headers['If-Modified-Since'] = entry.last_modified
+        response = await self._transport.handle_async_request(request)
+
+        if entry is not None and response.status_code == 304:
+            await response.aclose()
+            await asyncio.to_thread(self._cache.refresh, key, response.headers.multi_items())
+            self._cache.stats['revalidated'] += 1
+            return self._from_cache(entry, request)
+
+        self._cache.stats['misses'] += 1
+        if not self._storable(url, response):
+            return response
+
+        # Keep the body as received, so the client still decodes it
+        try:
+            body = b''.join([chunk async for chunk in response.stream])
+        finally:
+            await response.aclose()
+        headers = response.headers.multi_items()
+        await asyncio.to_thread(self._cache.put, key, url, response.status_code, headers, body)
+        return httpx.Response(
+            response.status_code, headers=headers, stream=httpx.ByteStream(body),
+            request=request, extensions=response.extensions
+        )
+
+    def _storable(self, url: str, response: httpx.Response) -> bool:
+        """Check whether a fresh response should be read into the cache."""
+        if response.status_code != 200 or 'no-store' in _cache_directives(response.headers):
+            return False
+        if self._cache.ttl_for(url) <= 0:
+            return False
+        length = response.headers.get('content-length')
+        return not (length and length.isdigit() and int(length) > self._cache.max_entry_size)
+
+    @staticmethod
+    def _from_cache(entry: CachedResponse, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            entry.status, headers=entry.headers, stream=httpx.ByteStream(entry.body), request=request
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def cached_transport(transport: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+    """Wrap a transport in a ``CachingTransport`` if the response cache is enabled.
+
+    Args:
+        transport (httpx.AsyncBaseTransport): Transport to wrap
+
+    Returns:
+        httpx.AsyncBaseTransport: The caching transport, or ``transport`` itself
+    """
+    cache = get_response_cache()
+    return CachingTransport(transport, cache) if cache else transport
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the process-wide response cache, opening it on first use.
+
+    Returns:
+        ResponseCache: Cache stored at ``HTTP_CACHE_PATH``, or None if
+            ``HTTP_CACHE_ENABLED`` is off
+    """
+    global _default_cache
+    if not HTTP_CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
@@ -1,20 +1,511 @@
-from typing import Optional
+import asyncio
+import mmap
+import multiprocessing
+import re
+import zlib
+from collections import namedtuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 import PyPDF2
 
+from src.config import PDF_PROCESS_WORKERS
+
+
+class PdfStructureError(Exception):
+    """Raised when the fast PDF reader meets a structure it does not handle."""
+
+
+# Indirect object reference, e.g. ``3 0 R``
+_Ref = namedtuple('_Ref', 'num gen')
+
+_WHITESPACE_RE = re.compile(rb'(?:[\x00\t\n\x0c\r ]+|%[^\r\n]*)*')
+_NUMBER_RE = re.compile(rb'[+-]?(?:\d+\.?\d*|\.\d+)')
+_NAME_RE = re.compile(rb'/[^\x00\t\n\x0c\r ()<>\[\]{}/%]*')
+_KEYWORD_RE = re.compile(rb'[A-Za-z]+')
+_REF_SUFFIX_RE = re.compile(rb'\s+(\d+)\s+R(?![^\x00\t\n\x0c\r ()<>\[\]{}/%])')
+_OBJ_HEADER_RE = re.compile(rb'\s*(\d+)\s+(\d+)\s+obj')
+
+
+class _FastPdfReader:
+    """Minimal reader that follows the cross-reference data to the page tree root.
+
+    Only the objects on the path trailer -> /Root -> /Pages are parsed, so
+    the cost is independent of the number of pages. Classic xref tables,
+    xref streams, object streams, hybrid files and incremental updates are
+    supported; anything else raises ``PdfStructureError``.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        # Object number -> ('n', offset), ('s', stream object number, index) or None if free
+        self.xref: Dict[int, Optional[tuple]] = {}
+        self.trailer: Dict[str, Any] = {}
+        self._object_streams: Dict[int, Tuple[bytes, List[int], int]] = {}
+
+    # Lexing and parsing
+
+    def _skip_whitespace(self, pos: int) -> int:
+        return _WHITESPACE_RE.match(self.data, pos).end()
+
+    def _parse(self, pos: int, data=None) -> Tuple[Any, int]:
+        """Parse one PDF object starting at ``pos``."""
+        data = self.data if data is None else data
+        pos = _WHITESPACE_RE.match(data, pos).end()
+        lead = data[pos:pos + 2]
+
+        if lead == b'<<':
+            result = {}
+            pos += 2
+            while True:
+                pos = _WHITESPACE_RE.match(data, pos).end()
+                if data[pos:pos + 2] == b'>>':
+                    return result, pos + 2
+                key = _NAME_RE.match(data, pos)
+                if not key:
+                    raise PdfStructureError(f"Expected a name at offset {pos}")
+                value, pos = self._parse(key.end(), data)
+                result[key.group()[1:].decode('latin-1')] = value
+        if lead[:1] == b'[':
+            result = []
+            pos += 1
+            while True:
+                pos = _WHITESPACE_RE.match(data, pos).end()
+                if data[pos:pos + 1] == b']':
+                    return result, pos + 1
+                value, pos = self._parse(pos, data)
+                result.append(value)
+        if lead[:1] == b'<':
+            end = data.find(b'>', pos)
+            if end < 0:
+                raise PdfStructureError("Unterminated hex string")
+            return data[pos + 1:end], end + 1
+        if lead[:1] == b'(':
+            return self._parse_literal_string(pos, data)
+        if lead[:1] == b'/':
+            name = _NAME_RE.match(data, pos)
+            return name.group()[1:].decode('latin-1'), name.end()
+
+        number = _NUMBER_RE.match(data, pos)
+        if number:
+            text = number.group()
+            if b'.' in text:
+                return float(text), number.end()
+            value = int(text)
+            # An indirect reference is "<num> <gen> R"
+            ref = _REF_SUFFIX_RE.match(data, number.end())
+            if ref:
+                return _Ref(value, int(ref.group(1))), ref.end()
+            return value, number.end()
+
+        keyword = _KEYWORD_RE.match(data, pos)
+        if keyword:
+            word = keyword.group()
+            if word == b'true':
+                return True, keyword.end()
+            if word == b'false':
+                return False, keyword.end()
+            if word == b'null':
+                return None, keyword.end()
+        raise PdfStructureError(f"Unexpected token at offset {pos}")
+
+    def _parse_literal_string(self, pos: int, data) -> Tuple[bytes, int]:
+        """Skip a parenthesized string, honouring nesting and escapes."""
+        depth = 0
+        start = pos
+        end = len(data)
+        while pos < end:
+            char = data[pos]
+            if char == 0x5C:  # backslash
+                pos += 2
+                continue
+            if char == 0x28:  # (
+                depth += 1
+            elif char == 0x29:  # )
+                depth -= 1
+                if depth == 0:
+                    return data[start + 1:pos], pos + 1
+            pos += 1
+        raise PdfStructureError("Unterminated string")
+
+    # Streams
+
+    def _read_stream(self, stream_dict: Dict[str, Any], pos: int) -> bytes:
+        """Read and decode the stream that follows a dictionary ending at ``pos``."""
+        pos = self._skip_whitespace(pos)
+        if self.data[pos:pos + 6] != b'stream':
+            raise PdfStructureError("Expected a stream")
+        pos += 6
+        if self.data[pos:pos + 2] == b'\r\n':
+            pos += 2
+        elif self.data[pos:pos + 1] in (b'\n', b'\r'):
+            pos += 1
+
+        length = stream_dict.get('Length')
+        if isinstance(length, _Ref):
+            length = self.resolve(length)
+        if not isinstance(length, int) or self.data[pos + length:pos + length + 12].strip()[:9] != b'endstream':
+            end = self.data.find(b'endstream', pos)
+            if end < 0:
+                raise PdfStructureError("Unterminated stream")
+            length = end - pos
+        raw = self.data[pos:pos + length]
+
+        filters = self.resolve(stream_dict.get('Filter'))
+        params = self.resolve(stream_dict.get('DecodeParms'))
+        if isinstance(filters, str):
+            filters, params = [filters], [params]
+        for index, name in enumerate(filters or []):
+            if self.resolve(name) != 'FlateDecode':
+                raise PdfStructureError(f"Unsupported stream filter {name}")
+            raw = zlib.decompress(raw)
+            param = self.resolve(params[index] if isinstance(params, list) and index < len(params) else params)
+            if isinstance(param, dict):
+                param = {key: self.resolve(value) for key, value in param.items()}
+            raw = _apply_predictor(raw, param)
+        return raw
+
+    # Cross-reference data
+
+    def _read_xref_table(self, pos: int) -> Dict[str, Any]:
+        """Read a classic ``xref`` table and the trailer after it."""
+        trailer_pos = self.data.find(b'trailer', pos)
+        if trailer_pos < 0:
+            raise PdfStructureError("Missing trailer")
+        tokens = self.data[pos + 4:trailer_pos].split()
+        i = 0
+        while i + 1 < len(tokens):
+            first, count = int(tokens[i]), int(tokens[i + 1])
+            i += 2
+            for num in range(first, first + count):
+                offset, kind = tokens[i], tokens[i + 2]
+                i += 3
+                if num not in self.xref:
+                    self.xref[num] = ('n', int(offset)) if kind == b'n' else None
+        trailer, _ = self._parse(trailer_pos + 7)
+        if 'XRefStm' in trailer:
+            self._read_xref_stream(trailer['XRefStm'])
+        return trailer
+
+    def _read_xref_stream(self, pos: int) -> Dict[str, Any]:
+        """Read a cross-reference stream; its dictionary doubles as the trailer."""
+        header = _OBJ_HEADER_RE.match(self.data, pos)
+        if not header:
+            raise PdfStructureError(f"No xref at offset {pos}")
+        stream_dict, end = self._parse(header.end())
+        if stream_dict.get('Type') != 'XRef':
+            raise PdfStructureError("Object at startxref is not an xref stream")
+        rows = self._read_stream(stream_dict, end)
+
+        widths = stream_dict['W']
+        row_size = sum(widths)
+        index = stream_dict.get('Index', [0, stream_dict['Size']])
+        row = 0
+        for first, count in zip(index[0::2], index[1::2]):
+            for num in range(first, first + count):
+                start = row * row_size
+                row += 1
+                fields = []
+                for width in widths:
+                    fields.append(int.from_bytes(rows[start:start + width], 'big') if width else None)
+                    start += width
+                kind = 1 if fields[0] is None else fields[0]
+                if num in self.xref:
+                    continue
+                if kind == 1:
+                    self.xref[num] = ('n', fields[1])
+                elif kind == 2:
+                    self.xref[num] = ('s', fields[1], fields[2] or 0)
+                else:
+                    self.xref[num] = None
+        return stream_dict
+
+    def read_cross_references(self):
+        """Follow ``startxref`` and every ``/Prev`` link, newest section first."""
+        tail_start = max(0, len(self.data) - 4096)
+        startxref = self.data.rfind(b'startxref', tail_start)
+        if startxref < 0:
+            raise PdfStructureError("Missing startxref")
+        offset, _ = self._parse(startxref + 9)
+
+        seen = set()
+        while isinstance(offset, int) and offset not in seen:
+            seen.add(offset)
+            if self.data[offset:offset + 4] == b'xref':
+                trailer = self._read_xref_table(offset)
+            else:
+                trailer = self._read_xref_stream(offset)
+            for key, value in trailer.items():
+                self.trailer.setdefault(key, value)
+            offset = trailer.get('Prev')
+
+    # Objects
+
+    def resolve(self, value: Any) -> Any:
+        """Return the object a reference points to, or the value itself."""
+        if not isinstance(value, _Ref):
+            return value
+        entry = self.xref.get(value.num)
+        if entry is None:
+            if value.num in self.xref:
+                raise PdfStructureError(f"Object {value.num} is not in use")
+            # Objects needed before their xref section is read, such as an
+            # xref stream's indirect /DecodeParms, are found by their header
+            return self._find_object(value.num)
+        if entry[0] == 'n':
+            header = _OBJ_HEADER_RE.match(self.data, entry[1])
+            if not header or int(header.group(1)) != value.num:
+                raise PdfStructureError(f"Object {value.num} is not at its xref offset")
+            obj, _ = self._parse(header.end())
+            return obj
+        return self._read_compressed_object(entry[1], entry[2])
+
+    def _find_object(self, num: int) -> Any:
+        """Read the newest definition of an object that no xref section lists yet."""
+        header = None
+        for header in re.finditer(rb'(?<![0-9])%d\s+\d+\s+obj' % num, self.data):
+            pass
+        if header is None:
+            raise PdfStructureError(f"Object {num} not found")
+        obj, _ = self._parse(header.end())
+        return obj
+
+    def _read_compressed_object(self, stream_num: int, index: int) -> Any:
+        """Read an object stored inside an object stream."""
+        if stream_num not in self._object_streams:
+            entry = self.xref.get(stream_num)
+            if not entry or entry[0] != 'n':
+                raise PdfStructureError(f"Object stream {stream_num} not found")
+            header = _OBJ_HEADER_RE.match(self.data, entry[1])
+            if not header:
+                raise PdfStructureError(f"Object stream {stream_num} is not at its xref offset")
+            stream_dict, end = self._parse(header.end())
+            content = self._read_stream(stream_dict, end)
+            pairs = content[:stream_dict['First']].split()
+            offsets = [int(offset) for offset in pairs[1::2]]
+            self._object_streams[stream_num] = (content, offsets, stream_dict['First'])
+        content, offsets, first = self._object_streams[stream_num]
+        obj, _ = self._parse(first + offsets[index], content)
+        return obj
+
+    def page_count(self) -> int:
+        """Read ``/Count`` from the root of the page tree."""
+        self.read_cross_references()
+        if 'Encrypt' in self.trailer:
+            raise PdfStructureError("Encrypted PDF")
+        catalog = self.resolve(self.trailer['Root'])
+        pages = self.resolve(catalog['Pages'])
+        count = self.resolve(pages['Count'])
+        if not isinstance(count, int) or count < 0:
+            raise PdfStructureError("Invalid page count")
+        return count
+
+
+def _apply_predictor(data: bytes, params: Optional[Dict[str, Any]]) -> bytes:
+    """Undo a PNG predictor applied before Flate compression."""
+    if not params or params.get('Predictor', 1) < 10:
+        if params and params.get('Predictor', 1) == 2:
+            raise PdfStructureError("TIFF predictor is not supported")
+        return data
+
+    columns = params.get('Columns', 1)
+    bpp = max(1, params.get('Colors', 1) * params.get('BitsPerComponent', 8) // 8)
+    row_length = columns * bpp
+    output = bytearray()
+    previous = bytearray(row_length)
+    for start in range(0, len(data), row_length + 1):
+        filter_type = data[start]
+        row = bytearray(data[start + 1:start + 1 + row_length])
+        for i in range(len(row)):
+            left = row[i - bpp] if i >= bpp else 0
+            up = previous[i]
+            if filter_type == 1:
+                row[i] = (row[i] + left) & 0xFF
+            elif filter_type == 2:
+                row[i] = (row[i] + up) & 0xFF
+            elif filter_type == 3:
+                row[i] = (row[i] + ((left + up) >> 1)) & 0xFF
+            elif filter_type == 4:
+                up_left = previous[i - bpp] if i >= bpp else 0
+                estimate = left + up - up_left
+                distances = (abs(estimate - left), abs(estimate - up), abs(estimate - up_left))
+                row[i] = (row[i] + (left, up, up_left)[distances.index(min(distances))]) & 0xFF
+            elif filter_type != 0:
+                raise PdfStructureError(f"Unknown PNG predictor {filter_type}")
+        output += row
+        previous = row
+    return bytes(output)
+
+
+def count_pdf_pages_fast(file_path: str) -> int:
+    """Count pages by memory-mapping the file and reading the page tree root.
+
+    Args:
+        file_path (str): Path to the PDF file
+
+    Returns:
+        int: Number of pages declared by the root ``/Pages`` node
+
+    Raises:
+        PdfStructureError: If the file's structure is damaged or unsupported
+        OSError: If the file cannot be read
+    """
+    with open(file_path, 'rb') as file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:
+            # Empty files cannot be mapped
+            raise PdfStructureError(str(e))
+        with data:
+            try:
+                return _FastPdfReader(data).page_count()
+            except PdfStructureError:
+                raise
+            except Exception as e:
+                # Anything the minimal reader trips over, including
+                # RecursionError on deeply nested objects, goes to PyPDF2
+                raise PdfStructureError(f"Malformed PDF: {e!r}")
+
 
 def get_pdf_page_count(file_path: str) -> Optional[int]:
     """Get the number of pages in a PDF file.
-    
+
+    Tries ``count_pdf_pages_fast`` first and only builds a full PyPDF2
+    reader for damaged or unusual files it cannot handle.
+
     Args:
         file_path (str): Path to the PDF file
-        
+
     Returns:
         int: Number of pages in the PDF or None if an error occurs
     """
+    try:
+        return count_pdf_pages_fast(file_path)
+    except (PdfStructureError, OSError):
+        pass
+
     try:
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
             return len(pdf_reader.pages)
     except Exception as e:
         print(f"Error reading PDF file: {e}")
-        return None 
\ No newline at end of file
+        return None
+
+
+def analyze_pdf(file_path: str) -> Dict[str, Any]:
+    """Collect the per-file metadata stored for a downloaded FDD.
+
+    This is the unit of work run in ``PdfProcessor``'s worker processes, so
+    it must stay a picklable module-level function.
+
+    Args:
+        file_path (str): Path to the PDF file
+
+    Returns:
+        dict: PDF metadata keyed by fdd_metadata column
+    """
+    return {
+        'num_pages': get_pdf_page_count(file_path)
+    }
+
+
+def extract_pdf_text(file_path: str) -> Optional[List[str]]:
+    """Extract the text of every page of a PDF file.
+
+    Like ``analyze_pdf`` this runs in ``PdfProcessor``'s worker processes.
+
+    Args:
+        file_path (str): Path to the PDF file
+
+    Returns:
+        list: Text of each page in order, empty for pages without any, or
+            None if the file cannot be read
+    """
+    try:
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            pages = []
+            for page in pdf_reader.pages:
+                try:
+                    pages.append(page.extract_text() or '')
+                except Exception as e:
+                    print(f"Error extracting text from a page of {file_path}: {e}")
+                    pages.append('')
+            return pages
+    except Exception as e:
+        print(f"Error reading PDF file: {e}")
+        return None
+
+
+# Workers are started from a clean process rather than forked: the crawler
+# has the database writer, snapshot and browser threads running, and a fork
+# copies whatever locks they hold
+_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class PdfProcessor:
+    """Runs CPU-bound PDF post-processing in a pool of worker processes.
+
+    Parsing large FDDs in the crawler's own thread would stall the event
+    loop; the pool lets parsing use every core while the network keeps going.
+    """
+
+    def __init__(self, workers: int = PDF_PROCESS_WORKERS):
+        """Initialize the processor.
+
+        Args:
+            workers (int): Number of worker processes. 0 runs the work in a
+                single background thread instead, for platforms where
+                starting processes is undesirable.
+        """
+        self.workers = workers
+        self._executor: Optional[Executor] = None
+
+    def start(self):
+        """Start the worker pool."""
+        if self._executor is None:
+            if self.workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(_START_METHOD)
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def close(self):
+        """Wait for queued work to finish and stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def analyze(self, file_path: str) -> Dict[str, Any]:
+        """Analyze a PDF in the worker pool without blocking the event loop.
+
+        Args:
+            file_path (str): Path to the PDF file
+
+        Returns:
+            dict: PDF metadata keyed by fdd_metadata column
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, analyze_pdf, file_path)
+
+    async def extract_text(self, file_path: str) -> Optional[List[str]]:
+        """Extract a PDF's page text in the worker pool without blocking the event loop.
+
+        Args:
+            file_path (str): Path to the PDF file
+
+        Returns:
+            list: Text of each page, or None if the file cannot be read
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, extract_pdf_text, file_path)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,426 @@
+import asyncio
+import atexit
+import gzip
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency, gzip is used without it
+    zstandard = None
+
+from src.config import (
+    SNAPSHOT_DIR,
+    SNAPSHOT_SEGMENT_SIZE,
+    SNAPSHOT_COMPRESSION,
+    SNAPSHOT_QUEUE_SIZE,
+    SNAPSHOT_BATCH_SIZE,
+    SNAPSHOT_FULL_POLICY
+)
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed snapshots")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class SnapshotStore:
+    """Append-only archive of scraped HTML pages.
+
+    Pages are compressed one by one and appended to large segment files,
+    with a SQLite index recording where each distinct page (by SHA-256 of its
+    content) lives and every time a URL was captured. A page seen again is
+    only indexed, not written, and reading many snapshots walks each segment
+    front to back.
+    """
+
+    def __init__(self, root: Optional[Path] = None,
+                 segment_size: int = SNAPSHOT_SEGMENT_SIZE,
+                 compression: str = SNAPSHOT_COMPRESSION):
+        """Initialize the store, creating its directory and index if needed.
+
+        Args:
+            root (Path, optional): Directory holding segments and the index,
+                defaults to ``SNAPSHOT_DIR``
+            segment_size (int): Size in bytes after which a new segment is started
+            compression (str): "zstd" or "gzip"; zstd falls back to gzip if the
+                zstandard package is not installed
+        """
+        self.root = Path(root) if root else SNAPSHOT_DIR
+        self.segment_size = segment_size
+        self.compression = 'zstd' if compression == 'zstd' and zstandard is not None else 'gzip'
+        os.makedirs(self.root, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.root / 'index.sqlite'), check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self._initialize_index()
+        self._segment = self._last_segment()
+        self._segment_file = None
+
+    def _initialize_index(self):
+        self.connection.executescript('''
+        CREATE TABLE IF NOT EXISTS snapshot_blobs (
+            sha256 TEXT PRIMARY KEY,
+            segment INTEGER NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            compression TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT,
+            name TEXT,
+            captured_at TEXT NOT NULL,
+            sha256 TEXT NOT NULL REFERENCES snapshot_blobs (sha256)
+        );
+        CREATE INDEX IF NOT EXISTS idx_snapshots_url ON snapshots (url, captured_at);
+        ''')
+        self.connection.commit()
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.root / f"segment-{segment:06d}.seg"
+
+    def _last_segment(self) -> int:
+        segments = [int(path.stem.split('-')[1]) for path in self.root.glob('segment-*.seg')]
+        return max(segments, default=1)
+
+    def _append(self, frame: bytes) -> Tuple[int, int]:
+        """Append a frame to the open segment, rolling over to a new one when full.
+
+        Frames are flushed as they are written, so readers never need the lock.
+
+        Returns:
+            tuple: Segment number and offset of the frame
+        """
+        if self._segment_file is None:
+            self._segment_file = open(self._segment_path(self._segment), 'ab')
+        offset = self._segment_file.tell()
+        if offset and offset + len(frame) > self.segment_size:
+            self._segment_file.close()
+            self._segment += 1
+            self._segment_file = open(self._segment_path(self._segment), 'ab')
+            offset = 0
+        self._segment_file.write(frame)
+        self._segment_file.flush()
+        return self._segment, offset
+
+    def put(self, content: str, url: Optional[str] = None, name: Optional[str] = None,
+            captured_at: Optional[datetime] = None) -> str:
+        """Archive a page.
+
+        Args:
+            content (str): HTML of the page
+            url (str, optional): URL the page was loaded from
+            name (str, optional): Descriptive name, e.g. ``search_results_Subway``
+            captured_at (datetime, optional): Capture time, defaults to now
+
+        Returns:
+            str: Hex SHA-256 of the content
+        """
+        return self.put_many([{'content': content, 'url': url, 'name': name, 'captured_at': captured_at}])[0]
+
+    def put_many(self, pages: Iterable[Dict[str, Any]]) -> List[str]:
+        """Archive several pages in one index transaction.
+
+        Args:
+            pages (iterable): Dicts with ``content`` and optionally ``url``,
+                ``name``, ``captured_at`` and a precomputed ``sha256``
+
+        Returns:
+            list: Hex SHA-256 of each page's content
+        """
+        hashes = []
+        with self._lock:
+            for page in pages:
+                data = page['content'].encode('utf-8')
+                sha256 = page.get('sha256') or hashlib.sha256(data).hexdigest()
+                captured_at = (page.get('captured_at') or datetime.now()).isoformat()
+
+                known = self.connection.execute(
+                    "SELECT 1 FROM snapshot_blobs WHERE sha256 = ?", (sha256,)
+                ).fetchone()
+                if not known:
+                    frame = _compress(data, self.compression)
+                    segment, offset = self._append(frame)
+                    self.connection.execute(
+                        "INSERT INTO snapshot_blobs (sha256, segment, offset, length, size, compression) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (sha256, segment, offset, len(frame), len(data), self.compression)
+                    )
+                self.connection.execute(
+                    "INSERT INTO snapshots (url, name, captured_at, sha256) VALUES (?, ?, ?, ?)",
+                    (page.get('url'), page.get('name'), captured_at, sha256)
+                )
+                hashes.append(sha256)
+            self.connection.commit()
+        return hashes
+
+    def _read(self, blob: sqlite3.Row, file=None) -> str:
+        if file is None:
+            with open(self._segment_path(blob['segment']), 'rb') as segment_file:
+                return self._read(blob, segment_file)
+        file.seek(blob['offset'])
+        return _decompress(file.read(blob['length']), blob['compression']).decode('utf-8')
+
+    def get(self, sha256: str) -> Optional[str]:
+        """Get an archived page by content hash.
+
+        Args:
+            sha256 (str): Hex SHA-256 of the content
+
+        Returns:
+            str: HTML of the page or None if it is not archived
+        """
+        with self._lock:
+            blob = self.connection.execute(
+                "SELECT * FROM snapshot_blobs WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+        if blob is None:
+            return None
+        return self._read(blob)
+
+    def latest(self, url: str) -> Optional[str]:
+        """Get the most recent capture of a URL.
+
+        Args:
+            url (str): URL of the page
+
+        Returns:
+            str: HTML of the page or None if the URL was never captured
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT sha256 FROM snapshots WHERE url = ? ORDER BY captured_at DESC, id DESC LIMIT 1", (url,)
+            ).fetchone()
+        return self.get(row['sha256']) if row else None
+
+    def iter_snapshots(self, name_prefix: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Read many snapshots in storage order.
+
+        Each distinct page is decompressed once and segments are read front
+        to back, so bulk exports use sequential I/O.
+
+        Args:
+            name_prefix (str, optional): Only snapshots whose name starts with this
+
+        Yields:
+            dict: Snapshot ``url``, ``name``, ``captured_at``, ``sha256`` and ``content``
+        """
+        query = '''
+        SELECT s.url, s.name, s.captured_at, s.sha256, b.segment, b.offset, b.length, b.compression
+        FROM snapshots s JOIN snapshot_blobs b ON b.sha256 = s.sha256
+        '''
+        params = ()
+        if name_prefix:
+            query += " WHERE s.name LIKE ? ESCAPE '\\'"
+            escaped = name_prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params = (escaped + '%',)
+        query += " ORDER BY b.segment, b.offset, s.id"
+
+        with self._lock:
+            rows = self.connection.execute(query, params).fetchall()
+        segment, segment_file = None, None
+        last_sha256, content = None, None
+        try:
+            for row in rows:
+                if row['segment'] != segment:
+                    if segment_file:
+                        segment_file.close()
+                    segment = row['segment']
+                    segment_file = open(self._segment_path(segment), 'rb')
+                if row['sha256'] != last_sha256:
+                    content = self._read(row, segment_file)
+                    last_sha256 = row['sha256']
+                yield {
+                    'url': row['url'],
+                    'name': row['name'],
+                    'captured_at': row['captured_at'],
+                    'sha256': row['sha256'],
+                    'content': content
+                }
+        finally:
+            if segment_file:
+                segment_file.close()
+
+    def close(self):
+        """Close the open segment and the index."""
+        with self._lock:
+            if self._segment_file is not None:
+                self._segment_file.close()
+                self._segment_file = None
+            self.connection.close()
+
+
+# Marks the end of the writer's input
+_STOP = object()
+
+
+class SnapshotWriter:
+    """Background thread that archives snapshots for the scrapers.
+
+    ``submit`` only hashes the page and queues it, so callers never wait
+    on compression or disk writes. The thread drains the queue in batches,
+    one index transaction per batch. When the disk falls behind and the
+    bounded queue fills up, the policy decides whether ``submit`` blocks
+    until there is room (backpressure) or drops the page. Coroutines use
+    ``submit_async``, which waits for room without blocking the event loop.
+    """
+
+    def __init__(self, store: Optional[SnapshotStore] = None,
+                 queue_size: int = SNAPSHOT_QUEUE_SIZE,
+                 batch_size: int = SNAPSHOT_BATCH_SIZE,
+                 policy: str = SNAPSHOT_FULL_POLICY):
+        """Initialize the writer and start its thread.
+
+        Args:
+            store (SnapshotStore, optional): Store to write to, defaults to one under ``SNAPSHOT_DIR``
+            queue_size (int): Pages that may wait to be written
+            batch_size (int): Most pages written per index transaction
+            policy (str): "block" or "drop", what ``submit`` does when the queue is full
+        """
+        if policy not in ('block', 'drop'):
+            raise ValueError(f"Unknown snapshot queue policy: {policy}")
+        self.store = store or SnapshotStore()
+        self.batch_size = batch_size
+        self.policy = policy
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='snapshot-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, content: str, url: Optional[str] = None, name: Optional[str] = None) -> Optional[str]:
+        """Queue a page to be archived.
+
+        Args:
+            content (str): HTML of the page
+            url (str, optional): URL the page was loaded from
+            name (str, optional): Descriptive name of the page
+
+        Returns:
+            str: Hex SHA-256 of the content, or None if the page was dropped
+        """
+        page = self._make_page(content, url, name)
+        try:
+            self._queue.put(page, block=self.policy == 'block')
+        except queue.Full:
+            return self._drop(page)
+        return page['sha256']
+
+    async def submit_async(self, content: str, url: Optional[str] = None,
+                           name: Optional[str] = None) -> Optional[str]:
+        """Queue a page to be archived from a coroutine.
+
+        With the "block" policy a full queue suspends only the calling
+        coroutine, while a worker thread waits for room.
+
+        Args:
+            content (str): HTML of the page
+            url (str, optional): URL the page was loaded from
+            name (str, optional): Descriptive name of the page
+
+        Returns:
+            str: Hex SHA-256 of the content, or None if the page was dropped
+        """
+        page = self._make_page(content, url, name)
+        try:
+            self._queue.put_nowait(page)
+        except queue.Full:
+            if self.policy == 'drop':
+                return self._drop(page)
+            await asyncio.to_thread(self._queue.put, page)
+        return page['sha256']
+
+    def _make_page(self, content: str, url: Optional[str], name: Optional[str]) -> Dict[str, Any]:
+        if self._closed:
+            raise RuntimeError("Snapshot writer is closed")
+        sha256 = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        return {'content': content, 'url': url, 'name': name, 'captured_at': datetime.now(), 'sha256': sha256}
+
+    def _drop(self, page: Dict[str, Any]) -> None:
+        self.dropped += 1
+        print(f"Snapshot queue full, dropped snapshot {page['name'] or page['url']}")
+        return None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while item is not _STOP and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            pages = [page for page in batch if page is not _STOP]
+            try:
+                if pages:
+                    self.store.put_many(pages)
+            except Exception as e:
+                print(f"Error writing snapshots: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if item is _STOP:
+                return
+
+    def flush(self):
+        """Wait until every queued page has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Write everything still queued, then stop the thread and close the store."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self.store.close()
+
+
+_default_writer: Optional[SnapshotWriter] = None
+_default_writer_lock = threading.Lock()
+
+
+def get_snapshot_writer() -> SnapshotWriter:
+    """Get the process-wide snapshot writer, starting it on first use.
+
+    The writer is closed at interpreter exit, so queued pages are written
+    even if nobody calls ``close_snapshot_writer``.
+
+    Returns:
+        SnapshotWriter: Writer archiving to ``SNAPSHOT_DIR``
+    """
+    global _default_writer
+    with _default_writer_lock:
+        if _default_writer is None:
+            _default_writer = SnapshotWriter()
+            atexit.register(close_snapshot_writer)
+        return _default_writer
+
+
+def close_snapshot_writer():
+    """Flush and close the process-wide snapshot writer, if it was started."""
+    global _default_writer
+    with _default_writer_lock:
+        writer, _default_writer = _default_writer, None
+    if writer is not None:
+        writer.close()
@@ -0,0 +1,89 @@
+"""Synthetic PDFs the size and shape of an FDD, for tests and benchmarks."""
+
+import zlib
+
+
+def make_synthetic_pdf(num_pages, xref_stream=False, page_text_lines=40):
+    """Build a PDF with the given number of text pages.
+
+    Args:
+        num_pages (int): Number of pages
+        xref_stream (bool): Store the page objects in an object stream indexed
+            by a compressed cross-reference stream (PDF 1.5) instead of a
+            classic xref table
+        page_text_lines (int): Lines of text in each page's content stream
+
+    Returns:
+        bytes: The PDF file's content
+    """
+    # Object 1 is the catalog, 2 the page tree, 3 the font, then one page
+    # and one content stream per page
+    page_nums = [4 + 2 * i for i in range(num_pages)]
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % n for n in page_nums)
+           + b"] /Count %d >>" % num_pages,
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    streams = {}
+    for i, num in enumerate(page_nums):
+        objects[num] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                        b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (num + 1))
+        lines = b"".join(b"0 -14 Td (Page %d line %d of the synthetic disclosure document) Tj\n" % (i + 1, j)
+                         for j in range(page_text_lines))
+        streams[num + 1] = b"BT /F1 10 Tf 72 740 Td\n" + lines + b"ET"
+
+    out = bytearray(b"%PDF-1.5\n%\xe2\xe3\xcf\xd3\n")
+    offsets = {}
+
+    def write_object(num, body):
+        offsets[num] = len(out)
+        out.extend(b"%d 0 obj\n" % num + body + b"\nendobj\n")
+
+    for num, content in streams.items():
+        write_object(num, b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+
+    size = max(list(objects) + list(streams)) + 1
+    if not xref_stream:
+        for num, body in objects.items():
+            write_object(num, body)
+        xref_offset = len(out)
+        out.extend(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for num in range(1, size):
+            out.extend(b"%010d 00000 n \n" % offsets[num])
+        out.extend(b"trailer\n<< /Size %d /Root 1 0 R >>\n" % size)
+    else:
+        # Pack the dictionaries into one object stream
+        stream_num, xref_num = size, size + 1
+        header, body, positions = [], bytearray(), {}
+        for index, (num, obj) in enumerate(objects.items()):
+            positions[num] = index
+            header.append(b"%d %d" % (num, len(body)))
+            body.extend(obj + b"\n")
+        header = b" ".join(header) + b"\n"
+        packed = zlib.compress(header + bytes(body))
+        write_object(stream_num, b"<< /Type /ObjStm /N %d /First %d /Length %d /Filter /FlateDecode >>\nstream\n"
+                     % (len(objects), len(header), len(packed)) + packed + b"\nendstream")
+
+        xref_offset = len(out)
+        rows = bytearray()
+        previous = bytes(7)
+        for num in range(xref_num + 1):
+            if num == 0:
+                row = bytes([0]) + bytes(4) + b"\xff\xff"
+            elif num in positions:
+                row = bytes([2]) + stream_num.to_bytes(4, 'big') + positions[num].to_bytes(2, 'big')
+            else:
+                offset = xref_offset if num == xref_num else offsets[num]
+                row = bytes([1]) + offset.to_bytes(4, 'big') + bytes(2)
+            # PNG "Up" predictor, as most writers use
+            rows.append(2)
+            rows.extend((a - b) & 0xFF for a, b in zip(row, previous))
+            previous = row
+        packed = zlib.compress(bytes(rows))
+        offsets[xref_num] = xref_offset
+        out.extend(b"%d 0 obj\n<< /Type /XRef /Size %d /W [1 4 2] /Root 1 0 R /Filter /FlateDecode "
+                   b"/DecodeParms << /Columns 7 /Predictor 12 >> /Length %d >>\nstream\n"
+                   % (xref_num, xref_num + 1, len(packed)) + packed + b"\nendstream\nendobj\n")
+    out.extend(b"startxref\n%d\n%%%%EOF\n" % xref_offset)
+    return bytes(out)
@@ -0,0 +1,257 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.config import (
+    PER_HOST_CONCURRENCY,
+    RATE_LIMIT_INITIAL_RPS,
+    RATE_LIMIT_MIN_RPS,
+    RATE_LIMIT_MAX_RPS,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_INCREASE_RPS,
+    RATE_LIMIT_DECREASE_FACTOR,
+    RATE_LIMIT_LATENCY_TARGET
+)
+
+
+def get_host(url: str) -> str:
+    """Get the host part of a URL.
+
+    Args:
+        url (str): URL to inspect
+
+    Returns:
+        str: Lower-cased host name, or an empty string for relative URLs
+    """
+    return (urlsplit(url).hostname or '').lower()
+
+
+class HostConcurrencyLimiter:
+    """Caps the number of in-flight requests to each host."""
+
+    def __init__(self, limit: int = PER_HOST_CONCURRENCY):
+        """Initialize the limiter.
+
+        Args:
+            limit (int): Maximum concurrent requests per host
+        """
+        if limit < 1:
+            raise ValueError("Per-host concurrency limit must be at least 1")
+        self.limit = limit
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def acquire(self, url: str) -> AsyncIterator[None]:
+        """Hold one of the host's request slots for the duration of a ``with`` block.
+
+        Args:
+            url (str): URL that is about to be requested
+        """
+        host = get_host(url)
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.limit)
+        async with semaphore:
+            yield
+
+
+class _HostBucket:
+    """Token bucket and AIMD state for a single host."""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = now
+        self.paused_until = now
+        self.last_decrease = float('-inf')
+        self.latency = None
+
+
+class AdaptiveRateLimiter:
+    """Per-host token bucket whose rate adapts to how the server responds.
+
+    Each successful, fast response raises the host's rate additively. A 429,
+    a 5xx, a transport error or latency above the target cuts it
+    multiplicatively (AIMD), at most once per round trip so that one burst
+    of failures only counts once.
+    """
+
+    def __init__(self, initial_rate: float = RATE_LIMIT_INITIAL_RPS,
+                 min_rate: float = RATE_LIMIT_MIN_RPS,
+                 max_rate: float = RATE_LIMIT_MAX_RPS,
+                 burst: float = RATE_LIMIT_BURST,
+                 increase: float = RATE_LIMIT_INCREASE_RPS,
+                 decrease_factor: float = RATE_LIMIT_DECREASE_FACTOR,
+                 latency_target: float = RATE_LIMIT_LATENCY_TARGET,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the limiter.
+
+        Args:
+            initial_rate (float): Starting requests per second for each host
+            min_rate (float): Lowest rate backoff may reach
+            max_rate (float): Highest rate increases may reach
+            burst (float): Bucket capacity, i.e. requests allowed back to back
+            increase (float): Requests per second added after a good response
+            decrease_factor (float): Multiplier applied to the rate on backoff
+            latency_target (float): Smoothed latency in seconds above which to back off
+            clock (callable): Monotonic clock, replaceable for tests
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.clock = clock
+        self._buckets: Dict[str, _HostBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str, now: float) -> _HostBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _HostBucket(self.initial_rate, self.burst, now)
+        return bucket
+
+    def reserve(self, url: str) -> float:
+        """Take a token for a request to the URL's host.
+
+        Args:
+            url (str): URL that is about to be requested
+
+        Returns:
+            float: Seconds the caller must wait before sending the request
+        """
+        with self._lock:
+            now = self.clock()
+            bucket = self._bucket(get_host(url), now)
+            start = max(now, bucket.paused_until)
+            bucket.tokens = min(self.burst, bucket.tokens + (start - bucket.updated) * bucket.rate)
+            bucket.updated = start
+            bucket.tokens -= 1
+            wait = start - now
+            if bucket.tokens < 0:
+                wait += -bucket.tokens / bucket.rate
+            return wait
+
+    async def acquire(self, url: str):
+        """Wait until a request to the URL's host is allowed.
+
+        Args:
+            url (str): URL that is about to be requested
+        """
+        wait = self.reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, url: str, status: Optional[int], latency: float,
+               retry_after: Optional[float] = None):
+        """Adjust the host's rate from the outcome of a request.
+
+        Args:
+            url (str): URL that was requested
+            status (int, optional): HTTP status, or None if the request failed
+            latency (float): Seconds until the response headers arrived
+            retry_after (float, optional): Server-requested pause in seconds
+        """
+        with self._lock:
+            now = self.clock()
+            bucket = self._bucket(get_host(url), now)
+            if bucket.latency is None:
+                bucket.latency = latency
+            else:
+                bucket.latency = 0.8 * bucket.latency + 0.2 * latency
+
+            overloaded = status is None or status == 429 or status >= 500
+            if overloaded or bucket.latency > self.latency_target:
+                # Back off at most once per round trip
+                if now - bucket.last_decrease >= max(bucket.latency, 1 / bucket.rate):
+                    bucket.rate = max(self.min_rate, bucket.rate * self.decrease_factor)
+                    bucket.last_decrease = now
+                if retry_after:
+                    bucket.paused_until = max(bucket.paused_until, now + retry_after)
+            else:
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+    def rate(self, url: str) -> float:
+        """Get the current rate for the URL's host.
+
+        Args:
+            url (str): URL on the host
+
+        Returns:
+            float: Requests per second currently allowed
+        """
+        with self._lock:
+            return self._bucket(get_host(url), self.clock()).rate
+
+    async def call(self, url: str, request: Callable[[], Awaitable[Any]]) -> Any:
+        """Wait for a token, run a request and feed its outcome back.
+
+        Args:
+            url (str): URL being requested
+            request (callable): Zero-argument function returning the request
+                awaitable. Its result's ``status`` and ``headers`` are inspected.
+
+        Returns:
+            The request's result
+        """
+        await self.acquire(url)
+        start = self.clock()
+        try:
+            response = await request()
+        except Exception:
+            self.record(url, None, self.clock() - start)
+            raise
+        status = getattr(response, 'status', None)
+        if status is None:
+            status = getattr(response, 'status_code', None)
+        # Navigations that produce no response carry no signal either way
+        if status is not None:
+            self.record(url, status, self.clock() - start, _retry_after(response))
+        return response
+
+
+def _retry_after(response: Any) -> Optional[float]:
+    """Read a numeric Retry-After header from a response, if present."""
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('retry-after') or headers.get('Retry-After')
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that paces every request through an ``AdaptiveRateLimiter``."""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 limiter: Optional[AdaptiveRateLimiter] = None):
+        """Initialize the transport.
+
+        Args:
+            transport (httpx.AsyncBaseTransport, optional): Transport to wrap
+            limiter (AdaptiveRateLimiter, optional): Limiter to use, defaults
+                to the process-wide ``rate_limiter``
+        """
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self._limiter = limiter or rate_limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._limiter.call(
+            str(request.url),
+            lambda: self._transport.handle_async_request(request)
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# Process-wide limiters shared by every scraper and the downloader
+host_limiter = HostConcurrencyLimiter()
+rate_limiter = AdaptiveRateLimiter()
@@ -7,6 +7,14 @@ import os
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add the parent directory to sys.path to make src importable
 project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root)) 
\ No newline at end of file
+sys.path.insert(0, str(project_root)) 
+
+
+@pytest.fixture(autouse=True)
+def no_default_response_cache(monkeypatch):
+    """Keep tests from reading or filling the response cache under data/."""
+    monkeypatch.setattr('src.utils.http_cache.HTTP_CACHE_ENABLED', False)
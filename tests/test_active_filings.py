@@ -1,7 +1,6 @@
 import unittest
 import asyncio
 from unittest.mock import patch, MagicMock
-import pandas as pd
 
 from src.scrapers.active_filings import ActiveFilingsScraper, scrape_active_filings
 
@@ -34,9 +33,8 @@ class TestActiveFilingsScraper(unittest.TestCase):
         '''
 
     @patch('src.scrapers.active_filings.launch')
-    @patch('src.scrapers.active_filings.save_html_to_file')
-    @patch('src.scrapers.active_filings.pd.read_html')
-    def test_get_active_filings(self, mock_read_html, mock_save_html, mock_launch):
+    @patch('src.scrapers.active_filings.save_html_snapshot_async')
+    def test_get_active_filings(self, mock_save_html, mock_launch):
         """Test getting active filings."""
         # Set up mocks
         mock_browser = MagicMock()
@@ -58,13 +56,6 @@ class TestActiveFilingsScraper(unittest.TestCase):
         
         mock_save_html.return_value = "/path/to/html"
         
-        # Mock pandas.read_html
-        mock_df = pd.DataFrame({
-            'Franchise Name': ['Test Franchise 1', 'Test Franchise 2'],
-            'Expiration Date': ['12/31/2023', '12/31/2023']
-        })
-        mock_read_html.return_value = [mock_df]
-        
         # Create a scraper
         scraper = ActiveFilingsScraper()
         
@@ -91,7 +82,7 @@ class TestActiveFilingsScraper(unittest.TestCase):
         mock_browser.close.assert_not_called()  # We don't close in get_active_filings, only in scrape()
 
     @patch('src.scrapers.active_filings.launch')
-    @patch('src.scrapers.active_filings.save_html_to_file')
+    @patch('src.scrapers.active_filings.save_html_snapshot_async')
     def test_get_active_filings_no_table(self, mock_save_html, mock_launch):
         """Test getting active filings when the table is not found."""
         # Set up mocks
@@ -0,0 +1,77 @@
+import os
+import unittest
+import asyncio
+import sqlite3
+import tempfile
+
+from src.db.async_database import AsyncDatabase
+from src.db.database import Database
+
+
+class TestAsyncDatabase(unittest.TestCase):
+    """Test cases for the AsyncDatabase class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.temp_db_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_db_file.close()
+        with Database(self.temp_db_file.name) as db:
+            db.initialize_database()
+        self.async_db = AsyncDatabase(self.temp_db_file.name, read_connections=2)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.async_db.close()
+        os.unlink(self.temp_db_file.name)
+        self.loop.close()
+
+    def test_wal_journal_mode(self):
+        """Test that connections use write-ahead logging."""
+        mode = self.loop.run_until_complete(
+            self.async_db.read(lambda db: db.cursor.execute("PRAGMA journal_mode").fetchone()[0])
+        )
+        self.assertEqual(mode.lower(), 'wal')
+
+    def test_concurrent_writes_and_reads(self):
+        """Test that many coroutines can write at once and read back what they wrote."""
+        async def insert(i):
+            filing_id = await self.async_db.write(Database.insert_active_filing, f"Franchise {i}", "2023-12-31")
+            filing = await self.async_db.read(Database.get_franchise_by_name, f"Franchise {i}")
+            return filing_id, filing['id']
+
+        async def insert_all():
+            return await asyncio.gather(*(insert(i) for i in range(50)))
+
+        results = self.loop.run_until_complete(insert_all())
+
+        self.assertEqual(len({filing_id for filing_id, _ in results}), 50)
+        for filing_id, read_id in results:
+            self.assertEqual(filing_id, read_id)
+
+    def test_write_error_is_raised_in_caller(self):
+        """Test that a failed write raises in the coroutine and the writer keeps going."""
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.loop.run_until_complete(
+                self.async_db.write(Database.insert_active_filing, "Franchise", None)
+            )
+
+        filing_id = self.loop.run_until_complete(
+            self.async_db.write(Database.insert_active_filing, "Franchise", "2023-12-31")
+        )
+        self.assertIsNotNone(filing_id)
+
+    def test_closed_writer_rejects_writes(self):
+        """Test that writes queued after closing raise an error."""
+        future = self.async_db.submit(Database.insert_active_filing, "Franchise", "2023-12-31")
+        self.async_db.close()
+
+        # Writes queued before closing are finished
+        self.assertIsNotNone(future.result())
+        with self.assertRaises(RuntimeError):
+            self.async_db.submit(Database.insert_active_filing, "Franchise", "2023-12-31")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import unittest
+import hashlib
+import tempfile
+from unittest.mock import patch
+
+from src.utils.blob_store import BlobStore
+
+
+class TestBlobStore(unittest.TestCase):
+    """Test cases for the BlobStore class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = BlobStore(os.path.join(self.temp_dir.name, 'blobs'))
+        self.content = b"%PDF-1.4\nblob store test\n%%EOF"
+        self.sha256 = hashlib.sha256(self.content).hexdigest()
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.temp_dir.cleanup()
+
+    def write_source(self, name):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(self.content)
+        return path
+
+    def test_path_for_is_sharded(self):
+        """Test blobs are sharded by the leading hex digits of their hash."""
+        path = self.store.path_for(self.sha256)
+
+        self.assertEqual(path.parent.parent.name, self.sha256[:2])
+        self.assertEqual(path.parent.name, self.sha256[2:4])
+        self.assertEqual(path.name, f"{self.sha256}.pdf")
+
+    def test_add_moves_file_once(self):
+        """Test adding the same content twice keeps a single blob."""
+        first_path, first_added = self.store.add(self.write_source('a.part'), self.sha256)
+        second_path, second_added = self.store.add(self.write_source('b.part'), self.sha256)
+
+        self.assertTrue(first_added)
+        self.assertFalse(second_added)
+        self.assertEqual(first_path, second_path)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, 'a.part')))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, 'b.part')))
+        self.assertTrue(self.store.contains(self.sha256, len(self.content)))
+        self.assertFalse(self.store.contains(self.sha256, len(self.content) + 1))
+
+    def test_link_replaces_existing_alias(self):
+        """Test linking a readable name to a blob, replacing a stale file."""
+        self.store.add(self.write_source('a.part'), self.sha256)
+        alias = os.path.join(self.temp_dir.name, 'fdds', '1_Test_2024.pdf')
+        os.makedirs(os.path.dirname(alias))
+        with open(alias, 'wb') as f:
+            f.write(b"stale")
+
+        self.store.link(self.sha256, alias)
+
+        self.assertTrue(os.path.samefile(alias, self.store.path_for(self.sha256)))
+
+    def test_link_falls_back_to_copy(self):
+        """Test the alias is a copy where the filesystem supports no links."""
+        self.store.add(self.write_source('a.part'), self.sha256)
+        alias = os.path.join(self.temp_dir.name, '1_Test_2024.pdf')
+
+        with patch('src.utils.blob_store.os.link', side_effect=OSError), \
+                patch('src.utils.blob_store.os.symlink', side_effect=OSError):
+            self.store.link(self.sha256, alias)
+
+        self.assertFalse(os.path.samefile(alias, self.store.path_for(self.sha256)))
+        with open(alias, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+
+if __name__ == '__main__':
+    unittest.main()
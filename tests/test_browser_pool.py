@@ -0,0 +1,148 @@
+import unittest
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from src.scrapers.browser_pool import BrowserPool
+from src.scrapers.page_loading import PageLoading
+
+
+def make_page(**attributes):
+    """Create a mock pyppeteer page."""
+    page = MagicMock(**attributes)
+    page.isClosed.return_value = False
+    page.close = AsyncMock()
+    return page
+
+
+class TestBrowserPool(unittest.TestCase):
+    """Test cases for the BrowserPool class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.mock_browser = MagicMock()
+        self.mock_browser.newPage = AsyncMock(side_effect=lambda: make_page())
+        self.mock_browser.close = AsyncMock()
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.loop.close()
+
+    @patch('src.scrapers.browser_pool.launch', new_callable=AsyncMock)
+    def test_start_launches_browser_once(self, mock_launch):
+        """Test that the browser is launched once and all pages are opened."""
+        mock_launch.return_value = self.mock_browser
+        pool = BrowserPool(size=3)
+
+        async def run():
+            await pool.start()
+            await pool.start()
+
+        self.loop.run_until_complete(run())
+
+        mock_launch.assert_called_once()
+        self.assertEqual(self.mock_browser.newPage.call_count, 3)
+
+    @patch('src.scrapers.browser_pool.launch', new_callable=AsyncMock)
+    def test_pages_are_reused(self, mock_launch):
+        """Test that pages checked back in are handed out again."""
+        mock_launch.return_value = self.mock_browser
+        pool = BrowserPool(size=1)
+
+        async def run():
+            async with pool.page() as first:
+                pass
+            async with pool.page() as second:
+                pass
+            return first, second
+
+        first, second = self.loop.run_until_complete(run())
+
+        self.assertIs(first, second)
+        self.assertEqual(self.mock_browser.newPage.call_count, 1)
+
+    @patch('src.scrapers.browser_pool.launch', new_callable=AsyncMock)
+    def test_concurrency_bounded_by_size(self, mock_launch):
+        """Test that no more than ``size`` pages are checked out at once."""
+        mock_launch.return_value = self.mock_browser
+        pool = BrowserPool(size=2)
+        active = 0
+        peak = 0
+
+        async def worker():
+            nonlocal active, peak
+            async with pool.page():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        self.loop.run_until_complete(asyncio.gather(*(worker() for _ in range(6))))
+
+        self.assertEqual(peak, 2)
+
+    @patch('src.scrapers.browser_pool.launch', new_callable=AsyncMock)
+    def test_failed_page_is_recycled(self, mock_launch):
+        """Test that a page which raised is replaced with a fresh one."""
+        mock_launch.return_value = self.mock_browser
+        pool = BrowserPool(size=1)
+
+        async def run():
+            try:
+                async with pool.page() as broken:
+                    raise RuntimeError("Navigation failed")
+            except RuntimeError:
+                pass
+            async with pool.page() as replacement:
+                return broken, replacement
+
+        broken, replacement = self.loop.run_until_complete(run())
+
+        self.assertIsNot(broken, replacement)
+        broken.close.assert_called_once()
+
+    @patch('src.scrapers.browser_pool.launch', new_callable=AsyncMock)
+    def test_close(self, mock_launch):
+        """Test that closing the pool closes the browser."""
+        mock_launch.return_value = self.mock_browser
+        pool = BrowserPool(size=1)
+
+        async def run():
+            async with pool:
+                pass
+
+        self.loop.run_until_complete(run())
+
+        self.mock_browser.close.assert_called_once()
+        self.assertIsNone(pool.browser)
+
+    @patch('src.scrapers.browser_pool.launch', new_callable=AsyncMock)
+    def test_pages_prepared_by_loading_options(self, mock_launch):
+        """Test that every page, including replacements, starts intercepting requests."""
+        mock_launch.return_value = self.mock_browser
+        self.mock_browser.newPage = AsyncMock(side_effect=lambda: make_page(setRequestInterception=AsyncMock()))
+        pool = BrowserPool(size=2, loading=PageLoading(allowed_resources=('document',)))
+
+        async def run():
+            try:
+                async with pool.page():
+                    raise RuntimeError("Navigation failed")
+            except RuntimeError:
+                pass
+            return [pool._pages.get_nowait() for _ in range(2)]
+
+        pages = self.loop.run_until_complete(run())
+
+        self.assertEqual(self.mock_browser.newPage.call_count, 3)
+        for page in pages:
+            page.setRequestInterception.assert_awaited_once_with(True)
+
+    def test_invalid_size(self):
+        """Test that a pool needs at least one page."""
+        with self.assertRaises(ValueError):
+            BrowserPool(size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
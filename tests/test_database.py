@@ -239,6 +239,318 @@ class TestDatabase(unittest.TestCase):
         self.assertIsNone(row['fdd_file_download_date'])
         self.assertIsNone(row['num_pages'])
 
+    def test_insert_bulk(self):
+        """Test inserting many records of each table in one call."""
+        filing_ids = self.db.insert_active_filings_bulk([
+            {'franchise_name': f"Test Franchise {i}", 'expiration_date': "2023-12-31"}
+            for i in range(3)
+        ])
+        self.assertEqual(len(filing_ids), 3)
+        for i, filing_id in enumerate(filing_ids):
+            self.assertEqual(self.db.get_franchise_by_name(f"Test Franchise {i}")['id'], filing_id)
+        
+        metadata_ids = self.db.insert_franchise_metadata_bulk([
+            {
+                'active_filing_id': filing_id, 'file_number': str(filing_id), 'legal_name': "Test Legal Name",
+                'effective_date': "2022-01-01", 'expiration_date': "2023-12-31", 'status': "Registered",
+                'zip_code': "12345"
+            }
+            for filing_id in filing_ids
+        ])
+        self.db.cursor.execute("SELECT id, active_filing_id, zip, city FROM franchise_metadata ORDER BY id")
+        rows = self.db.cursor.fetchall()
+        self.assertEqual([row['id'] for row in rows], metadata_ids)
+        self.assertEqual([row['active_filing_id'] for row in rows], filing_ids)
+        self.assertEqual(rows[0]['zip'], "12345")
+        self.assertIsNone(rows[0]['city'])
+        
+        fdd_ids = self.db.insert_fdd_metadata_bulk([
+            {
+                'franchise_metadata_id': metadata_id, 'fdd_url': f"https://example.com/fdd/{metadata_id}",
+                'fdd_file_name': f"{metadata_id}.pdf", 'fdd_file_path': f"/path/{metadata_id}.pdf",
+                'sha256': "ab" * 32
+            }
+            for metadata_id in metadata_ids
+        ])
+        self.db.cursor.execute("SELECT id, fdd_file_name, num_pages FROM fdd_metadata ORDER BY id")
+        rows = self.db.cursor.fetchall()
+        self.assertEqual([row['id'] for row in rows], fdd_ids)
+        self.assertEqual(rows[2]['fdd_file_name'], f"{metadata_ids[2]}.pdf")
+        self.assertIsNone(rows[2]['num_pages'])
+        
+        self.assertEqual(self.db.insert_active_filings_bulk([]), [])
+
+    def test_insert_bulk_ids_across_lookup_batches(self):
+        """Test that IDs match their rows when they are read back in several batches."""
+        existing_id = self.db.insert_active_filing("Franchise 700", "2022-12-31")
+        names = [f"Franchise {i}" for i in range(1200)] + ["Franchise 3", "Franchise 3", "Franchise 700"]
+        
+        filing_ids = self.db.insert_active_filings_bulk([
+            {'franchise_name': name, 'expiration_date': "2023-12-31"} for name in names
+        ])
+        
+        self.assertEqual(len(filing_ids), len(names))
+        self.assertEqual(filing_ids[700], existing_id)
+        self.assertEqual(filing_ids[-1], existing_id)
+        self.assertEqual(filing_ids[-2], filing_ids[3])
+        self.db.cursor.execute("SELECT id, franchise_name FROM active_filings")
+        stored = {row['franchise_name']: row['id'] for row in self.db.cursor.fetchall()}
+        self.assertEqual(filing_ids, [stored[name] for name in names])
+        self.assertEqual(self.db.get_franchise_by_name("Franchise 700")['expiration_date'], "2023-12-31")
+
+    def test_insert_bulk_rolls_back_on_error(self):
+        """Test that a failing row leaves none of the batch stored."""
+        self.db.insert_active_filing("Existing Franchise", "2023-12-31")
+        
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.insert_active_filings_bulk([
+                {'franchise_name': "Test Franchise 1", 'expiration_date': "2023-12-31"},
+                {'franchise_name': "Test Franchise 2", 'expiration_date': None}
+            ])
+        
+        self.assertEqual(
+            [filing['franchise_name'] for filing in self.db.get_all_active_filings()],
+            ["Existing Franchise"]
+        )
+
+    def test_update_fdd_page_count(self):
+        """Test recording the page count of a downloaded FDD."""
+        filing_id = self.db.insert_active_filing("Test Franchise", "2023-12-31", "wisconsin")
+        metadata_id = self.db.insert_franchise_metadata(
+            filing_id, "123456", "Test Legal Name", "2022-01-01", "2023-12-31",
+            "Registered"
+        )
+        fdd_id = self.db.insert_fdd_metadata(
+            metadata_id, "https://example.com/fdd", "123456_Test_Franchise_2022.pdf",
+            "/path/to/fdd/123456_Test_Franchise_2022.pdf"
+        )
+        
+        # Record the page count
+        self.db.update_fdd_page_count(fdd_id, 250)
+        
+        # Check if the page count was stored
+        self.db.cursor.execute("SELECT num_pages FROM fdd_metadata WHERE id = ?", (fdd_id,))
+        self.assertEqual(self.db.cursor.fetchone()['num_pages'], 250)
+
+    def test_get_fdd_by_sha256(self):
+        """Test finding an FDD stored earlier with the same content."""
+        filing_id = self.db.insert_active_filing("Test Franchise", "2023-12-31", "wisconsin")
+        metadata_id = self.db.insert_franchise_metadata(
+            filing_id, "123456", "Test Legal Name", "2022-01-01", "2023-12-31",
+            "Registered"
+        )
+        sha256 = "ab" * 32
+        first_id = self.db.insert_fdd_metadata(
+            metadata_id, "https://example.com/fdd1", "1_Test_2022.pdf", "/path/1_Test_2022.pdf",
+            num_pages=120, sha256=sha256
+        )
+        self.db.insert_fdd_metadata(
+            metadata_id, "https://example.com/fdd2", "2_Test_2023.pdf", "/path/2_Test_2023.pdf",
+            sha256=sha256
+        )
+        
+        # The earliest record with the hash is returned
+        fdd = self.db.get_fdd_by_sha256(sha256)
+        self.assertEqual(fdd['id'], first_id)
+        self.assertEqual(fdd['num_pages'], 120)
+        self.assertIsNone(self.db.get_fdd_by_sha256("cd" * 32))
+
+    def test_fdd_text_search(self):
+        """Test indexing document text by hash and searching it by franchise and page."""
+        sha256 = "ab" * 32
+        for i, name in enumerate(["Alpha", "Beta"]):
+            filing_id = self.db.insert_active_filing(name, "2023-12-31")
+            metadata_id = self.db.insert_franchise_metadata(
+                filing_id, str(i), f"{name} LLC", "2022-01-01", "2023-12-31", "Registered"
+            )
+            # Both filings share the same document
+            self.db.insert_fdd_metadata(metadata_id, f"https://example.com/fdd{i}", f"{i}.pdf", f"/path/{i}.pdf",
+                                        sha256=sha256)
+        self.assertFalse(self.db.is_fdd_text_indexed(sha256))
+        
+        self.db.insert_fdd_text(sha256, ["Item 6 lists the royalty fees.", "", "Franchisees pay royalties monthly."])
+        self.db.insert_fdd_text(sha256, ["Item 6 lists the royalty fees.", "", "Franchisees pay royalties monthly."])
+        
+        self.assertTrue(self.db.is_fdd_text_indexed(sha256))
+        hits = self.db.search_fdd_text("royalty")
+        self.assertEqual(
+            sorted((hit['franchise_name'], hit['page_number']) for hit in hits),
+            [("Alpha", 1), ("Alpha", 3), ("Beta", 1), ("Beta", 3)]
+        )
+        self.assertIn("[royalty]", next(hit['snippet'] for hit in hits if hit['page_number'] == 1))
+        self.assertEqual(self.db.search_fdd_text("territory"), [])
+    
+    def test_fdd_text_search_quotes_terms(self):
+        """Test that hyphenated terms and quotes are searched for rather than parsed as FTS5 syntax."""
+        filing_id = self.db.insert_active_filing("Alpha", "2023-12-31")
+        metadata_id = self.db.insert_franchise_metadata(
+            filing_id, "1", "Alpha LLC", "2022-01-01", "2023-12-31", "Registered"
+        )
+        sha256 = "ef" * 32
+        self.db.insert_fdd_metadata(metadata_id, "https://example.com/fdd", "1.pdf", "/path/1.pdf", sha256=sha256)
+        self.db.insert_fdd_text(sha256, ["Call 1-800-FLOWERS.", "The non-compete lasts two years.",
+                                         "Royalty fee of 6 percent."])
+        
+        def pages(query):
+            return sorted(hit['page_number'] for hit in self.db.search_fdd_text(query))
+        
+        self.assertEqual(pages("non-compete"), [2])
+        self.assertEqual(pages("1-800"), [1])
+        self.assertEqual(pages('"royalty fee" OR non-compete'), [2, 3])
+        self.assertEqual(pages('royalty NOT years'), [3])
+        self.assertEqual(pages('say "hi'), [])
+
+    def test_get_downloaded_fdds_and_filing_file_numbers(self):
+        """Test looking up what earlier runs already stored."""
+        filing_id = self.db.insert_active_filing("Test Franchise", "2023-12-31", "wisconsin")
+        stored_id = self.db.insert_franchise_metadata(
+            filing_id, "111", "Test Legal Name", "2022-01-01", "2023-12-31", "Registered"
+        )
+        self.db.insert_franchise_metadata(
+            filing_id, "222", "Test Legal Name", "2022-01-01", "2023-12-31", "Registered"
+        )
+        self.db.insert_fdd_metadata(stored_id, "https://example.com/fdd", "111.pdf", "/path/111.pdf", 2048)
+        
+        downloaded = self.db.get_downloaded_fdds()
+        self.assertEqual(list(downloaded), ["111"])
+        self.assertEqual(downloaded["111"]['fdd_file_path'], "/path/111.pdf")
+        self.assertEqual(downloaded["111"]['fdd_file_size'], 2048)
+        
+        self.assertEqual(
+            self.db.get_filing_file_numbers(),
+            {("Test Franchise", "2023-12-31"): {"111", "222"}}
+        )
+
+    def test_link_franchise_filing(self):
+        """Test that a franchise record found by several filings counts for each of them."""
+        first_id = self.db.insert_active_filing("Test Franchise", "2023-12-31", "wisconsin")
+        second_id = self.db.insert_active_filing("Test Franchise Express", "2024-06-30", "wisconsin")
+        metadata_id = self.db.insert_franchise_metadata(
+            first_id, "111", "Test Legal Name", "2022-01-01", "2023-12-31", "Registered"
+        )
+        
+        self.db.link_franchise_filing(second_id, metadata_id)
+        self.db.link_franchise_filing(second_id, metadata_id)
+        
+        self.db.cursor.execute("SELECT COUNT(*) FROM franchise_filings")
+        self.assertEqual(self.db.cursor.fetchone()[0], 2)
+        self.assertEqual(
+            self.db.get_filing_file_numbers(),
+            {("Test Franchise", "2023-12-31"): {"111"}, ("Test Franchise Express", "2024-06-30"): {"111"}}
+        )
+        
+        # The linked filing shares the record's FDD and its text
+        sha256 = "cd" * 32
+        self.db.insert_fdd_metadata(metadata_id, "https://example.com/fdd", "111.pdf", "/path/111.pdf",
+                                    sha256=sha256)
+        self.db.insert_fdd_text(sha256, ["Item 6 lists the royalty fees."])
+        self.assertEqual(list(self.db.iter_active_filings(missing_fdd=True)), [])
+        self.assertEqual(
+            [hit['franchise_name'] for hit in self.db.search_fdd_text("royalty")],
+            ["Test Franchise", "Test Franchise Express"]
+        )
+
+    def test_initialize_adds_sha256_to_existing_database(self):
+        """Test that a database created before content hashing gains the column."""
+        self.db.close()
+        os.unlink(self.temp_db_file.name)
+        connection = sqlite3.connect(self.temp_db_file.name)
+        connection.execute('''
+        CREATE TABLE fdd_metadata (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            franchise_metadata_id INTEGER NOT NULL,
+            fdd_url TEXT NOT NULL,
+            fdd_file_name TEXT NOT NULL,
+            fdd_file_path TEXT NOT NULL,
+            fdd_file_size INTEGER,
+            fdd_file_download_date TEXT,
+            num_pages INTEGER
+        )
+        ''')
+        connection.commit()
+        connection.close()
+        
+        self.db.initialize_database()
+        
+        self.db.cursor.execute("PRAGMA table_info(fdd_metadata)")
+        self.assertIn('sha256', [row['name'] for row in self.db.cursor.fetchall()])
+
+    def test_upserts_return_existing_ids(self):
+        """Test that storing the same natural keys again updates the existing rows."""
+        filing_id = self.db.insert_active_filing("Test Franchise", "2023-12-31", "wisconsin")
+        self.assertEqual(self.db.insert_active_filing("Test Franchise", "2024-12-31", "wisconsin"), filing_id)
+        self.assertNotEqual(self.db.insert_active_filing("Test Franchise", "2024-12-31", "illinois"), filing_id)
+        self.assertEqual(self.db.get_franchise_by_name("Test Franchise")['expiration_date'], "2024-12-31")
+        
+        metadata_id = self.db.insert_franchise_metadata(
+            filing_id, "123456", "Test Legal Name", "2022-01-01", "2023-12-31", "Registered"
+        )
+        self.assertEqual(self.db.insert_franchise_metadata(
+            filing_id, "123456", "Renamed Legal Name", "2023-01-01", "2024-12-31", "Registered"
+        ), metadata_id)
+        
+        fdd_id = self.db.insert_fdd_metadata(
+            metadata_id, "https://example.com/fdd", "123456.pdf", "/path/123456.pdf",
+            num_pages=100, sha256="ab" * 32
+        )
+        # The same document keeps its page count, a changed one loses it
+        self.assertEqual(self.db.insert_fdd_metadata(
+            metadata_id, "https://example.com/fdd", "123456.pdf", "/path/123456.pdf", sha256="ab" * 32
+        ), fdd_id)
+        self.assertEqual(self.db.get_fdd_by_sha256("ab" * 32)['num_pages'], 100)
+        self.db.insert_fdd_metadata(
+            metadata_id, "https://example.com/fdd", "123456.pdf", "/path/123456.pdf", sha256="cd" * 32
+        )
+        self.assertIsNone(self.db.get_fdd_by_sha256("cd" * 32)['num_pages'])
+        
+        for table in ('active_filings', 'franchise_metadata', 'fdd_metadata'):
+            self.db.cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            self.assertEqual(self.db.cursor.fetchone()[0], 2 if table == 'active_filings' else 1)
+        self.db.cursor.execute("SELECT legal_name FROM franchise_metadata")
+        self.assertEqual(self.db.cursor.fetchone()[0], "Renamed Legal Name")
+
+    def test_lookups_use_indexes(self):
+        """Test that lookups by name and hash do not scan their tables."""
+        for query, value in [
+            ("SELECT * FROM active_filings WHERE franchise_name = ?", "Test Franchise"),
+            ("SELECT * FROM fdd_metadata WHERE sha256 = ? ORDER BY id LIMIT 1", "ab" * 32),
+        ]:
+            self.db.cursor.execute(f"EXPLAIN QUERY PLAN {query}", (value,))
+            plan = ' '.join(row['detail'] for row in self.db.cursor.fetchall())
+            self.assertIn('USING INDEX', plan)
+
+    def test_initialize_merges_duplicates_in_existing_database(self):
+        """Test that duplicates stored before the natural keys existed are merged."""
+        self.db.cursor.executescript('''
+        DROP INDEX idx_active_filings_name_state;
+        DROP INDEX idx_franchise_metadata_file_number;
+        PRAGMA user_version = 2;
+        INSERT INTO active_filings (franchise_name, expiration_date) VALUES ('Test Franchise', '2023-12-31');
+        INSERT INTO active_filings (franchise_name, expiration_date) VALUES ('Test Franchise', '2023-12-31');
+        INSERT INTO franchise_metadata (active_filing_id, file_number, legal_name, effective_date, expiration_date, status)
+        VALUES (1, '123456', 'Test Legal Name', '2022-01-01', '2023-12-31', 'Registered');
+        DROP INDEX idx_fdd_metadata_url;
+        INSERT INTO fdd_metadata (franchise_metadata_id, fdd_url, fdd_file_name, fdd_file_path, fdd_file_size)
+        VALUES (1, 'https://example.com/fdd', 'old.pdf', '/path/old.pdf', 1024);
+        INSERT INTO fdd_metadata (franchise_metadata_id, fdd_url, fdd_file_name, fdd_file_path, fdd_file_size)
+        VALUES (1, 'https://example.com/fdd', 'new.pdf', '/path/new.pdf', 2048);
+        INSERT INTO crawl_runs (started_at) VALUES ('2024-01-01T00:00:00');
+        INSERT INTO crawl_journal (run_id, active_filing_id, stage, updated_at)
+        VALUES (1, 1, 'queued', '2024-01-01T00:00:00');
+        ''')
+        
+        self.db.initialize_database()
+        
+        # The newest row of each key is kept, and everything pointing at the others follows it
+        self.assertEqual([filing['id'] for filing in self.db.get_all_active_filings()], [2])
+        self.db.cursor.execute("SELECT active_filing_id FROM franchise_metadata")
+        self.assertEqual(self.db.cursor.fetchone()[0], 2)
+        self.db.cursor.execute("SELECT fdd_file_path, fdd_file_size FROM fdd_metadata")
+        self.assertEqual([tuple(row) for row in self.db.cursor.fetchall()], [('/path/new.pdf', 2048)])
+        self.db.cursor.execute("SELECT active_filing_id FROM crawl_journal")
+        self.assertEqual(self.db.cursor.fetchone()[0], 2)
+        self.assertEqual(self.db.insert_active_filing("Test Franchise", "2023-12-31"), 2)
+
     def test_get_all_active_filings(self):
         """Test getting all active filings."""
         # Insert some active filings
@@ -259,6 +571,52 @@ class TestDatabase(unittest.TestCase):
             self.assertIn('expiration_date', filing)
             self.assertIn('active_state', filing)
 
+    def test_iter_active_filings_pages_and_projects(self):
+        """Test streaming filings across several pages with only some columns."""
+        self.db.insert_active_filings_bulk([
+            {'franchise_name': f"Test Franchise {i}", 'expiration_date': "2023-12-31"} for i in range(25)
+        ])
+        
+        filings = list(self.db.iter_active_filings(columns=('franchise_name',), page_size=10))
+        
+        self.assertEqual(len(filings), 25)
+        self.assertEqual(filings[0], {'id': 1, 'franchise_name': "Test Franchise 0"})
+        self.assertEqual([filing['id'] for filing in filings], sorted(filing['id'] for filing in filings))
+        with self.assertRaises(ValueError):
+            list(self.db.iter_active_filings(columns=('franchise_name; DROP TABLE active_filings',)))
+
+    def test_iter_active_filings_filters(self):
+        """Test filtering streamed filings by state, expiration and missing FDDs."""
+        early_id = self.db.insert_active_filing("Early Franchise", "1/15/2024", "wisconsin")
+        late_id = self.db.insert_active_filing("Late Franchise", "11/30/2024", "wisconsin")
+        other_id = self.db.insert_active_filing("Other Franchise", "6/1/2024", "illinois")
+        metadata_id = self.db.insert_franchise_metadata(
+            early_id, "123456", "Test Legal Name", "1/15/2023", "1/15/2024", "Registered"
+        )
+        self.db.insert_fdd_metadata(metadata_id, "https://example.com/fdd", "123456.pdf", "/path/123456.pdf")
+        
+        def ids(**filters):
+            return [filing['id'] for filing in self.db.iter_active_filings(**filters)]
+        
+        self.assertEqual(ids(state="wisconsin"), [early_id, late_id])
+        self.assertEqual(ids(expires_from="2024-02-01"), [late_id, other_id])
+        self.assertEqual(ids(expires_from="02/01/2024", expires_to="2024-06-30"), [other_id])
+        self.assertEqual(ids(missing_fdd=True), [late_id, other_id])
+        self.assertEqual(ids(state="wisconsin", missing_fdd=True), [late_id])
+
+    def test_iter_fdd_metadata_missing_num_pages(self):
+        """Test streaming the FDDs still waiting for a page count."""
+        filing_id = self.db.insert_active_filing("Test Franchise", "2023-12-31")
+        metadata_id = self.db.insert_franchise_metadata(
+            filing_id, "123456", "Test Legal Name", "2022-01-01", "2023-12-31", "Registered"
+        )
+        self.db.insert_fdd_metadata(metadata_id, "https://example.com/fdd1", "1.pdf", "/path/1.pdf", num_pages=10)
+        pending_id = self.db.insert_fdd_metadata(metadata_id, "https://example.com/fdd2", "2.pdf", "/path/2.pdf")
+        
+        fdds = list(self.db.iter_fdd_metadata(columns=('fdd_file_path',), missing_num_pages=True))
+        
+        self.assertEqual(fdds, [{'id': pending_id, 'fdd_file_path': "/path/2.pdf"}])
+
     def test_get_franchise_by_name(self):
         """Test getting a franchise by name."""
         # Insert an active filing
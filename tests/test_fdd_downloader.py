@@ -0,0 +1,267 @@
+import os
+import unittest
+import asyncio
+import hashlib
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+from urllib.parse import parse_qs
+
+import httpx
+
+from src.scrapers.fdd_downloader import FDDDownloader, build_download_form, parse_download_form
+from src.utils.blob_store import BlobStore
+
+
+DETAILS_HTML = '''
+<html>
+    <body>
+        <form method="post" action="./details.aspx?id=637375">
+            <input type="hidden" name="__VIEWSTATEFIELDCOUNT" id="__VIEWSTATEFIELDCOUNT" value="2" />
+            <input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="part0" />
+            <input type="hidden" name="__VIEWSTATE1" id="__VIEWSTATE1" value="part1" />
+            <input type="hidden" name="__VIEWSTATEGENERATOR" id="__VIEWSTATEGENERATOR" value="GEN1" />
+            <span id="lblFranchiseAddressLine1">1 Main St</span>
+            <span id="lblFranchiseAddressLine2"></span>
+            <span id="lblFranchiseCity">Madison</span>
+            <span id="lblFranchiseState">WI</span>
+            <span id="lblFranchiseZip">53703</span>
+        </form>
+    </body>
+</html>
+'''
+
+PDF_BYTES = b"%PDF-1.4\n" + b"0" * 200000 + b"\n%%EOF"
+
+
+def make_franchise_data(file_id):
+    """Create franchise data for a file ID."""
+    return {
+        'file_id': file_id,
+        'trade_name': f'Test Franchise {file_id}',
+        'effective_date': '10/18/2024'
+    }
+
+
+class TestParseDownloadForm(unittest.TestCase):
+    """Test cases for parse_download_form."""
+
+    def test_parse_download_form(self):
+        """Test reading split VIEWSTATE fields from a details page."""
+        form_data = parse_download_form(DETAILS_HTML)
+
+        self.assertEqual(form_data['__VIEWSTATE'], 'part0')
+        self.assertEqual(form_data['__VIEWSTATE1'], 'part1')
+        self.assertEqual(form_data['__VIEWSTATEFIELDCOUNT'], '2')
+        self.assertEqual(form_data['__VIEWSTATEGENERATOR'], 'GEN1')
+        self.assertEqual(form_data['upload_downloadFile'], 'Download')
+
+    def test_parse_download_form_without_viewstate(self):
+        """Test the form data when the page has no VIEWSTATE."""
+        form_data = parse_download_form('<html></html>')
+
+        self.assertEqual(form_data['__VIEWSTATE'], '')
+        self.assertEqual(form_data['__VIEWSTATEFIELDCOUNT'], '1')
+
+    def test_build_download_form(self):
+        """Test the field count covers every numbered VIEWSTATE part."""
+        form_data = build_download_form({
+            '__VIEWSTATE': 'part0', '__VIEWSTATE1': 'part1', '__VIEWSTATE2': 'part2', '__VIEWSTATEGENERATOR': 'GEN1'
+        })
+
+        self.assertEqual(form_data['__VIEWSTATEFIELDCOUNT'], '3')
+        self.assertEqual(form_data['__VIEWSTATE2'], 'part2')
+        self.assertEqual(form_data['__VIEWSTATEGENERATOR'], 'GEN1')
+        self.assertEqual(form_data['__VIEWSTATEENCRYPTED'], '')
+
+
+class TestFDDDownloader(unittest.TestCase):
+    """Test cases for the FDDDownloader class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.fdd_dir_patch = patch('src.utils.file_operations.FDD_DIR', Path(self.temp_dir.name))
+        self.fdd_dir_patch.start()
+        self.blob_store = BlobStore(os.path.join(self.temp_dir.name, 'blobs'))
+        self.posts = []
+        self.active = 0
+        self.peak = 0
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.fdd_dir_patch.stop()
+        self.temp_dir.cleanup()
+        self.loop.close()
+
+    async def handler(self, request):
+        """Serve the details page and the PDF download like details.aspx."""
+        if request.method == 'GET':
+            return httpx.Response(200, text=DETAILS_HTML)
+        self.posts.append(parse_qs(request.content.decode()))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return httpx.Response(200, content=PDF_BYTES, headers={'Content-Type': 'application/pdf'})
+
+    def make_downloader(self, concurrency=2):
+        """Create a downloader backed by the mock transport."""
+        client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        return FDDDownloader(client=client, concurrency=concurrency, blob_store=self.blob_store)
+
+    def test_download_fdd(self):
+        """Test downloading a single FDD to disk."""
+        downloader = self.make_downloader()
+        url = 'https://apps.dfi.wi.gov/apps/FranchiseSearch/details.aspx?id=637375'
+
+        async def run():
+            async with downloader:
+                return await downloader.download_fdd(url, make_franchise_data('637375'))
+
+        metadata = self.loop.run_until_complete(run())
+
+        expected_path = os.path.join(self.temp_dir.name, '637375_Test_Franchise_637375_2024.pdf')
+        self.assertEqual(metadata['fdd_file_path'], expected_path)
+        self.assertEqual(metadata['fdd_file_name'], '637375_Test_Franchise_637375_2024.pdf')
+        self.assertEqual(metadata['fdd_file_size'], len(PDF_BYTES))
+        with open(expected_path, 'rb') as file:
+            self.assertEqual(file.read(), PDF_BYTES)
+        self.assertFalse(os.path.exists(expected_path + '.part'))
+        self.assertEqual(self.posts[0]['__VIEWSTATE1'], ['part1'])
+
+        # The content was hashed while streaming and stored by hash
+        sha256 = hashlib.sha256(PDF_BYTES).hexdigest()
+        self.assertEqual(metadata['sha256'], sha256)
+        self.assertTrue(self.blob_store.contains(sha256, len(PDF_BYTES)))
+        self.assertTrue(os.path.samefile(expected_path, self.blob_store.path_for(sha256)))
+
+    def test_identical_documents_stored_once(self):
+        """Test that the same PDF under two names shares one blob."""
+        downloader = self.make_downloader()
+
+        async def run():
+            async with downloader:
+                first = await downloader.download_fdd('https://example.com/details.aspx?id=1', make_franchise_data('1'))
+                second = await downloader.download_fdd('https://example.com/details.aspx?id=2', make_franchise_data('2'))
+                return first, second
+
+        first, second = self.loop.run_until_complete(run())
+
+        self.assertEqual(first['sha256'], second['sha256'])
+        self.assertNotEqual(first['fdd_file_path'], second['fdd_file_path'])
+        self.assertTrue(os.path.samefile(first['fdd_file_path'], second['fdd_file_path']))
+        blobs = [name for _, _, names in os.walk(self.blob_store.root) for name in names]
+        self.assertEqual(blobs, [f"{first['sha256']}.pdf"])
+
+    def test_downloads_run_concurrently_up_to_limit(self):
+        """Test that scheduled downloads share the client up to the concurrency limit."""
+        downloader = self.make_downloader(concurrency=2)
+
+        async def run():
+            async with downloader:
+                return await asyncio.gather(*(
+                    downloader.download_fdd(f'https://example.com/details.aspx?id={i}', make_franchise_data(str(i)))
+                    for i in range(5)
+                ))
+
+        results = self.loop.run_until_complete(run())
+
+        self.assertTrue(all(results))
+        self.assertEqual(self.peak, 2)
+
+    @patch('src.scrapers.fdd_downloader.save_html_snapshot_async')
+    def test_details_and_download_share_one_page_load(self, mock_save_html):
+        """Test that the details page's download form is posted without loading the page again."""
+        requests = []
+
+        async def handler(request):
+            requests.append(request.method)
+            return await self.handler(request)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        downloader = FDDDownloader(client=client, blob_store=self.blob_store)
+        url = 'https://apps.dfi.wi.gov/apps/FranchiseSearch/details.aspx?id=637375'
+
+        async def run():
+            async with downloader:
+                details = await downloader.get_franchise_details(url)
+                metadata = await downloader.download_fdd(url, {**make_franchise_data('637375'), **details})
+                return details, metadata
+
+        details, metadata = self.loop.run_until_complete(run())
+
+        self.assertEqual(details['address'], {
+            'address_line1': '1 Main St', 'address_line2': None,
+            'city': 'Madison', 'state': 'WI', 'zip': '53703'
+        })
+        self.assertEqual(details['download_form'], parse_download_form(DETAILS_HTML))
+        self.assertEqual(metadata['fdd_file_size'], len(PDF_BYTES))
+        self.assertEqual(requests, ['GET', 'POST'])
+        self.assertEqual(self.posts[0]['__VIEWSTATE1'], ['part1'])
+        mock_save_html.assert_called_once()
+
+    def test_rejected_view_state_refetched(self):
+        """Test that a rejected download is retried with a details page fetched past the cache."""
+        requests = []
+
+        def handler(request):
+            requests.append((request.method, request.headers.get('Cache-Control')))
+            if request.method == 'GET':
+                return httpx.Response(200, text=DETAILS_HTML)
+            if len(requests) == 2:
+                return httpx.Response(500, text='Validation of viewstate MAC failed')
+            return httpx.Response(200, content=PDF_BYTES, headers={'Content-Type': 'application/pdf'})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        downloader = FDDDownloader(client=client, blob_store=self.blob_store)
+
+        metadata = self.loop.run_until_complete(
+            downloader.download_fdd('https://example.com/details.aspx?id=1', make_franchise_data('1'))
+        )
+
+        self.assertEqual(metadata['fdd_file_size'], len(PDF_BYTES))
+        self.assertEqual(requests, [('GET', 'no-cache'), ('POST', None), ('GET', 'no-cache'), ('POST', None)])
+
+    def test_html_error_page_is_not_stored(self):
+        """Test that an HTML page answered with 200 to the download is retried, then reported as a failure."""
+        posts = []
+
+        def handler(request):
+            if request.method == 'GET':
+                return httpx.Response(200, text=DETAILS_HTML)
+            posts.append(request)
+            return httpx.Response(200, text='<html>Validation of viewstate MAC failed</html>',
+                                  headers={'Content-Type': 'text/html; charset=utf-8'})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        downloader = FDDDownloader(client=client, blob_store=self.blob_store)
+
+        metadata = self.loop.run_until_complete(
+            downloader.download_fdd('https://example.com/details.aspx?id=1', make_franchise_data('1'))
+        )
+
+        self.assertIsNone(metadata)
+        self.assertEqual(len(posts), 2)
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    def test_download_fdd_error(self):
+        """Test that HTTP errors are reported as a failed download."""
+        def failing_handler(request):
+            return httpx.Response(500)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(failing_handler))
+        downloader = FDDDownloader(client=client, blob_store=self.blob_store)
+
+        metadata = self.loop.run_until_complete(
+            downloader.download_fdd('https://example.com/details.aspx?id=1', make_franchise_data('1'))
+        )
+
+        self.assertIsNone(metadata)
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
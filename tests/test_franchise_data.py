@@ -0,0 +1,228 @@
+import os
+import unittest
+import asyncio
+import tempfile
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from src.scrapers.browser_pool import BrowserPool
+from src.scrapers.franchise_data import FranchiseDataScraper, combine_search_and_details
+from src.scrapers.page_loading import PageLoading
+from src.scrapers.session_bridge import SessionBridge
+from src.utils.http_cache import ResponseCache
+from src.utils.throttling import HostConcurrencyLimiter
+
+
+DETAILS_URL = 'https://apps.dfi.wi.gov/apps/FranchiseSearch/details.aspx?id=637375&hash=1758030309'
+
+SEARCH_RESULTS_HTML = '''
+<html>
+    <body>
+        <table id="grdSearchResults">
+            <tr>
+                <th>File Number</th><th>Legal Name</th><th>Trade Name</th>
+                <th>Effective Date</th><th>Expiration Date</th><th>Status</th><th>&nbsp;</th>
+            </tr>
+            <tr>
+                <td>637375</td><td>1 800 FLOWERS.COM FRANCHISE CO INC</td><td>1-800-FLOWERS</td>
+                <td>10/18/2024</td><td>10/18/2025</td><td>Registered</td>
+                <td><a href="details.aspx?id=637375&amp;hash=1758030309&amp;search=external&amp;type=GENERAL">Details</a></td>
+            </tr>
+        </table>
+    </body>
+</html>
+'''
+
+DETAILS_HTML = '''
+<html>
+    <body>
+        <span id="lblFranchiseAddressLine1">1 Main St</span>
+        <span id="lblFranchiseAddressLine2"></span>
+        <span id="lblFranchiseCity">Madison</span>
+        <span id="lblFranchiseState">WI</span>
+        <span id="lblFranchiseZip">53703</span>
+    </body>
+</html>
+'''
+
+SESSION_COOKIE = {'name': 'ASP.NET_SessionId', 'value': 'browser1', 'domain': 'apps.dfi.wi.gov', 'path': '/'}
+
+
+class FakeRateLimiter:
+    """Rate limiter that runs every request at once."""
+
+    async def call(self, url, request):
+        return await request()
+
+
+def make_page(content):
+    """Create a mock pyppeteer page showing the given HTML and holding a session cookie."""
+    page = MagicMock()
+    page.isClosed.return_value = False
+    for name in ['goto', 'waitForNavigation', 'waitForSelector', 'type', 'click', 'setCookie', 'close']:
+        setattr(page, name, AsyncMock())
+    page.keyboard.press = AsyncMock()
+    page.content = AsyncMock(return_value=content)
+    page.cookies = AsyncMock(return_value=[SESSION_COOKIE])
+    return page
+
+
+def make_result(file_id):
+    """Create a search result row for a file ID."""
+    return {
+        'file_number': file_id,
+        'legal_name': f'Legal {file_id}',
+        'trade_name': f'Trade {file_id}',
+        'effective_date': '1/1/2024',
+        'expiration_date': '1/1/2025',
+        'status': 'Registered',
+        'details_url': f'https://apps.dfi.wi.gov/apps/FranchiseSearch/details.aspx?id={file_id}',
+        'file_id': file_id,
+        'hash': '1'
+    }
+
+
+class TestFranchiseDataScraper(unittest.TestCase):
+    """Test cases for the FranchiseDataScraper class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.loop.close()
+
+    def test_combine_search_and_details(self):
+        """Test merging a search row with its details page."""
+        details = {
+            'address': {'address_line1': '1 Main St', 'address_line2': None,
+                        'city': 'Madison', 'state': 'WI', 'zip': '53703'},
+            'wi_webpage_url': 'https://example.com/details',
+            'fdd_url': 'https://example.com/details'
+        }
+
+        combined = combine_search_and_details(make_result('1'), details)
+
+        self.assertEqual(combined['file_number'], '1')
+        self.assertEqual(combined['city'], 'Madison')
+        self.assertEqual(combined['zip'], '53703')
+        self.assertEqual(combined['fdd_url'], 'https://example.com/details')
+
+    @patch('src.scrapers.franchise_data.host_limiter', HostConcurrencyLimiter(limit=2))
+    def test_scrape_franchise_fetches_details_concurrently(self):
+        """Test that details are fetched concurrently and merged in search order."""
+        file_ids = ['1', '2', '3', '4']
+        active = 0
+        peak = 0
+
+        async def search_franchise(franchise_name):
+            return [make_result(file_id) for file_id in file_ids]
+
+        async def get_franchise_details(details_url):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            file_id = details_url.rsplit('=', 1)[1]
+            # Later rows finish first
+            await asyncio.sleep(0.01 * (len(file_ids) - int(file_id)))
+            active -= 1
+            if file_id == '3':
+                return None
+            return {'address': {'city': f'City {file_id}'}, 'fdd_url': details_url}
+
+        scraper = FranchiseDataScraper()
+        scraper.search_franchise = search_franchise
+        scraper.get_franchise_details = get_franchise_details
+
+        results = self.loop.run_until_complete(scraper.scrape_franchise('Test'))
+
+        self.assertEqual([result['file_id'] for result in results], ['1', '2', '4'])
+        self.assertEqual(results[0]['city'], 'City 1')
+        self.assertEqual(peak, 2)
+
+    def test_scrape_franchise_no_results(self):
+        """Test scraping a franchise with no registered results."""
+        async def search_franchise(franchise_name):
+            return None
+
+        scraper = FranchiseDataScraper()
+        scraper.search_franchise = search_franchise
+
+        results = self.loop.run_until_complete(scraper.scrape_franchise('Missing'))
+
+        self.assertIsNone(results)
+
+
+
+@patch('src.scrapers.franchise_data.save_html_snapshot_async', AsyncMock())
+@patch('src.scrapers.franchise_data.rate_limiter', FakeRateLimiter())
+class TestFranchiseDataScraperBrowser(unittest.TestCase):
+    """Test cases for scraping through a browser pool with a shared session and page cache."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(os.path.join(self.temp_dir.name, 'http_cache.sqlite'))
+        self.session = SessionBridge()
+        self.content = DETAILS_HTML
+        self.pages = []
+        self.browser = MagicMock()
+        self.browser.newPage = AsyncMock(side_effect=self.new_page)
+        self.browser.close = AsyncMock()
+        self.launch_patch = patch('src.scrapers.browser_pool.launch', AsyncMock(return_value=self.browser))
+        self.launch_patch.start()
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.launch_patch.stop()
+        self.cache.close()
+        self.temp_dir.cleanup()
+        self.loop.close()
+
+    def new_page(self):
+        """Open a mock page showing the current content."""
+        self.pages.append(make_page(self.content))
+        return self.pages[-1]
+
+    def make_scraper(self):
+        """Create a scraper over a one-page pool of mock pages."""
+        loading = PageLoading(allowed_resources=None)
+        pool = BrowserPool(size=1, loading=loading)
+        return FranchiseDataScraper(pool=pool, cache=self.cache, loading=loading, session=self.session)
+
+    def test_search_exports_session(self):
+        """Test that the browser's session cookie reaches the shared jar after a search."""
+        self.content = SEARCH_RESULTS_HTML
+        scraper = self.make_scraper()
+
+        results = self.loop.run_until_complete(scraper.search_franchise('1-800-FLOWERS'))
+
+        self.assertEqual([result['file_number'] for result in results], ['637375'])
+        self.assertEqual(self.session.cookies.get('ASP.NET_SessionId'), 'browser1')
+        self.assertEqual(self.session.stats['exported'], 1)
+
+    def test_details_page_cached_after_render(self):
+        """Test that a rendered details page exports the session and is then served without the browser."""
+        first = self.make_scraper()
+        details = self.loop.run_until_complete(first.get_franchise_details(DETAILS_URL))
+
+        self.assertEqual(details['address']['city'], 'Madison')
+        self.assertEqual(len(self.pages), 1)
+        self.pages[0].goto.assert_awaited_once()
+        self.assertEqual(self.session.cookies.get('ASP.NET_SessionId'), 'browser1')
+        self.assertEqual(self.cache.get_page(DETAILS_URL), DETAILS_HTML)
+
+        # A second scraper finds the render in the cache and never starts its browser
+        second = self.make_scraper()
+        details = self.loop.run_until_complete(second.get_franchise_details(DETAILS_URL))
+
+        self.assertEqual(details['address']['city'], 'Madison')
+        self.assertIsNone(second.pool.browser)
+        self.assertEqual(len(self.pages), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
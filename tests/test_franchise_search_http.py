@@ -0,0 +1,163 @@
+import unittest
+import asyncio
+from unittest.mock import patch
+from urllib.parse import parse_qs
+
+import httpx
+
+from src.scrapers.franchise_search_http import HttpFranchiseDataScraper, parse_search_form
+
+
+SEARCH_FORM_HTML = '''
+<html>
+    <body>
+        <form method="post" action="./MainSearch.aspx" id="form1">
+            <input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="state{version}" />
+            <input type="hidden" name="__VIEWSTATEGENERATOR" id="__VIEWSTATEGENERATOR" value="ABC123" />
+            <input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="valid{version}" />
+            <input type="submit" name="btnHelp" value="Help" />
+            <input name="txtName" type="text" id="txtName" />
+            <input type="submit" name="btnSearch" value="Search" id="btnSearch" />
+            <input type="checkbox" name="chkExpired" id="chkExpired" />
+        </form>
+    </body>
+</html>
+'''
+
+SEARCH_RESULTS_HTML = '''
+<html>
+    <body>
+        <form method="post" action="./MainSearch.aspx" id="form1">
+            <input name="txtName" type="text" id="txtName" />
+            <table id="grdSearchResults">
+                <tr>
+                    <th>File Number</th><th>Legal Name</th><th>Trade Name</th>
+                    <th>Effective Date</th><th>Expiration Date</th><th>Status</th><th>&nbsp;</th>
+                </tr>
+                <tr>
+                    <td>637375</td><td>1 800 FLOWERS.COM FRANCHISE CO INC</td><td>1-800-FLOWERS</td>
+                    <td>10/18/2024</td><td>10/18/2025</td><td>Registered</td>
+                    <td><a href="details.aspx?id=637375&amp;hash=1758030309&amp;search=external&amp;type=GENERAL">Details</a></td>
+                </tr>
+                <tr>
+                    <td>635001</td><td>1 800 FLOWERS.COM FRANCHISE CO INC</td><td>1-800-FLOWERS</td>
+                    <td>10/20/2023</td><td>10/20/2024</td><td>Expired</td><td>&nbsp;</td>
+                </tr>
+            </table>
+        </form>
+    </body>
+</html>
+'''
+
+
+class TestParseSearchForm(unittest.TestCase):
+    """Test cases for parse_search_form."""
+
+    def test_collects_hidden_fields_and_submit(self):
+        """Test that view state and the submit after the name box are collected."""
+        fields, name_field = parse_search_form(SEARCH_FORM_HTML.format(version=1))
+
+        self.assertEqual(name_field, 'txtName')
+        self.assertEqual(fields['__VIEWSTATE'], 'state1')
+        self.assertEqual(fields['__VIEWSTATEGENERATOR'], 'ABC123')
+        self.assertEqual(fields['__EVENTVALIDATION'], 'valid1')
+        self.assertEqual(fields['btnSearch'], 'Search')
+        self.assertNotIn('btnHelp', fields)
+        self.assertNotIn('chkExpired', fields)
+
+    def test_missing_name_field(self):
+        """Test that a page without the name box is rejected."""
+        with self.assertRaises(ValueError):
+            parse_search_form('<html><form><input type="hidden" name="x" /></form></html>')
+
+
+class TestHttpFranchiseDataScraper(unittest.TestCase):
+    """Test cases for the HttpFranchiseDataScraper class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.requests = []
+        self.form_version = 1
+        self.reject_state = None
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.loop.close()
+
+    def handler(self, request):
+        """Serve the search form and results like MainSearch.aspx."""
+        self.requests.append(request)
+        if request.method == 'GET':
+            html = SEARCH_FORM_HTML.format(version=self.form_version)
+            self.form_version += 1
+            return httpx.Response(200, text=html)
+        data = parse_qs(request.content.decode())
+        if data['__VIEWSTATE'][0] == self.reject_state:
+            return httpx.Response(500, text='Validation of viewstate MAC failed')
+        return httpx.Response(200, text=SEARCH_RESULTS_HTML)
+
+    def make_scraper(self):
+        """Create a scraper backed by the mock transport."""
+        client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        return HttpFranchiseDataScraper(client=client)
+
+    @patch('src.scrapers.franchise_search_http.save_html_snapshot_async')
+    def test_search_franchise(self, mock_save_html):
+        """Test that a search posts the view state and parses registered rows."""
+        scraper = self.make_scraper()
+
+        async def run():
+            first = await scraper.search_franchise('1-800')
+            second = await scraper.search_franchise('Flowers')
+            await scraper.client.aclose()
+            return first, second
+
+        first, second = self.loop.run_until_complete(run())
+
+        self.assertEqual(len(first), 1)
+        self.assertEqual(first[0]['file_number'], '637375')
+        self.assertEqual(first[0]['hash'], '1758030309')
+        self.assertEqual(second, first)
+
+        # The form is fetched once and its view state replayed for both searches
+        methods = [request.method for request in self.requests]
+        self.assertEqual(methods, ['GET', 'POST', 'POST'])
+        posted = parse_qs(self.requests[2].content.decode())
+        self.assertEqual(posted['txtName'], ['Flowers'])
+        self.assertEqual(posted['__EVENTVALIDATION'], ['valid1'])
+        self.assertEqual(posted['btnSearch'], ['Search'])
+
+    @patch('src.scrapers.franchise_search_http.save_html_snapshot_async')
+    def test_search_franchise_refreshes_stale_state(self, mock_save_html):
+        """Test that a rejected view state is refetched and the search retried."""
+        scraper = self.make_scraper()
+        self.reject_state = 'state1'
+
+        async def run():
+            results = await scraper.search_franchise('1-800')
+            await scraper.client.aclose()
+            return results
+
+        results = self.loop.run_until_complete(run())
+
+        self.assertEqual(len(results), 1)
+        methods = [request.method for request in self.requests]
+        self.assertEqual(methods, ['GET', 'POST', 'GET', 'POST'])
+
+    def test_search_franchise_error(self):
+        """Test that transport errors are reported as no results."""
+        def failing_handler(request):
+            raise httpx.ConnectError("Connection refused")
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(failing_handler))
+        scraper = HttpFranchiseDataScraper(client=client)
+
+        results = self.loop.run_until_complete(scraper.search_franchise('1-800'))
+
+        self.assertIsNone(results)
+
+
+if __name__ == '__main__':
+    unittest.main()
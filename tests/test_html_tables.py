@@ -0,0 +1,61 @@
+import unittest
+
+from src.utils.html_tables import TableNotFound, TableRow, iter_table_rows
+
+
+GRID_HTML = '''
+<html>
+    <body>
+        <table id="layout"><tr><td>Header</td></tr></table>
+        <table id="grdSearchResults">
+            <tr>
+                <th>File Number</th><th>Trade Name</th><th>Status</th><th>&nbsp;</th>
+            </tr>
+            <tr>
+                <td>637375</td><td>  1-800-FLOWERS
+                    &amp; more </td><td>Registered</td>
+                <td><a href="details.aspx?id=637375&amp;hash=1758030309">Details</a></td>
+            </tr>
+            <tr>
+                <td>635001</td><td>1-800-FLOWERS</td><td>Expired</td>
+            </tr>
+            <tr>
+                <td colspan="4"><table><tr><td><a href="javascript:__doPostBack('grd','Page$2')">2</a></td></tr></table></td>
+            </tr>
+        </table>
+        <table id="footer"><tr><td>Footer</td></tr></table>
+    </body>
+</html>
+'''
+
+
+class TestIterTableRows(unittest.TestCase):
+    """Test cases for iter_table_rows."""
+
+    def test_rows_keyed_by_header(self):
+        """Test that rows are keyed by header with normalized text and joined links."""
+        rows = list(iter_table_rows(GRID_HTML, 'grdSearchResults', base_url='https://example.com/app/MainSearch.aspx'))
+
+        self.assertEqual(len(rows), 2)
+        self.assertIsInstance(rows[0], TableRow)
+        self.assertEqual(rows[0].cells['File Number'], '637375')
+        self.assertEqual(rows[0].cells['Trade Name'], '1-800-FLOWERS & more')
+        self.assertEqual(rows[0].links, {'3': 'https://example.com/app/details.aspx?id=637375&hash=1758030309'})
+        # Short rows are padded so every column is present
+        self.assertEqual(rows[1].cells['3'], '')
+        self.assertEqual(rows[1].links, {})
+
+    def test_only_target_table(self):
+        """Test that other tables on the page are ignored."""
+        rows = list(iter_table_rows(GRID_HTML, 'footer'))
+
+        self.assertEqual(rows, [])
+
+    def test_missing_table(self):
+        """Test that a page without the table raises TableNotFound."""
+        with self.assertRaises(TableNotFound):
+            list(iter_table_rows('<html><body>No table here</body></html>', 'grdSearchResults'))
+
+
+if __name__ == '__main__':
+    unittest.main()
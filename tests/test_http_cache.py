@@ -0,0 +1,239 @@
+import asyncio
+import gzip
+import os
+import tempfile
+import unittest
+
+import httpx
+
+from src.utils.http_cache import CachingTransport, ResponseCache
+
+
+DETAILS_URL = 'https://apps.dfi.wi.gov/apps/FranchiseSearch/details.aspx?id=637375&hash=1'
+SEARCH_URL = 'https://apps.dfi.wi.gov/apps/FranchiseSearch/MainSearch.aspx'
+
+TTLS = [(r'/details\.aspx', 100), (r'/MainSearch\.aspx', 0)]
+
+
+class FakeClock:
+    """Wall clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the ResponseCache class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'http_cache.sqlite')
+        self.clock = FakeClock()
+        self.cache = ResponseCache(self.path, ttls=TTLS, default_ttl=10, clock=self.clock)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def test_put_and_get_until_stale(self):
+        """Test a stored response is fresh for its URL's TTL and kept once stale."""
+        key = self.cache.key('GET', DETAILS_URL)
+        self.assertTrue(self.cache.put(key, DETAILS_URL, 200, [('ETag', '"v1"')], b'<html>1</html>'))
+
+        entry = self.cache.get(key)
+        self.assertEqual(entry.body, b'<html>1</html>')
+        self.assertEqual(entry.etag, '"v1"')
+        self.assertTrue(self.cache.is_fresh(entry))
+
+        self.clock.now += 100
+        entry = self.cache.get(key)
+        self.assertFalse(self.cache.is_fresh(entry))
+
+        self.cache.refresh(key, [('ETag', '"v2"')])
+        entry = self.cache.get(key)
+        self.assertTrue(self.cache.is_fresh(entry))
+        self.assertEqual(entry.etag, '"v2"')
+
+    def test_key_depends_on_method_and_variant_headers(self):
+        """Test requests for different variants of a URL are kept apart."""
+        self.assertEqual(self.cache.key('GET', DETAILS_URL, {'Accept': 'text/html'}),
+                         self.cache.key('get', DETAILS_URL, {'accept': 'text/html', 'User-Agent': 'x'}))
+        self.assertNotEqual(self.cache.key('GET', DETAILS_URL, {'Accept': 'text/html'}),
+                            self.cache.key('GET', DETAILS_URL, {'Accept': 'application/json'}))
+        self.assertNotEqual(self.cache.key('GET', DETAILS_URL), self.cache.key('RENDER', DETAILS_URL))
+
+    def test_uncached_urls_and_large_bodies_are_not_stored(self):
+        """Test TTL 0 rules and the entry size limit keep responses out."""
+        cache = ResponseCache(os.path.join(self.temp_dir.name, 'small.sqlite'), max_entry_size=10, ttls=TTLS)
+
+        self.assertFalse(cache.put(cache.key('GET', SEARCH_URL), SEARCH_URL, 200, [], b'form'))
+        self.assertFalse(cache.put(cache.key('GET', DETAILS_URL), DETAILS_URL, 200, [], b'x' * 11))
+        self.assertEqual(cache.size, 0)
+        cache.close()
+
+    def test_least_recently_used_evicted(self):
+        """Test the least recently used responses are evicted to stay within the size limit."""
+        cache = ResponseCache(os.path.join(self.temp_dir.name, 'lru.sqlite'), max_size=250,
+                              ttls=TTLS, clock=self.clock)
+        keys = []
+        for i in range(2):
+            self.clock.now += 1
+            url = f'{DETAILS_URL}{i}'
+            keys.append(cache.key('GET', url))
+            cache.put(keys[-1], url, 200, [], b'x' * 100)
+
+        # Using the first response makes the second the least recently used
+        self.clock.now += 1
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.clock.now += 1
+        cache.put(cache.key('GET', 'https://example.com/3'), 'https://example.com/3', 200, [], b'x' * 100)
+
+        self.assertEqual(cache.size, 200)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertEqual(cache.stats['evicted'], 1)
+        cache.close()
+
+    def test_persists_across_instances(self):
+        """Test responses and the cache size survive reopening the file."""
+        self.cache.put_page(DETAILS_URL, '<html>rendered</html>')
+        self.cache.close()
+
+        self.cache = ResponseCache(self.path, ttls=TTLS, clock=self.clock)
+
+        self.assertEqual(self.cache.get_page(DETAILS_URL), '<html>rendered</html>')
+        self.assertEqual(self.cache.size, len('<html>rendered</html>'))
+        self.assertEqual(self.cache.stats['hits'], 1)
+
+    def test_stale_page_is_a_miss(self):
+        """Test rendered pages past their TTL are loaded again."""
+        self.cache.put_page(DETAILS_URL, '<html>rendered</html>')
+        self.clock.now += 100
+
+        self.assertIsNone(self.cache.get_page(DETAILS_URL))
+        self.assertEqual(self.cache.stats['misses'], 1)
+
+
+class TestCachingTransport(unittest.TestCase):
+    """Test cases for the CachingTransport class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.clock = FakeClock()
+        self.cache = ResponseCache(os.path.join(self.temp_dir.name, 'http_cache.sqlite'),
+                                   ttls=TTLS, clock=self.clock)
+        self.requests = []
+        self.version = 'v1'
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.cache.close()
+        self.temp_dir.cleanup()
+        self.loop.close()
+
+    def handler(self, request):
+        """Serve gzipped pages with an ETag, answering matching conditional requests with 304."""
+        self.requests.append(request)
+        etag = f'"{self.version}"'
+        if request.headers.get('If-None-Match') == etag:
+            return httpx.Response(304, headers={'ETag': etag})
+        headers = {'ETag': etag, 'Content-Encoding': 'gzip', 'Content-Type': 'text/html',
+                   'Set-Cookie': f'ASP.NET_SessionId={self.version}; path=/; HttpOnly'}
+        if 'nostore' in str(request.url):
+            headers['Cache-Control'] = 'no-store'
+        return httpx.Response(200, content=gzip.compress(f'<html>{self.version}</html>'.encode()), headers=headers)
+
+    def fetch(self, *requests):
+        """Make requests through a caching client and return the response texts."""
+        async def run():
+            transport = CachingTransport(httpx.MockTransport(self.handler), self.cache)
+            async with httpx.AsyncClient(transport=transport) as client:
+                texts = []
+                for method, url, headers in requests:
+                    response = await client.request(method, url, headers=headers)
+                    texts.append(response.text)
+                return texts
+        return self.loop.run_until_complete(run())
+
+    def test_fresh_response_served_from_disk(self):
+        """Test a repeated GET is answered from the cache and still decoded."""
+        texts = self.fetch(('GET', DETAILS_URL, None), ('GET', DETAILS_URL, None))
+
+        self.assertEqual(texts, ['<html>v1</html>', '<html>v1</html>'])
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(self.cache.stats['hits'], 1)
+        self.assertEqual(self.cache.stats['misses'], 1)
+
+    def test_stale_response_revalidated(self):
+        """Test a stale response is revalidated with its ETag and refetched once changed."""
+        self.fetch(('GET', DETAILS_URL, None))
+        self.clock.now += 100
+        texts = self.fetch(('GET', DETAILS_URL, None), ('GET', DETAILS_URL, None))
+
+        self.assertEqual(texts, ['<html>v1</html>', '<html>v1</html>'])
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.requests[1].headers['If-None-Match'], '"v1"')
+        self.assertEqual(self.cache.stats['revalidated'], 1)
+
+        self.clock.now += 100
+        self.version = 'v2'
+        texts = self.fetch(('GET', DETAILS_URL, None), ('GET', DETAILS_URL, None))
+
+        self.assertEqual(texts, ['<html>v2</html>', '<html>v2</html>'])
+        self.assertEqual(len(self.requests), 3)
+
+    def test_cookies_are_not_replayed(self):
+        """Test a cache hit leaves the client's session cookie alone."""
+        async def run():
+            transport = CachingTransport(httpx.MockTransport(self.handler), self.cache)
+            async with httpx.AsyncClient(transport=transport) as client:
+                await client.get(DETAILS_URL)
+                self.assertEqual(client.cookies.get('ASP.NET_SessionId'), 'v1')
+                client.cookies.set('ASP.NET_SessionId', 'FRESH', domain='apps.dfi.wi.gov')
+                await client.get(DETAILS_URL)
+                return client.cookies.get('ASP.NET_SessionId')
+
+        self.assertEqual(self.loop.run_until_complete(run()), 'FRESH')
+        self.assertEqual(len(self.requests), 1)
+        stored = self.cache.connection.execute("SELECT headers FROM responses").fetchone()['headers']
+        self.assertNotIn('set-cookie', stored.lower())
+
+    def test_uncacheable_requests_pass_through(self):
+        """Test POSTs, no-store responses and TTL 0 URLs always reach the server."""
+        self.fetch(
+            ('POST', DETAILS_URL, None), ('POST', DETAILS_URL, None),
+            ('GET', f'{DETAILS_URL}&nostore=1', None), ('GET', f'{DETAILS_URL}&nostore=1', None),
+            ('GET', SEARCH_URL, None), ('GET', SEARCH_URL, None),
+        )
+        self.assertEqual(len(self.requests), 6)
+        self.assertEqual(self.cache.size, 0)
+
+    def test_no_cache_requests_bypass_the_cache(self):
+        """Test no-cache and max-age=0 requests neither read nor write the cache."""
+        texts = self.fetch(
+            ('GET', DETAILS_URL, {'Cache-Control': 'no-cache'}),
+            ('GET', DETAILS_URL, {'Cache-Control': 'max-age=0'}),
+        )
+
+        self.assertEqual(texts, ['<html>v1</html>', '<html>v1</html>'])
+        self.assertEqual(self.cache.size, 0)
+
+        self.fetch(('GET', DETAILS_URL, None))
+        self.version = 'v2'
+        texts = self.fetch(('GET', DETAILS_URL, {'Cache-Control': 'no-cache'}), ('GET', DETAILS_URL, None))
+
+        self.assertEqual(texts, ['<html>v2</html>', '<html>v1</html>'])
+        self.assertEqual(len(self.requests), 4)
+        self.assertNotIn('If-None-Match', self.requests[-1].headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
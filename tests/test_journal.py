@@ -0,0 +1,79 @@
+import os
+import unittest
+import tempfile
+
+from src.db.database import Database
+from src.db.journal import CrawlJournal, SEARCHED, DETAILS, DOWNLOADED, PROCESSED
+
+
+class TestCrawlJournal(unittest.TestCase):
+    """Test cases for the CrawlJournal class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_db_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_db_file.close()
+        self.db = Database(self.temp_db_file.name)
+        self.db.connect()
+        self.db.initialize_database()
+        self.journal = CrawlJournal(self.db)
+        self.filings = [
+            {'id': 1, 'franchise_name': 'Alpha'},
+            {'id': 2, 'franchise_name': 'Beta'}
+        ]
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.db.close()
+        os.unlink(self.temp_db_file.name)
+
+    def test_new_run_queues_every_filing(self):
+        """Test that a fresh run starts every filing at the search stage."""
+        self.journal.start_run(self.filings)
+
+        self.assertEqual(self.journal.pending_work(), [('search', filing) for filing in self.filings])
+
+    def test_iter_queued_streams_filings_in_order(self):
+        """Test that a run's filings can be queued from and read back as iterators."""
+        self.journal.start_run(iter(self.filings))
+
+        self.assertEqual(list(self.journal.iter_queued()), self.filings)
+
+    def test_pending_work_resumes_each_item_at_its_next_stage(self):
+        """Test that items restart after the last stage they completed."""
+        self.journal.start_run(self.filings)
+        results = [{'file_number': f'A-{i}', 'active_filing_id': 1} for i in range(4)]
+        self.journal.record(1, SEARCHED, results)
+        self.journal.record(1, DETAILS, {'file_number': 'A-1', 'stage': 'details'}, 'A-1')
+        self.journal.record(1, DETAILS, {'file_number': 'A-2'}, 'A-2')
+        self.journal.record(1, DOWNLOADED, {'file_number': 'A-2', 'fdd_id': 7}, 'A-2')
+        self.journal.record(1, DETAILS, {'file_number': 'A-3'}, 'A-3')
+        self.journal.record(1, DOWNLOADED, {'file_number': 'A-3'}, 'A-3')
+        self.journal.record(1, PROCESSED, {'num_pages': 10}, 'A-3')
+
+        self.assertEqual(self.journal.pending_work(), [
+            ('details', results[0]),
+            ('download', {'file_number': 'A-1', 'stage': 'details'}),
+            ('postprocess', {'file_number': 'A-2', 'fdd_id': 7}),
+            ('search', self.filings[1])
+        ])
+
+    def test_resume_run_finds_latest_unfinished_run(self):
+        """Test that only unfinished runs are resumed."""
+        self.assertIsNone(self.journal.resume_run())
+
+        first = self.journal.start_run(self.filings[:1])
+        self.journal.finish_run()
+        second = self.journal.start_run(self.filings[1:])
+
+        journal = CrawlJournal(self.db)
+        self.assertEqual(journal.resume_run(), second)
+        self.assertNotEqual(first, second)
+        self.assertEqual(journal.pending_work(), [('search', self.filings[1])])
+
+        journal.finish_run()
+        self.assertIsNone(CrawlJournal(self.db).resume_run())
+
+
+if __name__ == '__main__':
+    unittest.main()
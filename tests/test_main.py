@@ -0,0 +1,187 @@
+import os
+import unittest
+import asyncio
+import tempfile
+from unittest.mock import patch, AsyncMock
+
+from src import main
+from src.db.database import Database
+
+
+PIPELINE_STATS = {
+    'filings': 2, 'resumed': 0, 'skipped': 0, 'searched': 2, 'details': 2,
+    'downloaded': 2, 'processed': 2, 'indexed': 2, 'shared_searches': 0, 'linked': 0, 'errors': 0
+}
+
+
+class FakePdfProcessor:
+    """PDF processor that returns one page of text per file."""
+
+    workers = 1
+
+    def __init__(self):
+        self.extracted = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def extract_text(self, file_path):
+        self.extracted.append(file_path)
+        if file_path.endswith('unreadable.pdf'):
+            return None
+        return [f"Royalty fees of {os.path.basename(file_path)}"]
+
+
+class TestParseArgs(unittest.TestCase):
+    """Test cases for the command line arguments."""
+
+    def test_defaults(self):
+        """Test that no arguments start a full run."""
+        args = main.parse_args([])
+
+        self.assertFalse(args.incremental)
+        self.assertFalse(args.verify_files)
+        self.assertFalse(args.resume)
+        self.assertFalse(args.index_text)
+        self.assertIsNone(args.search)
+
+    def test_verify_files_implies_incremental(self):
+        """Test that --verify-files turns on incremental mode."""
+        args = main.parse_args(['--verify-files'])
+
+        self.assertTrue(args.verify_files)
+        self.assertTrue(args.incremental)
+
+    def test_resume(self):
+        """Test that --resume combines with the other run options."""
+        args = main.parse_args(['--resume', '--incremental'])
+
+        self.assertTrue(args.resume)
+        self.assertTrue(args.incremental)
+
+    def test_index_text_and_search(self):
+        """Test the options that only work on the full-text index."""
+        self.assertTrue(main.parse_args(['--index-text']).index_text)
+        self.assertEqual(main.parse_args(['--search', '"royalty fee"']).search, '"royalty fee"')
+
+
+class TestMain(unittest.TestCase):
+    """Test cases for choosing between resuming and starting a run."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.patches = {
+            name: patch(f'src.main.{name}', new)
+            for name, new in [
+                ('process_active_filings', AsyncMock(return_value=2)),
+                ('run_pipeline', AsyncMock(return_value=PIPELINE_STATS)),
+                ('get_response_cache', lambda: None),
+                ('close_snapshot_writer', lambda: None),
+            ]
+        }
+        self.mocks = {name: p.start() for name, p in self.patches.items()}
+
+    def tearDown(self):
+        """Clean up test environment."""
+        for p in self.patches.values():
+            p.stop()
+        self.loop.close()
+
+    def test_resume_continues_interrupted_run(self):
+        """Test that --resume with an interrupted run skips scraping active filings."""
+        with patch('src.main.find_unfinished_run', return_value=7):
+            self.loop.run_until_complete(main.main(incremental=True, resume=True))
+
+        self.mocks['process_active_filings'].assert_not_awaited()
+        self.mocks['run_pipeline'].assert_awaited_once_with(incremental=True, verify_files=False, resume=True)
+
+    def test_resume_without_interrupted_run_starts_new_run(self):
+        """Test that --resume starts over when every run finished."""
+        with patch('src.main.find_unfinished_run', return_value=None):
+            self.loop.run_until_complete(main.main(resume=True))
+
+        self.mocks['process_active_filings'].assert_awaited_once()
+        self.mocks['run_pipeline'].assert_awaited_once_with(incremental=False, verify_files=False, resume=False)
+
+    def test_new_run_does_not_look_for_interrupted_runs(self):
+        """Test that a run without --resume never reads the journal."""
+        with patch('src.main.find_unfinished_run') as find_unfinished_run:
+            self.loop.run_until_complete(main.main())
+
+        find_unfinished_run.assert_not_called()
+        self.mocks['process_active_filings'].assert_awaited_once()
+
+
+class TestTextIndex(unittest.TestCase):
+    """Test cases for indexing and searching FDD text against a database file."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.temp_db_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_db_file.close()
+        self.db_path_patch = patch('src.main.DB_PATH', self.temp_db_file.name)
+        self.db_path_patch.start()
+        self.pdf_processor = FakePdfProcessor()
+        self.processor_patch = patch('src.main.PdfProcessor', return_value=self.pdf_processor)
+        self.processor_patch.start()
+
+        # Two filings share one document, a third has its own and a fourth cannot be read
+        with Database(self.temp_db_file.name) as db:
+            db.initialize_database()
+            for i, (name, sha256) in enumerate([
+                ("Alpha", "aa" * 32), ("Beta", "aa" * 32), ("Gamma", "cc" * 32), ("Delta", "dd" * 32)
+            ]):
+                filing_id = db.insert_active_filing(name, "2024-12-31")
+                metadata_id = db.insert_franchise_metadata(
+                    filing_id, str(i), f"{name} LLC", "2023-01-01", "2024-12-31", "Registered"
+                )
+                file_name = "unreadable.pdf" if name == "Delta" else f"{name}.pdf"
+                db.insert_fdd_metadata(metadata_id, f"https://example.com/fdd{i}", file_name,
+                                       f"/path/{file_name}", sha256=sha256)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.processor_patch.stop()
+        self.db_path_patch.stop()
+        os.unlink(self.temp_db_file.name)
+        self.loop.close()
+
+    def test_index_fdd_text_once_per_document(self):
+        """Test that each distinct document is extracted once, and only until it is indexed."""
+        self.assertEqual(self.loop.run_until_complete(main.index_fdd_text()), 2)
+        self.assertEqual(sorted(self.pdf_processor.extracted),
+                         ['/path/Alpha.pdf', '/path/Gamma.pdf', '/path/unreadable.pdf'])
+
+        # Only the document that could not be read is tried again
+        self.pdf_processor.extracted.clear()
+        self.assertEqual(self.loop.run_until_complete(main.index_fdd_text()), 0)
+        self.assertEqual(self.pdf_processor.extracted, ['/path/unreadable.pdf'])
+
+    def test_search_fdd_text(self):
+        """Test that search hits name every filing sharing the matching document."""
+        self.loop.run_until_complete(main.index_fdd_text())
+
+        hits = main.search_fdd_text("royalty")
+
+        self.assertEqual(sorted(hit['franchise_name'] for hit in hits), ["Alpha", "Beta", "Gamma"])
+        self.assertTrue(all(hit['page_number'] == 1 for hit in hits))
+        self.assertEqual(main.search_fdd_text("territory"), [])
+
+    def test_invalid_search_is_reported(self):
+        """Test that a search FTS5 cannot parse ends with a message instead of a traceback."""
+        with patch('sys.argv', ['fdd-webscrape', '--search', 'OR']), patch('builtins.print') as mock_print:
+            with self.assertRaises(SystemExit):
+                main.main_entry()
+
+        self.assertIn("Invalid search query", mock_print.call_args[0][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
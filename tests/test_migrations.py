@@ -0,0 +1,122 @@
+import os
+import unittest
+import sqlite3
+import tempfile
+
+from src.db.database import Database
+from src.db.migrations import (
+    MIGRATIONS, Migration, MigrationError, backfill, create_index, get_schema_version, migrate
+)
+
+
+class TestMigrations(unittest.TestCase):
+    """Test cases for the schema migrations."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_db_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_db_file.close()
+        self.db = Database(self.temp_db_file.name)
+        self.db.connect()
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.db.close()
+        os.unlink(self.temp_db_file.name)
+
+    def test_new_database_reaches_latest_version(self):
+        """Test that a new database is migrated to the latest version, and only once."""
+        self.assertEqual(self.db.initialize_database(), MIGRATIONS[-1].version)
+        self.assertEqual(get_schema_version(self.db), MIGRATIONS[-1].version)
+        self.assertEqual(migrate(self.db), MIGRATIONS[-1].version)
+
+    def test_unversioned_database_is_upgraded(self):
+        """Test that a database from before versioning is upgraded in place."""
+        self.db.cursor.executescript('''
+        CREATE TABLE active_filings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            franchise_name TEXT NOT NULL,
+            expiration_date TEXT NOT NULL,
+            active_state TEXT NOT NULL DEFAULT 'wisconsin'
+        );
+        INSERT INTO active_filings (franchise_name, expiration_date) VALUES ('Test Franchise', '2023-12-31');
+        ''')
+
+        self.db.initialize_database()
+
+        self.assertEqual(len(self.db.get_all_active_filings()), 1)
+        self.db.cursor.execute("PRAGMA table_info(fdd_metadata)")
+        self.assertIn('sha256', [row['name'] for row in self.db.cursor.fetchall()])
+
+    def test_existing_journal_tables_are_adopted(self):
+        """Test that journal tables created before they had a migration keep their runs."""
+        migrate(self.db, target=5)
+        self.db.cursor.executescript('''
+        CREATE TABLE crawl_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at TEXT NOT NULL,
+            finished_at TEXT
+        );
+        INSERT INTO crawl_runs (started_at) VALUES ('2024-01-01T00:00:00');
+        ''')
+
+        self.db.initialize_database()
+
+        self.db.cursor.execute("SELECT COUNT(*) FROM crawl_runs WHERE finished_at IS NULL")
+        self.assertEqual(self.db.cursor.fetchone()[0], 1)
+        self.db.cursor.execute("SELECT COUNT(*) FROM crawl_journal")
+        self.assertEqual(self.db.cursor.fetchone()[0], 0)
+
+    def test_target_version(self):
+        """Test that migrating to a target version stops there."""
+        self.assertEqual(migrate(self.db, target=1), 1)
+        self.db.cursor.execute("PRAGMA table_info(fdd_metadata)")
+        self.assertNotIn('sha256', [row['name'] for row in self.db.cursor.fetchall()])
+
+    def test_failed_migration_is_rolled_back(self):
+        """Test that a failing step leaves neither its changes nor its version behind."""
+        def create_and_fail(db):
+            db.cursor.execute("CREATE TABLE half_done (id INTEGER)")
+            raise ValueError("Step failed")
+
+        migrations = [
+            Migration(1, "create table", lambda db: db.cursor.execute("CREATE TABLE done (id INTEGER)")),
+            Migration(2, "fail", create_and_fail)
+        ]
+        with self.assertRaises(ValueError):
+            migrate(self.db, migrations=migrations)
+
+        self.assertEqual(get_schema_version(self.db), 1)
+        self.db.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        tables = [row[0] for row in self.db.cursor.fetchall()]
+        self.assertIn('done', tables)
+        self.assertNotIn('half_done', tables)
+
+    def test_newer_database_is_rejected(self):
+        """Test that a database migrated by newer code raises MigrationError."""
+        self.db.cursor.execute(f"PRAGMA user_version = {MIGRATIONS[-1].version + 1}")
+
+        with self.assertRaises(MigrationError):
+            self.db.initialize_database()
+
+    def test_create_index_and_backfill(self):
+        """Test index creation and a backfill that commits in chunks."""
+        self.db.cursor.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, value INTEGER, flag TEXT)")
+        self.db.cursor.executemany("INSERT INTO items (value) VALUES (?)", [(i,) for i in range(25)])
+        self.db.connection.commit()
+
+        create_index(self.db, 'idx_items_flag', 'items', ('flag',), where="flag IS NOT NULL")
+        updated = backfill(self.db, 'items', "flag = ?", where="value % 2 = 0", params=('even',), batch_size=10)
+
+        self.assertEqual(updated, 13)
+        self.assertFalse(self.db.connection.in_transaction)
+        # Another connection sees every chunk committed
+        connection = sqlite3.connect(self.temp_db_file.name)
+        self.assertEqual(connection.execute("SELECT COUNT(*) FROM items WHERE flag = 'even'").fetchone()[0], 13)
+        plan = connection.execute("EXPLAIN QUERY PLAN SELECT id FROM items WHERE flag = 'even'").fetchall()
+        self.assertIn('idx_items_flag', ' '.join(row[-1] for row in plan))
+        connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
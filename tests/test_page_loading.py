@@ -0,0 +1,122 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock, AsyncMock
+
+from pyppeteer.errors import TimeoutError as PageTimeoutError
+
+from src.scrapers.page_loading import PageLoading
+
+
+class FakePage:
+    """Pyppeteer page recording navigations and dispatching request events."""
+
+    url = 'https://example.com/page.aspx'
+
+    def __init__(self):
+        self.handlers = []
+        self.setRequestInterception = AsyncMock()
+        self.goto = AsyncMock(return_value='response')
+        self.waitForNavigation = AsyncMock(return_value='response')
+        self.waitForSelector = AsyncMock()
+
+    def on(self, event, handler):
+        self.handlers.append((event, handler))
+
+    def request(self, resource_type):
+        """Fire a request event for a resource and return the request."""
+        request = MagicMock(resourceType=resource_type)
+        request.continue_ = AsyncMock()
+        request.abort = AsyncMock()
+        for event, handler in self.handlers:
+            if event == 'request':
+                handler(request)
+        return request
+
+
+class TestPageLoading(unittest.TestCase):
+    """Test cases for the PageLoading class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.loop.close()
+
+    def test_blocks_resources_outside_allowed_types(self):
+        """Test that only allowed resource types are requested."""
+        loading = PageLoading(allowed_resources=('document',))
+        page = FakePage()
+
+        async def run():
+            await loading.prepare(page)
+            requests = [page.request(resource_type) for resource_type in ('document', 'image', 'stylesheet', 'font')]
+            await asyncio.sleep(0)
+            return requests
+
+        document, *others = self.loop.run_until_complete(run())
+
+        page.setRequestInterception.assert_awaited_once_with(True)
+        document.continue_.assert_awaited_once()
+        document.abort.assert_not_awaited()
+        for request in others:
+            request.abort.assert_awaited_once()
+            request.continue_.assert_not_awaited()
+        self.assertEqual(loading.stats, {'continued': 1, 'aborted': 3})
+
+    def test_loads_everything_without_allowed_types(self):
+        """Test that pages are not intercepted when no resource types are blocked."""
+        page = FakePage()
+
+        self.loop.run_until_complete(PageLoading(allowed_resources=None).prepare(page))
+
+        page.setRequestInterception.assert_not_awaited()
+        self.assertEqual(page.handlers, [])
+
+    def test_selector_waits(self):
+        """Test that navigations end at DOM content loaded once the selector exists."""
+        loading = PageLoading(wait_for_selector=True, timeout=1000)
+        page = FakePage()
+
+        async def run():
+            first = await loading.goto(page, 'https://example.com/details.aspx', '#lblFranchiseAddressLine1')
+            second = await loading.wait_for_navigation(page, '#grdSearchResults')
+            return first, second
+
+        responses = self.loop.run_until_complete(run())
+
+        self.assertEqual(responses, ('response', 'response'))
+        page.goto.assert_awaited_once_with(
+            'https://example.com/details.aspx', {'timeout': 1000, 'waitUntil': 'domcontentloaded'}
+        )
+        page.waitForNavigation.assert_awaited_once_with({'timeout': 1000, 'waitUntil': 'domcontentloaded'})
+        self.assertEqual([call.args[0] for call in page.waitForSelector.await_args_list],
+                         ['#lblFranchiseAddressLine1', '#grdSearchResults'])
+
+    def test_network_idle_waits(self):
+        """Test that selector waits can be turned off in favour of network idle."""
+        loading = PageLoading(wait_for_selector=False, timeout=1000)
+        page = FakePage()
+
+        self.loop.run_until_complete(loading.goto(page, 'https://example.com/details.aspx', '#missing'))
+
+        page.goto.assert_awaited_once_with(
+            'https://example.com/details.aspx', {'timeout': 1000, 'waitUntil': 'networkidle0'}
+        )
+        page.waitForSelector.assert_not_awaited()
+
+    def test_missing_selector_returns_page(self):
+        """Test that a page without the target element is still returned for the parser to report."""
+        loading = PageLoading()
+        page = FakePage()
+        page.waitForSelector.side_effect = PageTimeoutError("Waiting for selector failed")
+
+        response = self.loop.run_until_complete(loading.goto(page, 'https://example.com/details.aspx', '#missing'))
+
+        self.assertEqual(response, 'response')
+
+
+if __name__ == '__main__':
+    unittest.main()
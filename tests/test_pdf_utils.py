@@ -3,8 +3,19 @@ import unittest
 import tempfile
 from unittest.mock import patch, MagicMock
 import io
+import asyncio
 
-from src.utils.pdf_utils import get_pdf_page_count
+import PyPDF2
+
+from src.utils.pdf_utils import (
+    get_pdf_page_count,
+    count_pdf_pages_fast,
+    analyze_pdf,
+    extract_pdf_text,
+    PdfProcessor,
+    PdfStructureError
+)
+from src.utils.synthetic_pdf import make_synthetic_pdf
 from tests.utils import temp_file
 
 
@@ -81,5 +92,174 @@ class TestPdfUtils(unittest.TestCase):
         self.assertIsNone(page_count)
 
 
+class TestFastPageCount(unittest.TestCase):
+    """Test cases for the mmap-based page counter."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.temp_dir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    @patch('src.utils.pdf_utils.PyPDF2.PdfReader')
+    def test_xref_table(self, mock_pdf_reader):
+        """Test a classic xref table is read without PyPDF2."""
+        path = self.write("table.pdf", make_synthetic_pdf(120))
+
+        self.assertEqual(get_pdf_page_count(path), 120)
+        mock_pdf_reader.assert_not_called()
+
+    def test_xref_stream_and_object_stream(self):
+        """Test a compressed xref stream pointing into an object stream."""
+        path = self.write("stream.pdf", make_synthetic_pdf(75, xref_stream=True))
+
+        self.assertEqual(count_pdf_pages_fast(path), 75)
+
+    def test_pypdf2_written_file(self):
+        """Test a file written by PyPDF2 agrees with PyPDF2's count."""
+        writer = PyPDF2.PdfWriter()
+        for _ in range(9):
+            writer.add_blank_page(width=612, height=792)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        path = self.write("pypdf2.pdf", buffer.getvalue())
+
+        self.assertEqual(count_pdf_pages_fast(path), 9)
+
+    def test_incremental_update(self):
+        """Test the newest revision wins when the file has been updated in place."""
+        content = make_synthetic_pdf(3)
+        previous_xref = int(content.rsplit(b"startxref", 1)[1].split()[0])
+        update = bytearray(content)
+        pages_offset = len(update)
+        update.extend(b"2 0 obj\n<< /Type /Pages /Kids [4 0 R 6 0 R] /Count 2 >>\nendobj\n")
+        xref_offset = len(update)
+        update.extend(b"xref\n2 1\n%010d 00000 n \n" % pages_offset)
+        update.extend(b"trailer\n<< /Size 10 /Root 1 0 R /Prev %d >>\n" % previous_xref)
+        update.extend(b"startxref\n%d\n%%%%EOF\n" % xref_offset)
+        path = self.write("updated.pdf", bytes(update))
+
+        self.assertEqual(count_pdf_pages_fast(path), 2)
+
+    def test_damaged_file(self):
+        """Test a broken startxref is rejected by the fast path but recovered by PyPDF2."""
+        content = make_synthetic_pdf(3)
+        # Point startxref into the middle of the header
+        damaged = content[:content.rfind(b"startxref")] + b"startxref\n17\n%%EOF\n"
+        path = self.write("damaged.pdf", damaged)
+
+        with self.assertRaises(PdfStructureError):
+            count_pdf_pages_fast(path)
+        # The full PyPDF2 parser still recovers it
+        self.assertEqual(get_pdf_page_count(path), 3)
+
+    @patch('src.utils.pdf_utils.PyPDF2.PdfReader')
+    def test_indirect_decode_parms(self, mock_pdf_reader):
+        """Test an xref stream whose /DecodeParms is an indirect object."""
+        content = make_synthetic_pdf(6, xref_stream=True)
+        content = content.replace(b"/DecodeParms << /Columns 7 /Predictor 12 >>", b"/DecodeParms 90 0 R")
+        # Define the parameters, with an indirect predictor too, after the xref stream
+        end = content.rfind(b"startxref")
+        params = b"90 0 obj\n<< /Columns 7 /Predictor 91 0 R >>\nendobj\n91 0 obj\n12\nendobj\n"
+        content = content[:end] + params + content[end:]
+        path = self.write("indirect.pdf", content)
+
+        self.assertEqual(get_pdf_page_count(path), 6)
+        mock_pdf_reader.assert_not_called()
+
+    @patch('src.utils.pdf_utils.PyPDF2.PdfReader')
+    def test_deeply_nested_object(self, mock_pdf_reader):
+        """Test nesting too deep for the fast parser falls back to PyPDF2."""
+        mock_pdf_reader.return_value = MagicMock(pages=[1, 2, 3])
+        content = make_synthetic_pdf(3)
+        content = content.replace(b"/Root 1 0 R >>", b"/Root 1 0 R /Extra " + b"[" * 5000 + b"]" * 5000 + b" >>")
+        path = self.write("nested.pdf", content)
+
+        with self.assertRaises(PdfStructureError):
+            count_pdf_pages_fast(path)
+        self.assertEqual(get_pdf_page_count(path), 3)
+        mock_pdf_reader.assert_called_once()
+
+    def test_empty_file(self):
+        """Test an empty file is rejected rather than mapped."""
+        path = self.write("empty.pdf", b"")
+
+        with self.assertRaises(PdfStructureError):
+            count_pdf_pages_fast(path)
+
+
+class TestPdfProcessor(unittest.TestCase):
+    """Test cases for PDF post-processing in worker processes."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.temp_dir.name, "five_pages.pdf")
+        writer = PyPDF2.PdfWriter()
+        for _ in range(5):
+            writer.add_blank_page(width=612, height=792)
+        with open(self.pdf_path, 'wb') as f:
+            writer.write(f)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.temp_dir.cleanup()
+
+    def test_analyze_pdf(self):
+        """Test collecting PDF metadata."""
+        self.assertEqual(analyze_pdf(self.pdf_path), {'num_pages': 5})
+
+    def test_analyze_in_process_pool(self):
+        """Test analyzing PDFs concurrently in worker processes."""
+        async def run(processor):
+            return await asyncio.gather(*(processor.analyze(self.pdf_path) for _ in range(3)))
+
+        with PdfProcessor(workers=2) as processor:
+            loop = asyncio.new_event_loop()
+            results = loop.run_until_complete(run(processor))
+            loop.close()
+
+        self.assertEqual(results, [{'num_pages': 5}] * 3)
+
+    def test_workers_are_not_forked(self):
+        """Test that the pool starts its workers without forking the threaded crawler."""
+        with PdfProcessor(workers=1) as processor:
+            self.assertIn(processor._executor._mp_context.get_start_method(), ('forkserver', 'spawn'))
+
+    def test_extract_text_in_process_pool(self):
+        """Test extracting each page's text in worker processes."""
+        path = os.path.join(self.temp_dir.name, "text.pdf")
+        with open(path, 'wb') as f:
+            f.write(make_synthetic_pdf(3, page_text_lines=2))
+
+        with PdfProcessor(workers=1) as processor:
+            loop = asyncio.new_event_loop()
+            pages = loop.run_until_complete(processor.extract_text(path))
+            loop.close()
+
+        self.assertEqual(len(pages), 3)
+        self.assertIn("Page 2 line 1 of the synthetic disclosure document", pages[1])
+        self.assertEqual(extract_pdf_text(self.pdf_path), [''] * 5)
+        self.assertIsNone(extract_pdf_text(os.path.join(self.temp_dir.name, "missing.pdf")))
+
+    def test_analyze_in_thread(self):
+        """Test that zero workers falls back to a background thread."""
+        processor = PdfProcessor(workers=0)
+        loop = asyncio.new_event_loop()
+        result = loop.run_until_complete(processor.analyze(self.pdf_path))
+        loop.close()
+        processor.close()
+
+        self.assertEqual(result, {'num_pages': 5})
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
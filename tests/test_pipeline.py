@@ -0,0 +1,389 @@
+import os
+import unittest
+import asyncio
+import hashlib
+import tempfile
+
+from src.db.async_database import AsyncDatabase
+from src.db.database import Database
+from src.db.journal import CrawlJournal
+from src.pipeline import Pipeline
+
+
+class FakeScraper:
+    """Franchise scraper returning two registered rows per search."""
+
+    concurrency = 2
+
+    def __init__(self, events):
+        self.events = events
+
+    async def search_franchise(self, franchise_name):
+        await asyncio.sleep(0.01)
+        self.events.append(('search', franchise_name))
+        if franchise_name == 'Missing':
+            return None
+        return [
+            {
+                'file_number': f'{franchise_name}-{i}',
+                'legal_name': f'{franchise_name} LLC',
+                'trade_name': franchise_name,
+                'effective_date': '1/1/2024',
+                'expiration_date': '1/1/2025',
+                'status': 'Registered',
+                'details_url': f'https://example.com/details.aspx?id={franchise_name}-{i}',
+                'file_id': f'{franchise_name}-{i}',
+                'hash': '1'
+            }
+            for i in range(2)
+        ]
+
+    async def get_franchise_details(self, details_url):
+        return {
+            'address': {'address_line1': '1 Main St', 'city': 'Madison', 'state': 'WI', 'zip': '53703'},
+            'wi_webpage_url': details_url,
+            'fdd_url': details_url
+        }
+
+
+class OverlappingScraper(FakeScraper):
+    """Franchise scraper whose searches match on the first word of the name only."""
+
+    def __init__(self, events):
+        super().__init__(events)
+        self.details_fetched = []
+
+    async def search_franchise(self, franchise_name):
+        return await super().search_franchise(franchise_name.split()[0].capitalize())
+
+    async def get_franchise_details(self, details_url):
+        self.details_fetched.append(details_url)
+        await asyncio.sleep(0.01)
+        return await super().get_franchise_details(details_url)
+
+
+class FormDetailsScraper(FakeScraper):
+    """Details fetcher that also returns the page's download form."""
+
+    async def get_franchise_details(self, details_url):
+        details = await super().get_franchise_details(details_url)
+        return {**details, 'download_form': {'__VIEWSTATE': details_url}}
+
+
+class FakeDownloader:
+    """FDD downloader that pretends every document downloads."""
+
+    concurrency = 2
+
+    def __init__(self, events, broken=('Broken-0',), failed=()):
+        self.events = events
+        self.broken = broken
+        self.failed = failed
+        self.forms = []
+
+    async def download_fdd(self, fdd_url, franchise_data):
+        self.events.append(('download', franchise_data['file_id']))
+        self.forms.append(franchise_data.get('download_form'))
+        if franchise_data['file_id'] in self.broken:
+            raise RuntimeError("Connection reset")
+        if franchise_data['file_id'] in self.failed:
+            return None
+        return {
+            'fdd_url': fdd_url,
+            'fdd_file_name': f"{franchise_data['file_id']}.pdf",
+            'fdd_file_path': f"/tmp/{franchise_data['file_id']}.pdf",
+            'fdd_file_size': 1024,
+            'fdd_file_download_date': '2024-01-01',
+            'sha256': hashlib.sha256(franchise_data['file_id'].encode()).hexdigest()
+        }
+
+
+class FakePdfProcessor:
+    """PDF processor that reports a fixed page count."""
+
+    workers = 2
+
+    def __init__(self):
+        self.analyzed = []
+        self.extracted = []
+
+    async def analyze(self, file_path):
+        self.analyzed.append(file_path)
+        return {'num_pages': 300}
+
+    async def extract_text(self, file_path):
+        self.extracted.append(file_path)
+        return [f'Royalty terms of {os.path.basename(file_path)}', '']
+
+
+class TestPipeline(unittest.TestCase):
+    """Test cases for the Pipeline class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.temp_db_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_db_file.close()
+        self.db = Database(self.temp_db_file.name)
+        self.db.connect()
+        self.db.initialize_database()
+        self.events = []
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.db.close()
+        os.unlink(self.temp_db_file.name)
+        self.loop.close()
+
+    def make_pipeline(self, broken=('Broken-0',), failed=(), **kwargs):
+        """Create a pipeline over the fakes."""
+        self.pdf_processor = FakePdfProcessor()
+        return Pipeline(
+            self.db, FakeScraper(self.events), FakeDownloader(self.events, broken, failed), self.pdf_processor,
+            **kwargs
+        )
+
+    def run_pipeline(self, names, **kwargs):
+        """Insert active filings for the names and run them through a pipeline."""
+        filings = []
+        for name in names:
+            filing_id = self.db.insert_active_filing(name, '1/1/2025')
+            filings.append({'id': filing_id, 'franchise_name': name, 'expiration_date': '1/1/2025'})
+        return self.loop.run_until_complete(self.make_pipeline(**kwargs).run(filings))
+
+    def test_run_stores_every_stage(self):
+        """Test that filings flow through search, details, download and post-processing."""
+        stats = self.run_pipeline(['Alpha', 'Beta', 'Missing'])
+
+        self.assertEqual(stats['filings'], 3)
+        self.assertEqual(stats['searched'], 2)
+        self.assertEqual(stats['details'], 4)
+        self.assertEqual(stats['downloaded'], 4)
+        self.assertEqual(stats['processed'], 4)
+
+        self.db.cursor.execute("SELECT COUNT(*) FROM franchise_metadata")
+        self.assertEqual(self.db.cursor.fetchone()[0], 4)
+        self.db.cursor.execute("SELECT num_pages FROM fdd_metadata")
+        self.assertEqual([row[0] for row in self.db.cursor.fetchall()], [300] * 4)
+
+    def test_run_with_async_database(self):
+        """Test that stages can store results through the database writer thread."""
+        with AsyncDatabase(self.temp_db_file.name) as async_db:
+            stats = self.run_pipeline(['Alpha', 'Beta'], journal=CrawlJournal(self.db), async_db=async_db)
+
+        self.assertEqual(stats['processed'], 4)
+        self.db.cursor.execute("SELECT num_pages FROM fdd_metadata")
+        self.assertEqual([row[0] for row in self.db.cursor.fetchall()], [300] * 4)
+        self.assertIsNone(CrawlJournal(self.db).resume_run())
+
+    def test_postprocess_indexes_text_once_per_document(self):
+        """Test that downloaded documents are added to the full-text index once."""
+        stats = self.run_pipeline(['Alpha'])
+        self.assertEqual(stats['indexed'], 2)
+        self.assertEqual(sorted(self.pdf_processor.extracted), ['/tmp/Alpha-0.pdf', '/tmp/Alpha-1.pdf'])
+
+        stats = self.run_pipeline(['Alpha'])
+        self.assertEqual(stats['indexed'], 0)
+        self.assertEqual(self.pdf_processor.extracted, [])
+
+        hits = self.db.search_fdd_text('royalty AND "Alpha-1"')
+        self.assertEqual([(hit['file_number'], hit['page_number']) for hit in hits], [('Alpha-1', 1)])
+
+    def test_slow_text_extraction_does_not_hold_up_processing(self):
+        """Test that every FDD is processed while text extraction is still waiting."""
+        pipeline = self.make_pipeline()
+        extract_text = self.pdf_processor.extract_text
+
+        async def slow_extract_text(file_path):
+            while pipeline.stats['processed'] < 4:
+                await asyncio.sleep(0.01)
+            return await extract_text(file_path)
+
+        self.pdf_processor.extract_text = slow_extract_text
+        filings = [
+            {'id': self.db.insert_active_filing(name, '1/1/2025'), 'franchise_name': name, 'expiration_date': '1/1/2025'}
+            for name in ['Alpha', 'Beta']
+        ]
+
+        stats = self.loop.run_until_complete(asyncio.wait_for(pipeline.run(filings), 5))
+
+        self.assertEqual(stats['processed'], 4)
+        self.assertEqual(stats['indexed'], 4)
+
+    def test_details_scraper_download_form_reaches_downloader(self):
+        """Test that a separate details scraper's download form is passed on but not journaled."""
+        downloader = FakeDownloader(self.events)
+        pipeline = Pipeline(
+            self.db, FakeScraper(self.events), downloader, FakePdfProcessor(),
+            journal=CrawlJournal(self.db), details_scraper=FormDetailsScraper(self.events)
+        )
+        filing_id = self.db.insert_active_filing('Alpha', '1/1/2025')
+
+        stats = self.loop.run_until_complete(
+            pipeline.run([{'id': filing_id, 'franchise_name': 'Alpha', 'expiration_date': '1/1/2025'}])
+        )
+
+        self.assertEqual(stats['downloaded'], 2)
+        self.assertEqual(sorted(form['__VIEWSTATE'] for form in downloader.forms), [
+            'https://example.com/details.aspx?id=Alpha-0', 'https://example.com/details.aspx?id=Alpha-1'
+        ])
+        self.db.cursor.execute("SELECT payload FROM crawl_journal WHERE stage = 'details'")
+        payloads = [row['payload'] for row in self.db.cursor.fetchall()]
+        self.assertEqual(len(payloads), 2)
+        self.assertTrue(all('download_form' not in payload for payload in payloads))
+
+    def test_overlapping_searches_fetch_each_file_once(self):
+        """Test that repeated searches and file IDs are fetched once and linked to every filing."""
+        scraper = OverlappingScraper(self.events)
+        self.pdf_processor = FakePdfProcessor()
+        pipeline = Pipeline(self.db, scraper, FakeDownloader(self.events), self.pdf_processor, search_workers=3)
+        filings = []
+        for name in ['Alpha', 'Alpha Express', ' alpha ']:
+            filing_id = self.db.insert_active_filing(name, '1/1/2025')
+            filings.append({'id': filing_id, 'franchise_name': name, 'expiration_date': '1/1/2025'})
+
+        stats = self.loop.run_until_complete(pipeline.run(filings))
+
+        # ' alpha ' reuses the search for 'Alpha' still in flight, which is
+        # forgotten once every filing waiting for it has its results
+        self.assertEqual([event for event in self.events if event[0] == 'search'],
+                         [('search', 'Alpha'), ('search', 'Alpha')])
+        self.assertEqual(stats['shared_searches'], 1)
+        self.assertEqual(pipeline._searches, {})
+        self.assertEqual(sorted(scraper.details_fetched), [
+            'https://example.com/details.aspx?id=Alpha-0', 'https://example.com/details.aspx?id=Alpha-1'
+        ])
+        self.assertEqual(stats['downloaded'], 2)
+        self.assertEqual(stats['linked'], 4)
+        self.db.cursor.execute("SELECT COUNT(*) FROM franchise_filings")
+        self.assertEqual(self.db.cursor.fetchone()[0], 6)
+        self.assertEqual(
+            self.db.get_filing_file_numbers()[('Alpha Express', '1/1/2025')], {'Alpha-0', 'Alpha-1'}
+        )
+
+    def test_downloads_start_before_searches_finish(self):
+        """Test that the stages overlap instead of running one after another."""
+        names = [f'Franchise{i}' for i in range(10)]
+        self.run_pipeline(names, queue_size=2)
+
+        first_download = next(i for i, event in enumerate(self.events) if event[0] == 'download')
+        last_search = max(i for i, event in enumerate(self.events) if event[0] == 'search')
+        self.assertLess(first_download, last_search)
+
+    def test_identical_documents_are_not_reanalyzed(self):
+        """Test that a document already stored under the same hash reuses its page count."""
+        self.run_pipeline(['Alpha'])
+        self.assertEqual(len(self.pdf_processor.analyzed), 2)
+
+        stats = self.run_pipeline(['Alpha'])
+
+        self.assertEqual(stats['downloaded'], 2)
+        self.assertEqual(self.pdf_processor.analyzed, [])
+        # The re-run updates the stored rows instead of duplicating them
+        self.db.cursor.execute("SELECT num_pages FROM fdd_metadata")
+        self.assertEqual([row[0] for row in self.db.cursor.fetchall()], [300] * 2)
+
+    def test_incremental_skips_stored_filings(self):
+        """Test that filings whose FDDs are all stored need no network requests."""
+        self.run_pipeline(['Alpha', 'Beta'])
+        self.events.clear()
+
+        stats = self.run_pipeline(['Alpha', 'Beta', 'Gamma'], incremental=True)
+
+        self.assertEqual(stats['skipped'], 2)
+        self.assertEqual(stats['downloaded'], 2)
+        self.assertEqual(self.events, [
+            ('search', 'Gamma'), ('download', 'Gamma-0'), ('download', 'Gamma-1')
+        ])
+
+    def test_incremental_fetches_missing_file_numbers(self):
+        """Test that only file numbers without a stored FDD are downloaded again."""
+        self.run_pipeline(['Alpha'])
+        self.db.cursor.execute('''
+        DELETE FROM fdd_metadata WHERE franchise_metadata_id IN (
+            SELECT id FROM franchise_metadata WHERE file_number = 'Alpha-1'
+        )
+        ''')
+        self.events.clear()
+
+        stats = self.run_pipeline(['Alpha'], incremental=True)
+
+        self.assertEqual(stats['skipped'], 0)
+        self.assertEqual(self.events, [('search', 'Alpha'), ('download', 'Alpha-1')])
+
+    def test_incremental_verify_files(self):
+        """Test that verification re-downloads FDDs whose file is missing."""
+        self.run_pipeline(['Alpha'])
+        self.events.clear()
+
+        # FakeDownloader's files were never written to disk
+        stats = self.run_pipeline(['Alpha'], incremental=True, verify_files=True)
+
+        self.assertEqual(stats['skipped'], 0)
+        self.assertEqual(stats['downloaded'], 2)
+
+    def test_resume_redoes_only_unfinished_work(self):
+        """Test that resuming from the journal continues each item where it stopped."""
+        stats = self.run_pipeline(['Broken', 'Alpha', 'Missing'], journal=CrawlJournal(self.db))
+        self.assertEqual(stats['errors'], 1)
+        self.events.clear()
+
+        journal = CrawlJournal(self.db)
+        self.assertIsNotNone(journal.resume_run())
+        pipeline = self.make_pipeline(broken=(), journal=journal)
+        stats = self.loop.run_until_complete(pipeline.resume())
+
+        # No searches or details pages are repeated, not even the search
+        # without results, only the failed download
+        self.assertEqual(self.events, [('download', 'Broken-0')])
+        self.assertEqual(stats['resumed'], 1)
+        self.assertEqual(self.pdf_processor.analyzed, ['/tmp/Broken-0.pdf'])
+        self.assertIsNone(CrawlJournal(self.db).resume_run())
+
+    def test_resume_skips_filings_skipped_as_stored(self):
+        """Test that filings an incremental run skipped are not searched when it resumes."""
+        self.run_pipeline(['Alpha'])
+        self.db.cursor.execute("SELECT id FROM active_filings WHERE franchise_name = 'Alpha'")
+        alpha = {'id': self.db.cursor.fetchone()['id'], 'franchise_name': 'Alpha', 'expiration_date': '1/1/2025'}
+        broken = {'id': self.db.insert_active_filing('Broken', '1/1/2025'),
+                  'franchise_name': 'Broken', 'expiration_date': '1/1/2025'}
+        pipeline = self.make_pipeline(incremental=True, journal=CrawlJournal(self.db))
+        stats = self.loop.run_until_complete(pipeline.run([alpha, broken]))
+        self.assertEqual(stats['skipped'], 1)
+        self.events.clear()
+
+        journal = CrawlJournal(self.db)
+        self.assertIsNotNone(journal.resume_run())
+        pipeline = self.make_pipeline(broken=(), incremental=True, journal=journal)
+        stats = self.loop.run_until_complete(pipeline.resume())
+
+        self.assertEqual(self.events, [('download', 'Broken-0')])
+        self.assertEqual((stats['filings'], stats['skipped'], stats['resumed']), (0, 0, 1))
+
+    def test_resume_retries_items_that_returned_nothing(self):
+        """Test that a download reported as failed by returning None keeps the run resumable."""
+        stats = self.run_pipeline(['Alpha'], broken=(), failed=('Alpha-1',), journal=CrawlJournal(self.db))
+        self.assertEqual(stats['errors'], 1)
+        self.events.clear()
+
+        journal = CrawlJournal(self.db)
+        self.assertIsNotNone(journal.resume_run())
+        pipeline = self.make_pipeline(broken=(), journal=journal)
+        stats = self.loop.run_until_complete(pipeline.resume())
+
+        self.assertEqual(self.events, [('download', 'Alpha-1')])
+        self.assertEqual(stats['errors'], 0)
+        self.assertIsNone(CrawlJournal(self.db).resume_run())
+
+    def test_stage_errors_do_not_stop_pipeline(self):
+        """Test that a failing item is counted and the rest still complete."""
+        stats = self.run_pipeline(['Broken', 'Alpha'])
+
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(stats['downloaded'], 3)
+        self.assertEqual(stats['processed'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import asyncio
+from unittest.mock import AsyncMock
+
+import httpx
+
+from src.scrapers.session_bridge import SessionBridge
+
+
+DETAILS_URL = 'https://apps.dfi.wi.gov/apps/FranchiseSearch/details.aspx?id=637375'
+
+
+class FakePage:
+    """Pyppeteer page holding browser cookies."""
+
+    def __init__(self, cookies=()):
+        self.browser_cookies = list(cookies)
+        self.setCookie = AsyncMock(side_effect=lambda *cookies: self.browser_cookies.extend(cookies))
+
+    async def cookies(self):
+        return list(self.browser_cookies)
+
+
+class TestSessionBridge(unittest.TestCase):
+    """Test cases for the SessionBridge class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.requests = []
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.loop.close()
+
+    def handler(self, request):
+        """Record the request and start a session for clients without one."""
+        self.requests.append(request)
+        if 'ASP.NET_SessionId' in request.headers.get('Cookie', ''):
+            return httpx.Response(200, text='ok')
+        return httpx.Response(200, text='ok', headers={'Set-Cookie': 'ASP.NET_SessionId=http1; path=/; HttpOnly'})
+
+    def make_client(self):
+        """Create a client backed by the mock transport."""
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+    def test_browser_session_reaches_clients(self):
+        """Test that clients send the session cookie exported from the browser."""
+        bridge = SessionBridge()
+        page = FakePage([{'name': 'ASP.NET_SessionId', 'value': 'browser1',
+                          'domain': 'apps.dfi.wi.gov', 'path': '/'}])
+        first, second = self.make_client(), self.make_client()
+        bridge.attach(first)
+        bridge.attach(second)
+
+        async def run():
+            await bridge.export_from(page)
+            await first.get(DETAILS_URL)
+            await second.get(DETAILS_URL)
+            await first.aclose()
+            await second.aclose()
+
+        self.loop.run_until_complete(run())
+
+        self.assertEqual([request.headers['Cookie'] for request in self.requests],
+                         ['ASP.NET_SessionId=browser1'] * 2)
+        self.assertEqual(bridge.stats['exported'], 1)
+
+    def test_http_session_reaches_browser_once(self):
+        """Test that a session started over HTTP is given to the browser only when it changed."""
+        bridge = SessionBridge()
+        page = FakePage()
+        client = self.make_client()
+        bridge.attach(client)
+
+        async def run():
+            await client.get(DETAILS_URL)
+            await bridge.import_into(page)
+            await bridge.import_into(page)
+            await bridge.export_from(page)
+            await bridge.import_into(page)
+            await client.get(DETAILS_URL)
+            await client.aclose()
+
+        self.loop.run_until_complete(run())
+
+        page.setCookie.assert_awaited_once()
+        cookie = page.browser_cookies[0]
+        self.assertEqual((cookie['name'], cookie['value'], cookie['domain'], cookie['path']),
+                         ('ASP.NET_SessionId', 'http1', 'apps.dfi.wi.gov', '/'))
+        self.assertEqual(bridge.stats['imported'], 1)
+        self.assertEqual(self.requests[1].headers['Cookie'], 'ASP.NET_SessionId=http1')
+
+    def test_attach_keeps_client_cookies(self):
+        """Test that cookies a client already had move into the shared jar."""
+        bridge = SessionBridge()
+        client = httpx.AsyncClient(cookies={'existing': '1'})
+
+        bridge.attach(client)
+        bridge.attach(client)
+
+        self.assertEqual(bridge.cookies.get('existing'), '1')
+        self.assertIs(client.cookies.jar, bridge.jar)
+        self.loop.run_until_complete(client.aclose())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import os
+import asyncio
+import unittest
+import tempfile
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+from src.utils.snapshot_store import SnapshotStore, SnapshotWriter
+from src.utils.file_operations import save_html_snapshot
+
+
+def make_page(i):
+    """Create a details page with some repetitive markup."""
+    rows = ''.join(f'<tr><td>Row {j}</td><td>Value {j}</td></tr>' for j in range(50))
+    return f'<html><body><h1>Franchise {i}</h1><table>{rows}</table></body></html>'
+
+
+class TestSnapshotStore(unittest.TestCase):
+    """Test cases for the SnapshotStore class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = SnapshotStore(self.temp_dir.name, compression='gzip')
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def segments(self):
+        return sorted(name for name in os.listdir(self.temp_dir.name) if name.endswith('.seg'))
+
+    def test_put_and_get(self):
+        """Test a page round-trips through a compressed segment."""
+        page = make_page(1)
+        sha256 = self.store.put(page, url='https://example.com/details.aspx?id=1', name='franchise_details_1')
+
+        self.assertEqual(self.store.get(sha256), page)
+        self.assertEqual(self.store.latest('https://example.com/details.aspx?id=1'), page)
+        self.assertIsNone(self.store.get('0' * 64))
+        self.assertLess(os.path.getsize(os.path.join(self.temp_dir.name, self.segments()[0])), len(page))
+
+    def test_identical_pages_stored_once(self):
+        """Test a repeated page is indexed again but not written again."""
+        page = make_page(1)
+        url = 'https://example.com/details.aspx?id=1'
+        self.store.put(page, url=url, captured_at=datetime(2024, 1, 1))
+        segment_size = os.path.getsize(os.path.join(self.temp_dir.name, self.segments()[0]))
+        self.store.put(page, url=url, captured_at=datetime(2024, 1, 2))
+
+        self.assertEqual(os.path.getsize(os.path.join(self.temp_dir.name, self.segments()[0])), segment_size)
+        captures = list(self.store.iter_snapshots())
+        self.assertEqual([capture['captured_at'][:10] for capture in captures], ['2024-01-01', '2024-01-02'])
+        self.assertEqual(captures[0]['content'], captures[1]['content'])
+
+    def test_segments_roll_over(self):
+        """Test a new segment is started when the current one is full."""
+        store = SnapshotStore(os.path.join(self.temp_dir.name, 'small'), segment_size=1000, compression='gzip')
+        pages = [make_page(i) + 'x' * i * 997 for i in range(5)]
+        for i, page in enumerate(pages):
+            store.put(page, name=f'franchise_details_{i}')
+        store.close()
+
+        self.assertGreater(len(os.listdir(os.path.join(self.temp_dir.name, 'small'))), 2)
+        # Reopening continues after the last segment and reads everything back in order
+        store = SnapshotStore(os.path.join(self.temp_dir.name, 'small'), segment_size=1000, compression='gzip')
+        store.put(make_page(99), name='search_results_Other')
+        contents = [snapshot['content'] for snapshot in store.iter_snapshots(name_prefix='franchise_details_')]
+        store.close()
+
+        self.assertEqual(contents, pages)
+
+
+
+class GatedStore:
+    """Store stand-in whose writes wait until the test opens a gate."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.batches = []
+        self.closed = False
+
+    def put_many(self, pages):
+        self.gate.wait()
+        self.batches.append([page['name'] for page in pages])
+
+    def close(self):
+        self.closed = True
+
+
+class TestSnapshotWriter(unittest.TestCase):
+    """Test cases for the SnapshotWriter class."""
+
+    def test_close_writes_everything_queued_in_batches(self):
+        """Test that shutdown flushes queued pages, several per transaction."""
+        store = GatedStore()
+        writer = SnapshotWriter(store, queue_size=10, batch_size=4)
+        for i in range(7):
+            writer.submit(make_page(i), name=f'page_{i}')
+        store.gate.set()
+        writer.close()
+
+        self.assertEqual(sum(store.batches, []), [f'page_{i}' for i in range(7)])
+        self.assertLess(len(store.batches), 7)
+        self.assertTrue(store.closed)
+        with self.assertRaises(RuntimeError):
+            writer.submit(make_page(0))
+
+    def test_drop_policy(self):
+        """Test that a full queue drops pages instead of blocking the caller."""
+        store = GatedStore()
+        writer = SnapshotWriter(store, queue_size=2, batch_size=1, policy='drop')
+        results = [writer.submit(make_page(i), name=f'page_{i}') for i in range(6)]
+        store.gate.set()
+        writer.close()
+
+        # One page is being written, two are queued, the rest are dropped
+        self.assertIsNone(results[-1])
+        self.assertEqual(writer.dropped, results.count(None))
+        self.assertEqual(len(sum(store.batches, [])), 6 - writer.dropped)
+
+    def test_block_policy_waits_for_room(self):
+        """Test that a full queue makes submit wait for the writer."""
+        store = GatedStore()
+        writer = SnapshotWriter(store, queue_size=1, batch_size=1, policy='block')
+        writer.submit(make_page(0), name='page_0')
+        writer.submit(make_page(1), name='page_1')
+
+        submitted = threading.Event()
+        thread = threading.Thread(target=lambda: (writer.submit(make_page(2), name='page_2'), submitted.set()))
+        thread.start()
+        self.assertFalse(submitted.wait(0.05))
+
+        store.gate.set()
+        thread.join(1)
+        writer.close()
+
+        self.assertTrue(submitted.is_set())
+        self.assertEqual(sum(store.batches, []), ['page_0', 'page_1', 'page_2'])
+
+    def test_submit_async_waits_without_blocking_the_loop(self):
+        """Test that a full queue suspends only the submitting coroutine."""
+        store = GatedStore()
+        writer = SnapshotWriter(store, queue_size=1, batch_size=1, policy='block')
+        writer.submit(make_page(0), name='page_0')
+        writer.submit(make_page(1), name='page_1')
+        ticks = []
+
+        async def tick():
+            for i in range(5):
+                ticks.append(i)
+                await asyncio.sleep(0.01)
+            # The loop kept running while the submit waited; let the writer go
+            store.gate.set()
+
+        async def run():
+            submitted = asyncio.ensure_future(writer.submit_async(make_page(2), name='page_2'))
+            await tick()
+            self.assertEqual(ticks, list(range(5)))
+            return await submitted
+
+        loop = asyncio.new_event_loop()
+        try:
+            sha256 = loop.run_until_complete(run())
+        finally:
+            loop.close()
+        writer.close()
+
+        self.assertIsNotNone(sha256)
+        self.assertEqual(sum(store.batches, []), ['page_0', 'page_1', 'page_2'])
+
+    def test_save_html_snapshot(self):
+        """Test the helper queues pages for the process-wide writer."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = SnapshotStore(temp_dir, compression='gzip')
+            writer = SnapshotWriter(store)
+            with patch('src.utils.snapshot_store.get_snapshot_writer', return_value=writer):
+                reference = save_html_snapshot(make_page(1), 'franchise_details_1', 'https://example.com/1')
+            writer.flush()
+
+            self.assertTrue(reference.startswith('snapshot:'))
+            self.assertEqual(store.get(reference.split(':', 1)[1]), make_page(1))
+            writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
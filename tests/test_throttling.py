@@ -0,0 +1,144 @@
+import unittest
+import asyncio
+
+import httpx
+
+from src.utils.throttling import (
+    AdaptiveRateLimiter,
+    HostConcurrencyLimiter,
+    RateLimitedTransport,
+    get_host
+)
+
+
+URL = "https://apps.dfi.wi.gov/apps/FranchiseSearch/details.aspx"
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+    """Test cases for the AdaptiveRateLimiter class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.clock = FakeClock()
+        self.limiter = AdaptiveRateLimiter(
+            initial_rate=1.0, min_rate=0.25, max_rate=2.0, burst=2,
+            increase=0.5, decrease_factor=0.5, latency_target=1.0, clock=self.clock
+        )
+
+    def test_get_host(self):
+        """Test extracting the host from a URL."""
+        self.assertEqual(get_host("https://Apps.DFI.wi.gov/x?y=1"), "apps.dfi.wi.gov")
+        self.assertEqual(get_host("details.aspx?id=1"), "")
+
+    def test_burst_then_paced(self):
+        """Test that the bucket allows a burst and then spaces requests."""
+        self.assertEqual(self.limiter.reserve(URL), 0)
+        self.assertEqual(self.limiter.reserve(URL), 0)
+        self.assertAlmostEqual(self.limiter.reserve(URL), 1.0)
+        self.assertAlmostEqual(self.limiter.reserve(URL), 2.0)
+
+    def test_hosts_are_independent(self):
+        """Test that each host has its own bucket."""
+        for _ in range(3):
+            self.limiter.reserve(URL)
+        self.assertEqual(self.limiter.reserve("https://example.com/"), 0)
+
+    def test_additive_increase(self):
+        """Test that fast successful responses raise the rate up to the maximum."""
+        self.limiter.record(URL, 200, 0.1)
+        self.assertAlmostEqual(self.limiter.rate(URL), 1.5)
+        self.limiter.record(URL, 200, 0.1)
+        self.limiter.record(URL, 200, 0.1)
+        self.assertAlmostEqual(self.limiter.rate(URL), 2.0)
+
+    def test_multiplicative_decrease_on_overload(self):
+        """Test that 429 and 5xx responses halve the rate once per round trip."""
+        self.limiter.record(URL, 429, 0.1)
+        self.assertAlmostEqual(self.limiter.rate(URL), 0.5)
+
+        # A second failure within the same round trip does not count again
+        self.limiter.record(URL, 503, 0.1)
+        self.assertAlmostEqual(self.limiter.rate(URL), 0.5)
+
+        self.clock.now += 10
+        self.limiter.record(URL, 503, 0.1)
+        self.assertAlmostEqual(self.limiter.rate(URL), 0.25)
+
+        self.clock.now += 10
+        self.limiter.record(URL, None, 0.1)
+        self.assertAlmostEqual(self.limiter.rate(URL), 0.25)
+
+    def test_decrease_on_high_latency(self):
+        """Test that slow responses back off even when successful."""
+        self.limiter.record(URL, 200, 5.0)
+        self.assertAlmostEqual(self.limiter.rate(URL), 0.5)
+
+    def test_retry_after_pauses_host(self):
+        """Test that Retry-After delays the next request."""
+        self.limiter.record(URL, 429, 0.1, retry_after=30)
+        self.assertAlmostEqual(self.limiter.reserve(URL), 30)
+
+    def test_rate_limited_transport(self):
+        """Test that the httpx transport feeds response status back to the limiter."""
+        def handler(request):
+            return httpx.Response(503)
+
+        transport = RateLimitedTransport(httpx.MockTransport(handler), limiter=self.limiter)
+
+        async def run():
+            async with httpx.AsyncClient(transport=transport) as client:
+                return await client.get(URL)
+
+        loop = asyncio.new_event_loop()
+        response = loop.run_until_complete(run())
+        loop.close()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertAlmostEqual(self.limiter.rate(URL), 0.5)
+
+
+class TestHostConcurrencyLimiter(unittest.TestCase):
+    """Test cases for the HostConcurrencyLimiter class."""
+
+    def test_limits_per_host(self):
+        """Test that only ``limit`` requests to a host run at once."""
+        limiter = HostConcurrencyLimiter(limit=2)
+        active = {}
+        peak = {}
+
+        async def request(url):
+            host = get_host(url)
+            async with limiter.acquire(url):
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+                await asyncio.sleep(0.01)
+                active[host] -= 1
+
+        async def run():
+            urls = [URL] * 5 + ["https://example.com/"] * 5
+            await asyncio.gather(*(request(url) for url in urls))
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(run())
+        loop.close()
+
+        self.assertEqual(peak, {"apps.dfi.wi.gov": 2, "example.com": 2})
+
+    def test_invalid_limit(self):
+        """Test that the limit must be positive."""
+        with self.assertRaises(ValueError):
+            HostConcurrencyLimiter(limit=0)
+
+
+if __name__ == '__main__':
+    unittest.main()